@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+REPOSITORY_ROOT = Path(os.path.realpath(__file__)).parent.parent
+if str(REPOSITORY_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPOSITORY_ROOT))
+
+from generator.core.tsl_config import config, parse_args
+from generator.utils.dict_utils import dict_update
+from generator.utils.yaml_utils import yaml_load
+
+
+def setup_benchmark(description: str, add_arguments: Callable[[argparse.ArgumentParser], None] = None) -> argparse.Namespace:
+    """
+    Parses the benchmark specific arguments and sets up the global generator configuration. All arguments which are
+    not known to the benchmark are forwarded to the generator argument parser (e.g., '--no-debug-info').
+    :param description: Description of the benchmark.
+    :param add_arguments: Optional function which adds benchmark specific arguments to the parser.
+    :return: Parsed benchmark arguments. The parsed generator arguments are stored in generator_args.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-r', '--repetitions', type=int, default=3, help="Number of repetitions (best run is reported).")
+    if add_arguments is not None:
+        add_arguments(parser)
+    args, generator_argv = parser.parse_known_args()
+    os.chdir(REPOSITORY_ROOT)
+    file_config = yaml_load(Path("generator/config/default_conf.yaml"))
+    sys.argv = [sys.argv[0]] + generator_argv
+    args_dict = parse_args(known_types=file_config["configuration"]["relevant_types"])
+    config.setup(dict_update(file_config, args_dict))
+    args.generator_args = args_dict
+    return args
+
+
+def best_of(repetitions: int, func: Callable[[], None]) -> float:
+    """
+    Runs func repeatedly and returns the fastest wall clock time in seconds.
+    """
+    timings: List[float] = []
+    for _ in range(max(1, repetitions)):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def print_table(header: Tuple[str, ...], rows: List[Tuple]) -> None:
+    widths = [max(len(str(x)) for x in column) for column in zip(header, *rows)]
+    print("  ".join(f"{str(h):<{w}}" for h, w in zip(header, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(f"{str(c):<{w}}" for c, w in zip(row, widths)))
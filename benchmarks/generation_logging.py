@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Measures the total generation time with different logging modes. Every mode is run in a separate process:
+  debug:        all messages (including the call tracing of @log and LogInit) are formatted and written to /dev/null.
+  default:      logging as configured in generator/config/log_conf.yaml.
+  fast:         --fast, only warnings and errors are emitted and requirement checks are skipped.
+  compiled-out: TSL_GENERATOR_FAST=1, the tracing and requirement decorators are removed at import time.
+All unknown arguments are forwarded to the generator (e.g., '--archid avx2').
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ["debug", "default", "fast", "compiled-out"]
+
+
+def add_arguments(parser):
+    parser.add_argument('--child', choices=MODES, default=None, help="Internal: run a single generation.")
+
+
+def run_child() -> None:
+    from bench_utils import setup_benchmark
+    args = setup_benchmark(__doc__, add_arguments)
+    mode = args.child
+    from generator.core.tsl_generator import TSLGenerator
+    from generator.utils.log_utils import reset_log_thresholds
+    if mode == "debug":
+        handler = logging.FileHandler(os.devnull)
+        handler.setLevel(logging.DEBUG)
+        logging.getLogger().addHandler(handler)
+        reset_log_thresholds()
+    start = time.perf_counter()
+    TSLGenerator().generate(args.generator_args["targets"])
+    print(f"{time.perf_counter() - start:.4f}")
+
+
+def main() -> None:
+    from bench_utils import print_table
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-r', '--repetitions', type=int, default=1, help="Number of repetitions (best run is reported).")
+    args, generator_argv = parser.parse_known_args()
+    rows = []
+    baseline = None
+    for mode in MODES:
+        env = dict(os.environ)
+        mode_argv = []
+        if mode == "fast":
+            mode_argv.append("--fast")
+        elif mode == "compiled-out":
+            env["TSL_GENERATOR_FAST"] = "1"
+        timings = []
+        for _ in range(max(1, args.repetitions)):
+            with tempfile.TemporaryDirectory() as out_path:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, "--no-model-cache", "-o", out_path] + mode_argv + generator_argv,
+                    env=env, check=True, capture_output=True, text=True).stdout
+            timings.append(float(output.strip().splitlines()[-1]))
+        best = min(timings)
+        if baseline is None:
+            baseline = best
+        rows.append((mode, f"{best:.2f}", f"{baseline / best:.2f}x"))
+    print_table(("logging", "generation seconds", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    if "--child" in sys.argv:
+        run_child()
+    else:
+        main()
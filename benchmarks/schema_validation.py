@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Measures the validation throughput (documents per second) of the interpretive schema validation
+(Schema.SchemaNode.validate) and the compiled schema validators (Schema.validate) on the primitive data.
+"""
+import copy
+
+from bench_utils import best_of, print_table, setup_benchmark
+
+from generator.core.tsl_config import config
+from generator.utils.yaml_utils import yaml_load, yaml_load_all
+
+
+def load_documents():
+    documents = []
+    for extension_file in config.extension_files():
+        documents.append(("extension", yaml_load(extension_file, **config.yaml_loader_params())))
+    for primitive_file in config.primitive_files():
+        for document_index, yaml_document in enumerate(yaml_load_all(primitive_file, **config.yaml_loader_params())):
+            documents.append(("primitive_class" if document_index == 0 else "primitive", yaml_document))
+    return documents
+
+
+def main():
+    args = setup_benchmark(__doc__)
+    documents = load_documents()
+    schemes = {name: config.get_schema(name) for name in ("extension", "primitive_class", "primitive")}
+
+    def timed(validate_fn):
+        timings = []
+        for _ in range(max(1, args.repetitions)):
+            # validation works in place, thus every run gets fresh copies which are created outside the measurement
+            batch = copy.deepcopy(documents)
+
+            def validate_all():
+                for schema_name, yaml_document in batch:
+                    validate_fn(schemes[schema_name], yaml_document)
+            timings.append(best_of(1, validate_all))
+        return min(timings)
+
+    interpretive = timed(lambda schema, document: schema.root.validate(document))
+    compiled = timed(lambda schema, document: schema.validate(document))
+
+    rows = [
+        ("interpretive", len(documents), f"{interpretive:.4f}", f"{len(documents) / interpretive:.0f}", "1.00x"),
+        ("compiled", len(documents), f"{compiled:.4f}", f"{len(documents) / compiled:.0f}",
+         f"{interpretive / compiled:.2f}x"),
+    ]
+    print_table(("validator", "documents", "seconds", "documents/sec", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Measures the slicing of the loaded model for every target platform of target_specs.json:
+  relevance: lscpu flag relevance checks of all extensions and primitive definitions, once with the lscpu flags as
+             string sets, which are parsed for every check (see StringSetRelevance), and once with the pre-parsed
+             bitmasks (TSLSlicer.is_extension_relevant and is_primitive_relevant).
+  slicing:   complete slicing of extensions and primitives (TSLSlicer.slice_extensions and slice_primitives).
+"""
+from pathlib import Path
+from typing import List
+
+from bench_utils import best_of, print_table, setup_benchmark
+
+from generator.core.ctrl.tsl_slicer import TSLSlicer
+from generator.core.tsl_batch import load_flavors
+from generator.core.tsl_config import config
+from generator.core.tsl_generator import TSLGenerator
+from generator.utils.requirement import requirement
+
+
+class StringSetRelevance:
+    """
+    Relevance checks of TSLSlicer before the lscpu flags were interned: the flags are parsed and converted into sets
+    for every check.
+    """
+    def __init__(self, relevant_hardware_flags: List[str]) -> None:
+        self.__relevant_hardware_flags = relevant_hardware_flags
+
+    @requirement(data_dict="NotNone")
+    def is_extension_relevant(self, data_dict: dict) -> bool:
+        if len(data_dict["lscpu_flags"]) == 0:
+            return True
+        return len((set(data_dict["lscpu_flags"]) & set(self.__relevant_hardware_flags))) > 0
+
+    @requirement(data_dict="NotNone")
+    def is_primitive_relevant(self, data_dict: dict) -> bool:
+        if len(data_dict["lscpu_flags"]) == 0:
+            return True
+        if self.has_lscpu_disjunction(data_dict):
+            for group in data_dict["lscpu_flags"]:
+                elements = group.strip("[").strip("]").replace("'", "").replace(" ", "")
+                if set(elements.split(",")).issubset(set(self.__relevant_hardware_flags)):
+                    return True
+            return False
+        return set(data_dict["lscpu_flags"]).issubset(set(self.__relevant_hardware_flags))
+
+    def has_lscpu_disjunction(self, data_dict: dict) -> bool:
+        if len(set(data_dict["lscpu_flags"])) <= 1:
+            return False
+        return any("[" in flag and "]" in flag for flag in set(data_dict["lscpu_flags"]))
+
+
+def string_set_relevance(reference: StringSetRelevance, extensions: list, definitions: list) -> int:
+    relevant = 0
+    for extension in extensions:
+        if reference.is_extension_relevant(extension.data):
+            relevant += 1
+    for definition in definitions:
+        if reference.is_primitive_relevant(definition.data):
+            relevant += 1
+    return relevant
+
+
+def bitmask_relevance(slicer: TSLSlicer, extensions: list, definitions: list) -> int:
+    relevant = 0
+    for extension in extensions:
+        if slicer.is_extension_relevant(extension):
+            relevant += 1
+    for definition in definitions:
+        if slicer.is_primitive_relevant(definition):
+            relevant += 1
+    return relevant
+
+
+def main():
+    args = setup_benchmark(__doc__)
+    generator = TSLGenerator()
+    extensions = list(generator.extension_set)
+    definitions = [definition for primitive_class in generator.primitive_class_set
+                   for primitive in primitive_class for definition in primitive.definitions]
+    checks = len(extensions) + len(definitions)
+
+    rows = []
+    totals = [0.0, 0.0, 0.0]
+    for flavor in load_flavors(Path("target_specs.json")):
+        slicer = TSLSlicer(flavor.flags, config.relevant_types)
+        reference = StringSetRelevance(flavor.flags)
+        if bitmask_relevance(slicer, extensions, definitions) != string_set_relevance(reference, extensions, definitions):
+            raise RuntimeError(f"Relevance checks differ for {flavor.directory_name}.")
+        string_sets = best_of(args.repetitions, lambda: string_set_relevance(reference, extensions, definitions))
+        bitmasks = best_of(args.repetitions, lambda: bitmask_relevance(slicer, extensions, definitions))
+        slicing = best_of(args.repetitions, lambda: (slicer.slice_extensions(generator.extension_set),
+                                                     slicer.slice_primitives(generator.primitive_class_set)))
+        totals = [totals[0] + string_sets, totals[1] + bitmasks, totals[2] + slicing]
+        rows.append((flavor.directory_name, len(flavor.flags), checks, f"{string_sets * 1000:.2f}",
+                     f"{bitmasks * 1000:.2f}", f"{string_sets / bitmasks:.2f}x", f"{slicing * 1000:.1f}"))
+    rows.append(("Total", "", "", f"{totals[0] * 1000:.2f}", f"{totals[1] * 1000:.2f}",
+                 f"{totals[0] / totals[1]:.2f}x", f"{totals[2] * 1000:.1f}"))
+    print_table(("flavor", "flags", "checks", "string sets ms", "bitmasks ms", "speedup", "slicing ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,6 @@ from typing import Generator, Dict, Iterator, Set, List, Tuple, NewType, Union
 import re
 import networkx as nx
 from dataclasses import dataclass
-import pandas as pd
 
 
 class TSLDependencyGraph:
@@ -201,7 +200,8 @@ class TSLDependencyGraph:
           class_graph.add_edge(required_class, cls)
     nx.drawing.nx_pydot.write_dot(class_graph, "class_graph.dot")
     try:
-      ordered_class_graph = nx.topological_sort(class_graph)
+      # independent classes are ordered by name, thus the order does not depend on the construction order of the graph
+      ordered_class_graph = list(nx.lexicographical_topological_sort(class_graph, key=str))
     except nx.NetworkXUnfeasible:
       print("Unable to sort class graph.")
       exit(1)
@@ -298,6 +298,7 @@ class TSLDependencyGraph:
     g.draw(config.generation_out_path.joinpath(out_name).with_suffix(".png"), prog='dot')
     
   def to_pandas(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    import pandas as pd
     edge_list = []
     node_list = []
     # Iterate over edges and nodes in the dependency graph
@@ -1,13 +1,13 @@
 from typing import List, Set, Dict, Tuple, Generator
 from pathlib import Path
 import logging
-import shutil
 
 
 from generator.core.tsl_config import config
 from generator.core.model.tsl_extension import TSLExtensionSet, TSLExtension
 from generator.core.model.tsl_primitive import TSLPrimitiveClassSet, TSLPrimitive
 from generator.utils.log_utils import LogInit
+from generator.utils.output_writer import output_writer
 
 
 class TSLLib:
@@ -59,7 +59,7 @@ class TSLLib:
         for extension in self.extension_set:
             if "runtime_headers" in extension.data:
                 result_set.update([f"{runtime_root_path.joinpath(p)}" for p in extension.data["runtime_headers"]])
-        return [Path(p) for p in result_set]
+        return [Path(p) for p in sorted(result_set)]
     
     @property
     def runtime_headers_with_extension_dict(self) -> Dict[str, List[dict]]:
@@ -85,8 +85,7 @@ class TSLLib:
     def copy_relevant_supplementary_files(self) -> None:
         supplementary_root_path = Path(config.generation_out_path)
         for libData in self.relevant_supplementary_libraries:
-            shutil.rmtree(supplementary_root_path.joinpath(libData['cmakelists_path']).resolve(), ignore_errors=True)
-            shutil.copytree(Path(libData['cmakelists_path']).resolve(), supplementary_root_path.joinpath(libData['cmakelists_path']).resolve())
+            output_writer.copy_tree(Path(libData['cmakelists_path']).resolve(), supplementary_root_path.joinpath(libData['cmakelists_path']).resolve())
         runtime_headers_dict = self.runtime_headers_with_extension_dict
         #create all directories recursively
         for fpath in runtime_headers_dict:
@@ -102,11 +101,11 @@ class TSLLib:
             #load file into string
             print(f"Reading from {Path(fpath).resolve()}")
             print(f"Writing to {supplementary_root_path.joinpath(fpath).resolve()}")
-            with open(Path(fpath).resolve(), 'r') as runtime_header_input, open(supplementary_root_path.joinpath(fpath).resolve(), 'w') as runtime_header_output:
+            with open(Path(fpath).resolve(), 'r') as runtime_header_input:
                 file_content = runtime_header_input.read()
-                #create a jinja template from the file
-                template = config.create_template(file_content)
-                runtime_header_output.write(template.render(runtime_relevant_data_dict))
+            #create a jinja template from the file
+            template = config.create_template(file_content)
+            output_writer.write_text(supplementary_root_path.joinpath(fpath).resolve(), template.render(runtime_relevant_data_dict))
             # shutil.copy(fpath.resolve(), supplementary_root_path.joinpath(fpath).resolve(), follow_symlinks=True)
 
     @property
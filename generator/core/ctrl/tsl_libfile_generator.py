@@ -1,7 +1,6 @@
 from generator.core.ctrl.tsl_lib import TSLLib
 from generator.core.tsl_config import config
 
-import copy
 import logging
 from pathlib import Path
 from typing import Generator
@@ -9,22 +8,39 @@ from itertools import combinations
 
 from jinja2 import Template
 
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple, Union
+from generator.core.ctrl.tsl_renderer import TSLRenderedPart, primitive_class_target_extensions, \
+    primitive_declaration_path, primitive_definition_path, render_primitive_parts
 from generator.core.model.tsl_extension import TSLExtensionSet, TSLExtension
 from generator.core.model.tsl_file import TSLHeaderFile
-from generator.core.model.tsl_primitive import TSLPrimitiveClassSet
+from generator.core.model.tsl_primitive import TSLPrimitiveClass, TSLPrimitiveClassSet
+from generator.utils.dependency_map import DependencyMap
 from generator.utils.file_utils import strip_common_path_prefix
 from generator.utils.log_utils import LogInit
 from generator.utils.yaml_utils import yaml_load, YamlDataType
 from generator.core.ctrl.tsl_dependencies import TSLDependencyGraph
 
 
+def extension_header_path(extension: TSLExtension) -> Path:
+    return config.get_generation_path("extensions").joinpath(extension.file_name).joinpath(
+        extension.name).with_suffix(config.get_config_entry("header_file_extension"))
+
+
+def static_header_path(static_yaml_file_path: Path) -> Path:
+    if static_yaml_file_path.stem == config.lib_root_header.stem:
+        return config.lib_root_header
+    static_file_path_without_prefix = strip_common_path_prefix(static_yaml_file_path,
+                                                               config.static_lib_files_root_path)
+    static_file_name = static_file_path_without_prefix.name
+    static_file_path = static_file_path_without_prefix.parent
+    return config.lib_static_files_root_path.joinpath(static_file_path).joinpath(
+        static_file_name).with_suffix(config.get_config_entry("header_file_extension"))
+
 
 class TSLFileGenerator:
     @classmethod
     def generate_extension_file(cls, extension: TSLExtension) -> TSLHeaderFile:
-        file_path: Path = config.get_generation_path("extensions").joinpath(extension.file_name).joinpath(
-            extension.name).with_suffix(config.get_config_entry("header_file_extension"))
+        file_path: Path = extension_header_path(extension)
         tsl_file: TSLHeaderFile = TSLHeaderFile.create_from_dict(file_path, extension.data)
         extension_template: Template = config.get_template("core::extension")
         tsl_file.add_code(extension_template.render(extension.data))
@@ -57,6 +73,21 @@ class TSLFileGenerator:
         for p in sorted(pathes):
             yield p
 
+    @staticmethod
+    def plan_library_files(lib: TSLLib) -> List[Path]:
+        """
+        Determines the library files, which would be generated for the given (sliced) library, from the model and
+        the path configuration only. Nothing is rendered, thus this is considerably cheaper than creating the files.
+        :return: Paths of the files in the order of library_files.
+        """
+        primitive_classes: List[TSLPrimitiveClass] = list(lib.primitive_class_set)
+        return [static_header_path(static_yaml_file_path) for static_yaml_file_path in config.static_lib_files()] + \
+            [config.lib_generated_files_root_header] + \
+            [extension_header_path(extension) for extension in lib.extension_set] + \
+            [primitive_declaration_path(primitive_class) for primitive_class in primitive_classes] + \
+            [primitive_definition_path(primitive_class, target_extension) for primitive_class in primitive_classes
+             for target_extension in primitive_class_target_extensions(primitive_class)]
+
     @property
     def library_files(self) -> Generator[TSLHeaderFile, None, None]:
         yield from self.static_files
@@ -67,8 +98,7 @@ class TSLFileGenerator:
     def __create_extension_header_files(self, extension_set: TSLExtensionSet) -> None:
         self.log(logging.INFO, f"Starting generation of extensions header.")
         for extension in extension_set:
-            file_path: Path = config.get_generation_path("extensions").joinpath(extension.file_name).joinpath(
-                extension.name).with_suffix(config.get_config_entry("header_file_extension"))
+            file_path: Path = extension_header_path(extension)
             tsl_file: TSLHeaderFile = TSLHeaderFile.create_from_dict(file_path, extension.data)
             tsl_file.add_code(config.get_template("core::extension").render(extension.data))
             self.log(logging.INFO,
@@ -77,93 +107,46 @@ class TSLFileGenerator:
             self.__extension_name_to_file_dict[extension.name] = tsl_file
 
     def __create_primitive_header_files(self, extension_set: TSLExtensionSet,
-                                        primitive_class_set: TSLPrimitiveClassSet):
+                                        primitive_class_set: TSLPrimitiveClassSet,
+                                        dependency_map: Union[DependencyMap, None]):
+        """
+        Renders the declaration header and one definition header per target extension for every primitive class.
+        The (primitive class x extension) parts are rendered by a pool of worker processes and assembled in a
+        deterministic order afterwards.
+        """
         self.log(logging.INFO, f"Starting generation of primitive header.")
-        for primitive_class in primitive_class_set:
-            declaration_file_path: Path = config.get_generation_path("primitive_declarations").joinpath(
-                primitive_class.file_name).joinpath(primitive_class.name).with_suffix(
-                config.get_config_entry("header_file_extension"))
-            declaration_file: TSLHeaderFile = TSLHeaderFile.create_from_dict(declaration_file_path,
-                                                                             primitive_class.data)
-
-            definition_files_per_extension_dict: Dict[str, TSLHeaderFile] = dict()
-
-            #get all declarations and there overloads
-            primitive_with_overloads_dict = {}
-            for primitive in primitive_class:
-                if primitive.declaration.name not in primitive_with_overloads_dict:
-                    primitive_with_overloads_dict[primitive.declaration.name] = [primitive.declaration.name]
-                if primitive.declaration.name != primitive.declaration.functor_name:
-                    primitive_with_overloads_dict[primitive.declaration.name].append(primitive.declaration.functor_name)
-            
-            previous_declarations_dict = {}
-            for _,v in primitive_with_overloads_dict.items():
-                if len(v) > 1:
-                    for i in range(1, len(v)):
-                        previous_declarations_dict[v[i]] = v[:i]                    
-            # for k, v in previous_declarations_dict.items():
-            #     print(f"Previous overload for {k}: {v}")
-            
-            for primitive in primitive_class:
-                declaration_data = copy.deepcopy(primitive.declaration.data)
-                if primitive.declaration.functor_name in previous_declarations_dict:
-                    declaration_data["previous_overloads"] = previous_declarations_dict[primitive.declaration.functor_name]
-                declaration_data["tsl_function_doxygen"] = config.get_template("core::doxygen_function").render(
-                    declaration_data)
-                declaration_file.add_code(
-                    config.get_template("core::primitive_declaration").render(declaration_data))
-                declaration_file.import_includes(declaration_data)
-
-                # print(primitive)
-
-                for definition in primitive.definitions:
-                    if definition.target_extension not in definition_files_per_extension_dict:
-                        primitive_path: Path = config.get_generation_path("primitive_definitions").joinpath(
-                            primitive_class.file_name).joinpath(primitive_class.name).joinpath(
-                            f"{primitive_class.name}_{definition.target_extension}").with_suffix(
-                            config.get_config_entry("header_file_extension"))
-                        definition_files_per_extension_dict[
-                            definition.target_extension] = TSLHeaderFile.create_from_dict(primitive_path,
-                                                                                          primitive_class.data)
-                    definition_file: TSLHeaderFile = definition_files_per_extension_dict[definition.target_extension]
-
-                    # print(definition)
-
-                    definition_copy = copy.deepcopy(definition.data)
-
-                    for ctype, additional_simd_template_base_type in definition.types:
-                        definition_copy["ctype"] = ctype
-                        definition_copy["additional_simd_template_base_type"] = additional_simd_template_base_type
-                        decl_and_def_combined_data = { **extension_set.get_extension_by_name(
-                            definition.target_extension).data, **declaration_data, **definition_copy }
-                        decl_and_def_combined_data["implementation"] = config.create_template(
-                            definition_copy["implementation"]).render(
-                            decl_and_def_combined_data)
-                        definition_file.add_code(
-                            config.get_template("core::primitive_definition").render(decl_and_def_combined_data))
-                        self.log(logging.INFO,
-                                 f"Created template specialization for {primitive.declaration.name} (details::{primitive.declaration.name}_impl<simd<{ctype}, {definition.target_extension}>>)")
-
-                    definition_file.import_includes(definition.data)
-                    declaration_file.import_includes(definition.data)
-                    definition_file.add_file_include(declaration_file)
-
+        primitive_classes: List[TSLPrimitiveClass] = list(primitive_class_set)
+        render_jobs: List[Tuple[int, Union[str, None]]] = []
+        for primitive_class_idx, primitive_class in enumerate(primitive_classes):
+            render_jobs.append((primitive_class_idx, None))
+            for target_extension in primitive_class_target_extensions(primitive_class):
+                render_jobs.append((primitive_class_idx, target_extension))
+        rendered_parts: Iterator[TSLRenderedPart] = iter(
+            render_primitive_parts(extension_set, primitive_classes, render_jobs, dependency_map))
+
+        for primitive_class in primitive_classes:
+            declaration_file: TSLHeaderFile = self.__assemble_header_file(next(rendered_parts), primitive_class.data)
             self.__primitive_class_declarations.append(declaration_file)
-            self.__primitive_class_definitions.extend(definition_files_per_extension_dict.values())
+            for _ in primitive_class_target_extensions(primitive_class):
+                definition_file: TSLHeaderFile = self.__assemble_header_file(next(rendered_parts),
+                                                                             primitive_class.data)
+                definition_file.add_file_include(declaration_file)
+                self.__primitive_class_definitions.append(definition_file)
+        self.log(logging.INFO, f"Rendered {len(render_jobs)} primitive header parts.")
+
+    @staticmethod
+    def __assemble_header_file(rendered_part: TSLRenderedPart, data_dict: YamlDataType) -> TSLHeaderFile:
+        header_file: TSLHeaderFile = TSLHeaderFile.create_from_dict(rendered_part.file_name, data_dict)
+        for code in rendered_part.codes:
+            header_file.add_code(code)
+        for include in rendered_part.includes:
+            header_file.add_include(include)
+        return header_file
 
     def __create_static_header_files(self) -> None:
         self.log(logging.INFO, f"Starting generation of static header.")
         for static_yaml_file_path in config.static_lib_files():
-            if static_yaml_file_path.stem == config.lib_root_header.stem:
-                file_path = config.lib_root_header
-            else:
-                static_file_path_without_prefix = strip_common_path_prefix(static_yaml_file_path,
-                                                                           config.static_lib_files_root_path)
-                static_file_name = static_file_path_without_prefix.name
-                static_file_path = static_file_path_without_prefix.parent
-                file_path: Path = config.lib_static_files_root_path.joinpath(static_file_path).joinpath(
-                    static_file_name).with_suffix(config.get_config_entry("header_file_extension"))
-
+            file_path: Path = static_header_path(static_yaml_file_path)
             data_dict: YamlDataType = yaml_load(static_yaml_file_path)
             tsl_file: TSLHeaderFile = TSLHeaderFile.create_from_dict(file_path, data_dict)
             if "implementations" in data_dict:
@@ -182,14 +165,15 @@ class TSLFileGenerator:
         return result
 
     @LogInit()
-    def __init__(self, lib: TSLLib, dependency_graph: TSLDependencyGraph) -> None:
+    def __init__(self, lib: TSLLib, dependency_graph: TSLDependencyGraph,
+                 dependency_map: Union[DependencyMap, None] = None) -> None:
         self.__static_files: List[TSLHeaderFile] = []
         self.__extension_name_to_file_dict: Dict[str, TSLHeaderFile] = {}
         self.__primitive_class_declarations: List[TSLHeaderFile] = []
         self.__primitive_class_definitions: List[TSLHeaderFile] = []
 
         self.__create_extension_header_files(lib.extension_set)
-        self.__create_primitive_header_files(lib.extension_set, lib.primitive_class_set)
+        self.__create_primitive_header_files(lib.extension_set, lib.primitive_class_set, dependency_map)
 
         self.__create_static_header_files()
         # dep_graph = TSLDependencyGraph(lib)
@@ -199,10 +183,11 @@ class TSLFileGenerator:
         sorted_classes_prefix: List[str] = [p for p in dependency_graph.sorted_classes_as_string()]
         print("Sorting includes according to the following order: " + ", ".join(sorted_classes_prefix))
         include_order_dict = {prefix: index for index, prefix in enumerate(sorted_classes_prefix)}
-        include_sort_fun = lambda x: [include_order_dict[ref] for ref in sorted_classes_prefix if x.file_name.stem.startswith(ref)]
+        # the file name breaks ties between the definition files of a primitive class
+        include_sort_fun = lambda x: ([include_order_dict[ref] for ref in sorted_classes_prefix if x.file_name.stem.startswith(ref)], f"{x.file_name}")
 
         generated_files_root: TSLHeaderFile = TSLHeaderFile.create_from_dict(config.lib_generated_files_root_header, {})
-        for extension_file in self.extension_files:
+        for extension_file in sorted(self.extension_files, key=lambda x: f"{x.file_name}"):
             generated_files_root.add_file_include(extension_file)
         # for primitive_declaration in self.__sort_header_files(ordered_primitive_classes, list(self.primitive_declaration_files)):
         for primitive_declaration in sorted(self.primitive_declaration_files, key=include_sort_fun):
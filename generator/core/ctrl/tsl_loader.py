@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from generator.core.tsl_config import config
+from generator.utils.document_cache import DocumentCache
+from generator.utils.yaml_schema import Schema
+from generator.utils.yaml_utils import YamlDataType, yaml_load, yaml_load_all, yaml_load_document_with_origin
+
+
+@dataclass
+class TSLDataFileLoadResult:
+    """
+    Result of loading and validating a single extension or primitive class file.
+    For primitive class files, the first document describes the primitive class and all subsequent documents describe
+    primitives. If the file could not be validated, documents is None.
+    """
+    file: Path
+    kind: str
+    documents: Union[List[YamlDataType], None] = None
+    from_cache: bool = False
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+
+def _recover_origin(file: Path, document_index: int, schema: Schema, error: Exception,
+                    yaml_document: YamlDataType) -> Tuple[Exception, YamlDataType]:
+    """
+    Documents are loaded without line annotations if lazy origin lines are enabled. In that case, the offending
+    document is parsed again with line annotations and validated once more, to get an error which points to the
+    origin of the problem.
+    """
+    if not config.yaml_lazy_origin_lines or \
+            not isinstance(error, (Schema.TypeCastError, Schema.RequiredFieldError, Schema.UnknownTypeError)):
+        return error, yaml_document
+    try:
+        annotated_document = yaml_load_document_with_origin(file, document_index)
+        schema.validate(annotated_document)
+    except Exception as annotated_error:
+        return annotated_error, annotated_document
+    return error, yaml_document
+
+
+def _validate_extension_documents(result: TSLDataFileLoadResult) -> None:
+    schema = config.get_schema("extension")
+    yaml_document = None
+    try:
+        yaml_document = yaml_load(result.file, **config.yaml_loader_params())
+        result.documents = [schema.validate(yaml_document)]
+    except Exception as e:
+        e, _ = _recover_origin(result.file, 0, schema, e, yaml_document)
+        result.errors.append(f"Error while validating extension {result.file}. Exception: {str(e)}")
+
+
+def _validate_primitive_class_documents(result: TSLDataFileLoadResult) -> None:
+    class_schema = config.get_schema("primitive_class")
+    primitive_schema = config.get_schema("primitive")
+
+    documents: List[YamlDataType] = []
+    for document_index, yaml_document in enumerate(yaml_load_all(result.file, **(config.yaml_loader_params()))):
+        if document_index == 0:
+            try:
+                documents.append(class_schema.validate(yaml_document))
+            except Exception as e:
+                e, _ = _recover_origin(result.file, document_index, class_schema, e, yaml_document)
+                result.errors.append(f"Error while validating Primitive class in file {result.file}. "
+                                     f"Exception: {str(e)}.")
+                return
+        else:
+            try:
+                documents.append(primitive_schema.validate(yaml_document))
+            except Exception as e:
+                e, yaml_document = _recover_origin(result.file, document_index, primitive_schema, e, yaml_document)
+                result.errors.append(f"Error while validating Primitive class in file {result.file} with "
+                                     f"primitive data ({yaml_document}). "
+                                     f"Exception: {str(e)}.")
+    if len(documents) > 0:
+        result.documents = documents
+
+
+def load_data_file(job: Tuple[str, Path, Union[DocumentCache, None], Union[str, None]]) -> TSLDataFileLoadResult:
+    """
+    Loads and validates an extension or primitive class file. The validated documents are taken from (and stored to)
+    the document cache, if one is given. Invalid primitives are skipped and reported within the errors of the result.
+    This function is executed within worker processes, thus it must not alter any shared state.
+    :param job: Tuple of kind ('extension' or 'primitive_class'), path to the file, document cache and the (optional)
+    content digest of the file.
+    :return: Result containing the validated documents.
+    """
+    kind, file, document_cache, content_digest = job
+    result = TSLDataFileLoadResult(file, kind)
+    if document_cache is not None:
+        result.documents = document_cache.get(file, content_digest)
+        if result.documents is not None:
+            result.from_cache = True
+            return result
+    if kind == "extension":
+        _validate_extension_documents(result)
+    else:
+        _validate_primitive_class_documents(result)
+    # only completely valid files are cached, so errors are reported on every run
+    if document_cache is not None and result.documents is not None and len(result.errors) == 0:
+        try:
+            document_cache.put(file, result.documents, content_digest)
+        except Exception as e:
+            result.warnings.append(f"Could not cache validated documents of {file}. Exception: {str(e)}")
+    return result
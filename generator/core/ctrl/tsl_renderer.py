@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Set, Tuple, Union
+
+from generator.core.model.tsl_extension import TSLExtensionSet
+from generator.core.model.tsl_file import TSLHeaderFile, TSLSourceFile
+from generator.core.model.tsl_primitive import TSLPrimitive, TSLPrimitiveClass
+from generator.core.tsl_config import config
+from generator.utils.dependency_map import DependencyMap
+from generator.utils.dict_utils import stable_digest
+from generator.utils.parallel_utils import parallel_map
+
+
+@dataclass
+class TSLRenderedPart:
+    """
+    Rendered content of a single primitive class header (declarations or the definitions for a single extension).
+    The codes and includes are in the order in which they have to be added to the header file. Templates holds the
+    template files which were used for rendering.
+    """
+    file_name: Path
+    codes: List[str] = field(default_factory=list)
+    includes: List[str] = field(default_factory=list)
+    templates: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TSLRenderedFile:
+    """
+    Final text of a generated file.
+    """
+    file_name: Path
+    text: str
+
+
+# Render jobs are executed within forked worker processes, which inherit the (unpicklable) model through these
+# module level variables. They are only set for the duration of a render call.
+_primitive_render_context: Union[Tuple[TSLExtensionSet, List[TSLPrimitiveClass]], None] = None
+_file_render_context: Union[List[Union[TSLHeaderFile, TSLSourceFile]], None] = None
+
+
+def primitive_declaration_path(primitive_class: TSLPrimitiveClass) -> Path:
+    return config.get_generation_path("primitive_declarations").joinpath(
+        primitive_class.file_name).joinpath(primitive_class.name).with_suffix(
+        config.get_config_entry("header_file_extension"))
+
+
+def primitive_definition_path(primitive_class: TSLPrimitiveClass, target_extension: str) -> Path:
+    return config.get_generation_path("primitive_definitions").joinpath(
+        primitive_class.file_name).joinpath(primitive_class.name).joinpath(
+        f"{primitive_class.name}_{target_extension}").with_suffix(
+        config.get_config_entry("header_file_extension"))
+
+
+def primitive_class_target_extensions(primitive_class: TSLPrimitiveClass) -> List[str]:
+    """
+    :return: Target extensions of all definitions of the primitive class in the order of their first occurrence.
+    """
+    return list(dict.fromkeys(
+        definition.target_extension for primitive in primitive_class for definition in primitive.definitions))
+
+
+TEMPLATE_INPUT_PREFIX: str = "template:"
+
+
+def template_inputs(template_files: Set[str]) -> Dict[str, str]:
+    """
+    :return: Dependency map inputs for the given template files.
+    """
+    return {f"{TEMPLATE_INPUT_PREFIX}{template_file}": config.template_file_digest(template_file)
+            for template_file in sorted(template_files)}
+
+
+def recorded_input_digest(input_key: str) -> Union[str, None]:
+    """
+    Computes the current digest of an input which was recorded during rendering. Only templates are recorded during
+    rendering, all other inputs are known upfront.
+    """
+    if input_key.startswith(TEMPLATE_INPUT_PREFIX):
+        return config.template_file_digest(input_key[len(TEMPLATE_INPUT_PREFIX):])
+    return None
+
+
+def _primitive_digest(primitive: TSLPrimitive, target_extension: Union[str, None]) -> str:
+    if target_extension is None:
+        # declarations only import the includes of the definitions
+        return stable_digest([primitive.declaration.data] + [
+            definition.data.get("includes") for definition in primitive.definitions])
+    return stable_digest([primitive.declaration.data] + [
+        [definition.data, list(definition.types)] for definition in primitive.definitions
+        if definition.target_extension == target_extension])
+
+
+def primitive_part_inputs(extension_set: TSLExtensionSet, primitive_class: TSLPrimitiveClass,
+                          target_extension: Union[str, None]) -> Dict[str, str]:
+    """
+    Determines the (sliced) documents a primitive class header is derived from. The declarations depend on all
+    primitives of the class, the definitions for an extension only on the primitives which are defined for it.
+    :return: Digest for every input, keyed by the kind and name of the input.
+    """
+    primitives: List[TSLPrimitive] = list(primitive_class)
+    # the order of the primitives and their overloads are part of the rendered header
+    inputs: Dict[str, str] = {
+        f"primitive_class:{primitive_class.name}": stable_digest(
+            [primitive_class.data, [primitive.declaration.functor_name for primitive in primitives]])
+    }
+    if target_extension is not None:
+        inputs[f"extension:{target_extension}"] = stable_digest(
+            extension_set.get_extension_by_name(target_extension).data)
+    for primitive in primitives:
+        if target_extension is None or any(definition.target_extension == target_extension
+                                           for definition in primitive.definitions):
+            inputs[f"primitive:{primitive_class.name}::{primitive.declaration.functor_name}"] = \
+                _primitive_digest(primitive, target_extension)
+    return inputs
+
+
+def _previous_declarations(primitive_class: TSLPrimitiveClass) -> Dict[str, List[str]]:
+    # get all declarations and there overloads
+    primitive_with_overloads_dict = {}
+    for primitive in primitive_class:
+        if primitive.declaration.name not in primitive_with_overloads_dict:
+            primitive_with_overloads_dict[primitive.declaration.name] = [primitive.declaration.name]
+        if primitive.declaration.name != primitive.declaration.functor_name:
+            primitive_with_overloads_dict[primitive.declaration.name].append(primitive.declaration.functor_name)
+
+    previous_declarations_dict = {}
+    for _, v in primitive_with_overloads_dict.items():
+        if len(v) > 1:
+            for i in range(1, len(v)):
+                previous_declarations_dict[v[i]] = v[:i]
+    return previous_declarations_dict
+
+
+def _declaration_data(primitive: TSLPrimitive, previous_declarations_dict: Dict[str, List[str]]) -> dict:
+    declaration_data = copy.deepcopy(primitive.declaration.data)
+    if primitive.declaration.functor_name in previous_declarations_dict:
+        declaration_data["previous_overloads"] = previous_declarations_dict[primitive.declaration.functor_name]
+    declaration_data["tsl_function_doxygen"] = config.get_template("core::doxygen_function").render(
+        declaration_data)
+    return declaration_data
+
+
+def _render_primitive_declarations(primitive_class: TSLPrimitiveClass) -> TSLRenderedPart:
+    declaration_file: TSLHeaderFile = TSLHeaderFile.create_from_dict(primitive_declaration_path(primitive_class),
+                                                                     primitive_class.data)
+    previous_declarations_dict = _previous_declarations(primitive_class)
+    for primitive in primitive_class:
+        declaration_data = _declaration_data(primitive, previous_declarations_dict)
+        declaration_file.add_code(
+            config.get_template("core::primitive_declaration").render(declaration_data))
+        declaration_file.import_includes(declaration_data)
+        for definition in primitive.definitions:
+            declaration_file.import_includes(definition.data)
+    templates = config.template_dependencies("core::doxygen_function") | \
+        config.template_dependencies("core::primitive_declaration")
+    return TSLRenderedPart(declaration_file.file_name, declaration_file.data["codes"],
+                           declaration_file.data["includes"], sorted(templates))
+
+
+def _render_primitive_definitions(extension_set: TSLExtensionSet, primitive_class: TSLPrimitiveClass,
+                                   target_extension: str) -> TSLRenderedPart:
+    definition_file: TSLHeaderFile = TSLHeaderFile.create_from_dict(
+        primitive_definition_path(primitive_class, target_extension), primitive_class.data)
+    extension_data = extension_set.get_extension_by_name(target_extension).data
+    previous_declarations_dict = _previous_declarations(primitive_class)
+    templates = config.template_dependencies("core::doxygen_function") | \
+        config.template_dependencies("core::primitive_definition")
+    for primitive in primitive_class:
+        declaration_data = None
+        for definition in primitive.definitions:
+            if definition.target_extension != target_extension:
+                continue
+            if declaration_data is None:
+                declaration_data = _declaration_data(primitive, previous_declarations_dict)
+            definition_copy = copy.deepcopy(definition.data)
+            templates |= config.template_source_dependencies(definition_copy["implementation"])
+            for ctype, additional_simd_template_base_type in definition.types:
+                definition_copy["ctype"] = ctype
+                definition_copy["additional_simd_template_base_type"] = additional_simd_template_base_type
+                decl_and_def_combined_data = {**extension_data, **declaration_data, **definition_copy}
+                decl_and_def_combined_data["implementation"] = config.create_template(
+                    definition_copy["implementation"]).render(
+                    decl_and_def_combined_data)
+                definition_file.add_code(
+                    config.get_template("core::primitive_definition").render(decl_and_def_combined_data))
+            definition_file.import_includes(definition.data)
+    return TSLRenderedPart(definition_file.file_name, definition_file.data["codes"],
+                           definition_file.data["includes"], sorted(templates))
+
+
+def _render_primitive_part(job: Tuple[int, Union[str, None]]) -> TSLRenderedPart:
+    extension_set, primitive_classes = _primitive_render_context
+    primitive_class_idx, target_extension = job
+    if target_extension is None:
+        return _render_primitive_declarations(primitive_classes[primitive_class_idx])
+    return _render_primitive_definitions(extension_set, primitive_classes[primitive_class_idx], target_extension)
+
+
+def render_primitive_parts(extension_set: TSLExtensionSet, primitive_classes: List[TSLPrimitiveClass],
+                           jobs: List[Tuple[int, Union[str, None]]],
+                           dependency_map: Union[DependencyMap, None] = None) -> List[TSLRenderedPart]:
+    """
+    Renders the declaration and definition headers of primitive classes using a pool of worker processes.
+    If a dependency map is given, only parts whose inputs changed since the last run are rendered.
+    :param extension_set: Relevant extensions.
+    :param primitive_classes: Relevant primitive classes.
+    :param jobs: List of (index of the primitive class, target extension). If the target extension is None, the
+    declarations of the primitive class are rendered.
+    :param dependency_map: Map of the previously rendered parts.
+    :return: Rendered parts in the order of jobs.
+    """
+    global _primitive_render_context
+    results: List[Union[TSLRenderedPart, None]] = [None] * len(jobs)
+    job_inputs: List[Dict[str, str]] = [dict()] * len(jobs)
+    if dependency_map is not None:
+        for job_idx, (primitive_class_idx, target_extension) in enumerate(jobs):
+            primitive_class = primitive_classes[primitive_class_idx]
+            job_inputs[job_idx] = primitive_part_inputs(extension_set, primitive_class, target_extension)
+            file_name = primitive_declaration_path(primitive_class) if target_extension is None else \
+                primitive_definition_path(primitive_class, target_extension)
+            payload = dependency_map.lookup(f"{file_name}", job_inputs[job_idx], recorded_input_digest)
+            if payload is not None:
+                results[job_idx] = TSLRenderedPart(file_name, *payload)
+    pending: List[int] = [job_idx for job_idx, result in enumerate(results) if result is None]
+    _primitive_render_context = (extension_set, primitive_classes)
+    try:
+        rendered_parts = parallel_map(_render_primitive_part, [jobs[job_idx] for job_idx in pending], config.jobs)
+    finally:
+        _primitive_render_context = None
+    for job_idx, rendered_part in zip(pending, rendered_parts):
+        results[job_idx] = rendered_part
+        if dependency_map is not None:
+            dependency_map.store(
+                f"{rendered_part.file_name}", {**job_inputs[job_idx], **template_inputs(set(rendered_part.templates))},
+                (rendered_part.codes, rendered_part.includes, rendered_part.templates))
+    return results
+
+
+def _render_file(file_idx: int) -> TSLRenderedFile:
+    tsl_file = _file_render_context[file_idx]
+    return TSLRenderedFile(tsl_file.file_name, tsl_file.render())
+
+
+def render_files(tsl_files: List[Union[TSLHeaderFile, TSLSourceFile]]) -> List[TSLRenderedFile]:
+    """
+    Renders the final text of header and source files using a pool of worker processes.
+    :param tsl_files: Files which should be rendered.
+    :return: Rendered files in the order of tsl_files.
+    """
+    global _file_render_context
+    _file_render_context = tsl_files
+    try:
+        return parallel_map(_render_file, list(range(len(tsl_files))), config.jobs)
+    finally:
+        _file_render_context = None
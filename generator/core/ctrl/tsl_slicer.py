@@ -1,9 +1,9 @@
-import copy
 import logging
-from copy import deepcopy
-from typing import List, Dict, Set
+from copy import copy
+from typing import List, Dict, Set, Union
 
-from generator.core.model.tsl_extension import TSLExtensionSet
+from generator.core.model.tsl_extension import TSLExtension, TSLExtensionSet
+from generator.core.model.tsl_lscpu_flags import lscpu_flags
 from generator.core.model.tsl_primitive import TSLPrimitiveClassSet, TSLPrimitiveClass, TSLPrimitive
 from generator.utils.dict_utils import intersects, deep_update_dict
 from generator.utils.log_utils import LogInit, log
@@ -11,81 +11,71 @@ from generator.utils.requirement import requirement
 
 
 class TSLSlicer:
+    """
+    Reduces the loaded model to the extensions and primitive definitions which are relevant for the requested lscpu
+    flags and types. The sliced sets are views, which share all unchanged extensions, declarations and definitions with
+    the model. Thus, their data must not be modified in place.
+    """
     @LogInit()
     def __init__(self, relevant_hardware_flags: List[str] = None, relevant_types: List[str] = []):
         self.__relevant_hardware_flags: List[str] = relevant_hardware_flags
+        self.__relevant_hardware_flags_mask: Union[int, None] = TSLSlicer.__flags_mask(relevant_hardware_flags)
         self.__relevant_types: Set[str] = set(relevant_types)
-        # self.__relevant_hardware_flags_set: Set[str] = set(relevant_hardware_flags)
+
+    @staticmethod
+    def __flags_mask(relevant_hardware_flags: Union[List[str], None]) -> Union[int, None]:
+        """
+        :return: Bitmask of the relevant flags or None, if all extensions and primitives are relevant.
+        """
+        if (relevant_hardware_flags is None) or (len(relevant_hardware_flags) == 0):
+            return None
+        return lscpu_flags.mask(relevant_hardware_flags)
 
     def update_relevant_flags(self, relevant_hardware_flags: List[str]): 
         self.__relevant_hardware_flags = relevant_hardware_flags
+        self.__relevant_hardware_flags_mask = TSLSlicer.__flags_mask(relevant_hardware_flags)
 
-    @requirement(data_dict="NotNone")
-    def is_extension_relevant(self, data_dict: dict) -> bool:
+    @requirement(extension="NotNone")
+    def is_extension_relevant(self, extension: TSLExtension) -> bool:
         """
         Checks whether a specific SIMD-Extension is relevant (/requested). If relevant_lscpu_flags is None or empty, all
         extensions are of interest and the method returns True. If the extension does not have any lscpu_flags specified
          it will also be of interest and consequently, the method returns True.
         If both lists (parameter and user-data) are not empty, the method returns True, if the lscpu-flags of the
         extension has a non-empty set-intersection with the lscpu-flags list, given as parameter.
-        :param relevant_lscpu_flags:
+        :param extension:
         :return:
         """
-        if (self.__relevant_hardware_flags is None) or (len(self.__relevant_hardware_flags) == 0):
-            return True
-        if len(data_dict["lscpu_flags"]) == 0:
+        if self.__relevant_hardware_flags_mask is None:
             return True
-        return len((set(data_dict["lscpu_flags"]) & set(self.__relevant_hardware_flags))) > 0
+        return extension.lscpu_flag_requirement.intersects(self.__relevant_hardware_flags_mask)
 
-    @requirement(data_dict="NotNone")
-    def is_primitive_relevant(self, data_dict: dict) -> bool:
+    @requirement(definition="NotNone")
+    def is_primitive_relevant(self, definition: TSLPrimitive.Definition) -> bool:
         """
-        Checks whether a specific SIMD-Extension is relevant (/requested). If relevant_lscpu_flags is None or empty, all
-        extensions are of interest and the method returns True. If the extension does not have any lscpu_flags specified
-         it will also be of interest and consequently, the method returns True.
-        If both lists (parameter and user-data) are not empty, the method returns True, if the lscpu-flags of the
-        extension has a non-empty set-intersection with the lscpu-flags list, given as parameter.
-        :param relevant_lscpu_flags:
+        Checks whether a specific primitive definition is relevant (/requested). If relevant_lscpu_flags is None or
+        empty, all definitions are of interest and the method returns True. If the definition does not have any
+        lscpu_flags specified it will also be of interest and consequently, the method returns True.
+        Otherwise, the method returns True, if all lscpu-flags of the definition are relevant. If the lscpu-flags form
+        a disjunction of groups (e.g., ["['avx512f', 'avx512bw']", "['avx512f']"]), all lscpu-flags of any group have
+        to be relevant.
+        :param definition:
         :return:
-        @todo: split this method into two methods (dedicated for extension and primitive). the given implementation targets only extensions!
-        prim: ["sse2", "sse4.1"]
-        rel_hw_f: ["sse2"]
-        @todo: prim.issubset(rel_hw_f)
         """
-        if (self.__relevant_hardware_flags is None) or (len(self.__relevant_hardware_flags) == 0):
-            return True
-        if len(data_dict["lscpu_flags"]) == 0:
+        if self.__relevant_hardware_flags_mask is None:
             return True
-        if self.has_lscpu_disjunction(data_dict):
-            for group in data_dict["lscpu_flags"]:
-                elements = group.strip("[").strip("]").replace("'","").replace(" ","")
-                parsed_group = elements.split(",")
-                if (set(parsed_group).issubset(set(self.__relevant_hardware_flags))):
-                    data_dict["lscpu_flags"] = set(parsed_group)
-                    return True
-            return False
-        else:
-            return (set(data_dict["lscpu_flags"]).issubset(set(self.__relevant_hardware_flags)))
-
-    def has_lscpu_disjunction(self, data_dict: dict) -> bool:
-        if len(set(data_dict["lscpu_flags"])) <= 1:
-            return False
-        else:
-            for flag in set(data_dict["lscpu_flags"]):
-                if "[" in flag and "]" in flag:
-                    return True
-            return False
+        return definition.lscpu_flag_requirement.is_satisfied_by(self.__relevant_hardware_flags_mask)
 
     @log
     def slice_extensions(self, extension_set: TSLExtensionSet) -> TSLExtensionSet:
         if self.__relevant_hardware_flags is None:
-            return deepcopy(extension_set)
+            return copy(extension_set)
         self.log(logging.INFO, f"Slicing Extensions for {self.__relevant_hardware_flags}")
         result = TSLExtensionSet()
         for extension in extension_set:
-            if self.is_extension_relevant(extension.data):
+            if self.is_extension_relevant(extension):
                 self.log(logging.DEBUG, f"Found relevant extension {extension.name}.")
-                result.add_extension(deepcopy(extension), logging.WARNING)
+                result.add_extension(extension, logging.WARNING)
         return result
 
     def __is_definition_relevant(self, definition: TSLPrimitive.Definition) -> bool:
@@ -100,52 +90,58 @@ class TSLSlicer:
     #     definition.ctypes = list((set(definition.ctypes)).intersection(self.__relevant_types))
     @log
     def __slice_primitive(self, primitive: TSLPrimitive) -> TSLPrimitive:
-        relevant_hw_flags_set: Set[str] = set(self.__relevant_hardware_flags)
+        """
+        Slices the definitions of a primitive. The sliced primitive shares the declaration and all definitions which
+        are used unchanged with the given primitive. Only definitions whose lscpu flags or types are reduced are
+        replaced by overlays (see TSLPrimitive.Definition.with_types), which still share all other data.
+        """
+        relevant_hw_flags_mask: Union[int, None] = self.__relevant_hardware_flags_mask
+        # no flags are relevant for ranking similar definitions, if all flags are of interest
+        ranking_flags_mask: int = relevant_hw_flags_mask if relevant_hw_flags_mask is not None else 0
+        relevant_types: List[str] = list(self.__relevant_types)
         definitions: Dict[str, List[TSLPrimitive.Definition]] = dict()
         for definition in primitive.definitions:
-            copied_definition: TSLPrimitive.Definition = copy.deepcopy(definition)
-            if self.is_primitive_relevant(copied_definition.data) and self.__is_definition_relevant(copied_definition):
-                copied_definition.update_types(list(self.__relevant_types))
-                # copied_definition.ctypes = list((set(copied_definition.ctypes)).intersection(self.__relevant_types))
-                # copied_definition.additional_simd_template_base_types = list((set(copied_definition.additional_simd_template_base_types)).intersection(self.__relevant_types))
-                if copied_definition.target_extension not in definitions:
-                    definitions[copied_definition.target_extension] = [copied_definition]
+            if self.is_primitive_relevant(definition) and self.__is_definition_relevant(definition):
+                sliced_definition: TSLPrimitive.Definition = definition
+                if relevant_hw_flags_mask is not None and sliced_definition.lscpu_flag_requirement.is_disjunction:
+                    sliced_definition = sliced_definition.with_lscpu_flag_group(
+                        sliced_definition.lscpu_flag_requirement.satisfied_term(relevant_hw_flags_mask))
+                sliced_definition = sliced_definition.with_types(relevant_types)
+                if sliced_definition.target_extension not in definitions:
+                    definitions[sliced_definition.target_extension] = [sliced_definition]
                 else:
+                    present_definitions = definitions[sliced_definition.target_extension]
                     #Greedy search for better fitting definitions
-                    for d in definitions[copied_definition.target_extension]:
+                    for idx, d in enumerate(present_definitions):
                         #if the current definition is not similar (same target extension and at least one equal ctype) to the already present definition, continue
-                        if not d.is_similar(copied_definition):
+                        if not d.is_similar(sliced_definition):
                             continue
                         else:
-                            if d.greater_than(copied_definition, relevant_hw_flags_set):
+                            if d.greater_than(sliced_definition, ranking_flags_mask):
                                 #if present definition is better fitting, remove all ctypes from definition which also exist in the present definition.
-                                copied_definition.remove_ctypes(d.ctypes)
+                                sliced_definition = sliced_definition.without_ctypes(d.ctypes)
                             else:
                                 #if current definition is better fitting, remove all ctypes from present one which exist in the current definition
-                                d.remove_ctypes(copied_definition.ctypes)
-                        if len(copied_definition.ctypes) == 0:
+                                present_definitions[idx] = d.without_ctypes(sliced_definition.ctypes)
+                        if len(sliced_definition.ctypes) == 0:
                             #if no ctypes are relevant for the current definition we do not have to do anything and can break out
                             break
-                    definitions[copied_definition.target_extension] = [d for d in definitions[copied_definition.target_extension] if len(d.ctypes)>0]
-                    if len(copied_definition.ctypes) > 0:
-                        definitions[copied_definition.target_extension].append(copied_definition)
-
-                # definitions.append(deepcopy(definition))
+                    definitions[sliced_definition.target_extension] = [d for d in present_definitions if len(d.ctypes)>0]
+                    if len(sliced_definition.ctypes) > 0:
+                        definitions[sliced_definition.target_extension].append(sliced_definition)
 
         if len(definitions) > 0:
             defs = []
             for val in definitions.values():
                 defs.extend(val)
-            return TSLPrimitive(deepcopy(primitive.declaration), defs)
-            # return TSLPrimitive(deepcopy(primitive.declaration),
-            #                 definitions)
+            return TSLPrimitive(primitive.declaration, defs)
         else:
             return None
 
     @log
     def slice_primitives(self, primitive_class_set: TSLPrimitiveClassSet) -> TSLPrimitiveClassSet:
         if self.__relevant_hardware_flags is None:
-            return deepcopy(primitive_class_set)
+            return copy(primitive_class_set)
         self.log(logging.INFO, f"Slicing Primitives for {self.__relevant_hardware_flags}")
         result = TSLPrimitiveClassSet()
         for primitive_class in primitive_class_set:
@@ -5,6 +5,7 @@ from copy import deepcopy
 from pathlib import Path
 from typing import Set, List, Tuple
 
+from generator.core.model.tsl_lscpu_flags import TSLLscpuFlagRequirement
 from generator.core.tsl_config import config
 from generator.utils.log_utils import LogInit
 from generator.utils.requirement import requirement
@@ -16,11 +17,16 @@ class TSLExtension:
     def __init__(self, path: Path, data_dict: YamlDataType) -> None:
         self.__file_path = path
         self.__data_dict = data_dict
+        self.__lscpu_flag_requirement = TSLLscpuFlagRequirement(self.__data_dict["lscpu_flags"])
 
     @property
     def data(self) -> YamlDataType:
         return self.__data_dict
 
+    @property
+    def lscpu_flag_requirement(self) -> TSLLscpuFlagRequirement:
+        return self.__lscpu_flag_requirement
+
     @property
     def name(self) -> str:
         return self.__data_dict["extension_name"]
@@ -115,8 +121,20 @@ class TSLExtensionSet:
             setattr(result, k, deepcopy(v, memodict))
         return result
 
+    def __copy__(self):
+        """
+        Creates a view of the extension set, which shares the extensions.
+        """
+        cls = self.__class__
+        result = cls.__new__(cls)
+        result.__dict__.update(self.__dict__)
+        result.__extensions = set(self.__extensions)
+        return result
+
     def __iter__(self):
-        for extension in self.__extensions:
+        # the iteration order of a set depends on the string hashes of the current process, thus the extensions are
+        # ordered by their sort keys to generate identical outputs in every run
+        for extension in sorted(self.__extensions, key=lambda extension: extension.sort_keys):
             yield extension
 
     def __str__(self):
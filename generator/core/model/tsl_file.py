@@ -9,10 +9,24 @@ from jinja2 import Template
 
 from generator.core.tsl_config import config
 from generator.utils.log_utils import LogInit
+from generator.utils.output_writer import output_writer
 from generator.utils.requirement import requirement
 from generator.utils.yaml_utils import YamlDataType
 
 
+def output_relative_path(filename: Path) -> Path:
+    """
+    Generated files refer to themselves (doxygen file command, include guard) relative to the output directory, thus
+    their content does not depend on the location of the output directory.
+    :param filename: Path of a generated file.
+    :return: Path relative to the output directory or the path itself, if it is located outside of it.
+    """
+    try:
+        return Path(filename).resolve().relative_to(config.generation_out_path)
+    except ValueError:
+        return Path(filename)
+
+
 class TSLHeaderFile:
     """
     Helper class for the generator used to populate the header_file template.
@@ -80,12 +94,12 @@ class TSLHeaderFile:
         return config.get_template("core::header_file").render(self.__data_dict)
 
     def render_to_file(self) -> None:
-        self.__filename.write_text(self.render())
+        output_writer.write_text(self.__filename, self.render())
 
     @staticmethod
     def create_include_guard(filename: Path) -> str:
-        subst_filename: str = config.include_guard_regex.sub("_", str(filename).upper())
-        return f"TUD_D2RG_TSL{subst_filename}"
+        subst_filename: str = config.include_guard_regex.sub("_", str(output_relative_path(filename)).upper())
+        return f"TUD_D2RG_TSL_{subst_filename}"
 
     @staticmethod
     @requirement(filename="NotNone", data_dict="NotNone")
@@ -96,7 +110,7 @@ class TSLHeaderFile:
             "date": datetime.date.today(),
             "file_description": data_dict["description"] if "description" in data_dict else "",
             "git_information": config.git_config_as_list,
-            "file_name": filename,
+            "file_name": output_relative_path(filename),
 
 
             "git_version_str" : config.get_version_str,
@@ -164,7 +178,7 @@ class TSLSourceFile:
         return config.get_template("core::source_file").render(self.__data_dict)
 
     def render_to_file(self) -> None:
-        self.__filename.write_text(self.render())
+        output_writer.write_text(self.__filename, self.render())
 
     @staticmethod
     @requirement(filename="NotNone", data_dict="NotNone")
@@ -174,7 +188,7 @@ class TSLSourceFile:
             "tsl_license": config.get_template("license").render({"year": datetime.date.today().year}),
             "tsl_file_doxygen": config.get_template("core::doxygen_file").render(
                 {
-                    "file_name": filename,
+                    "file_name": output_relative_path(filename),
                     "date": datetime.date.today(),
                     "file_description": data_dict["description"] if "description" in data_dict else ""
                 }
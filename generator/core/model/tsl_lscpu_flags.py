@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+
+class TSLLscpuFlags:
+    """
+    Interns lscpu flags into bit positions, thus sets of flags can be represented (and compared) as integer bitmasks.
+    Bit positions are assigned in order of first occurrence and are only valid within the current process.
+    """
+    def __init__(self) -> None:
+        self.__bits: Dict[str, int] = dict()
+
+    def bit(self, flag: str) -> int:
+        position = self.__bits.get(flag)
+        if position is None:
+            position = len(self.__bits)
+            self.__bits[flag] = position
+        return 1 << position
+
+    def mask(self, flags: Iterable[str]) -> int:
+        result = 0
+        for flag in flags:
+            result |= self.bit(flag)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.__bits)
+
+    @staticmethod
+    def popcount(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+lscpu_flags = TSLLscpuFlags()
+
+
+class TSLLscpuFlagRequirement:
+    """
+    Pre-parsed lscpu_flags of an extension or a primitive definition.
+    The flags of a definition form a disjunction, if they contain more than one distinct entry and at least one of them
+    is a group like "['avx512f', 'avx512bw']". In this case every entry is a term of the disjunction, otherwise all
+    flags form a single conjunctive term. Every term is stored as bitmask, thus checking whether a term is satisfied by
+    the available flags boils down to a single AND.
+    """
+    def __init__(self, flags: Iterable[str]) -> None:
+        flags = list(flags)
+        self.__flags_mask: int = lscpu_flags.mask(flags)
+        self.__groups: Tuple[List[str], ...] = ()
+        if TSLLscpuFlagRequirement.is_disjunction_of(flags):
+            self.__groups = tuple(TSLLscpuFlagRequirement.parse_group(group) for group in flags)
+            self.__terms: Tuple[int, ...] = tuple(lscpu_flags.mask(group) for group in self.__groups)
+        else:
+            # an empty conjunction is satisfied by any flags
+            self.__terms: Tuple[int, ...] = (self.__flags_mask,)
+
+    @staticmethod
+    def is_disjunction_of(flags: List[str]) -> bool:
+        distinct_flags = set(flags)
+        if len(distinct_flags) <= 1:
+            return False
+        return any("[" in flag and "]" in flag for flag in distinct_flags)
+
+    @staticmethod
+    def parse_group(group: str) -> List[str]:
+        return group.strip("[").strip("]").replace("'", "").replace(" ", "").split(",")
+
+    @property
+    def flags_mask(self) -> int:
+        """
+        :return: Bitmask of all flags as they are specified (groups of a disjunction are interned as a whole).
+        """
+        return self.__flags_mask
+
+    @property
+    def is_disjunction(self) -> bool:
+        return len(self.__groups) > 0
+
+    def group(self, term: int) -> List[str]:
+        return self.__groups[term]
+
+    def satisfied_term(self, available_mask: int) -> int:
+        """
+        :param available_mask: Bitmask of the available flags.
+        :return: Index of the first term whose flags are all available or -1, if no term is satisfied.
+        """
+        for term, term_mask in enumerate(self.__terms):
+            if term_mask & ~available_mask == 0:
+                return term
+        return -1
+
+    def is_satisfied_by(self, available_mask: int) -> bool:
+        if len(self.__groups) == 0:
+            return self.__flags_mask & ~available_mask == 0
+        return self.satisfied_term(available_mask) >= 0
+
+    def intersects(self, available_mask: int) -> bool:
+        """
+        :return: True, if no flags are specified or any of them is available.
+        """
+        return self.__flags_mask == 0 or (self.__flags_mask & available_mask) != 0
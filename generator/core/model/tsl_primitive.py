@@ -6,6 +6,7 @@ from copy import deepcopy
 from pathlib import Path
 from typing import Set, List, Generator, Dict, Tuple
 
+from generator.core.model.tsl_lscpu_flags import TSLLscpuFlags, TSLLscpuFlagRequirement
 from generator.core.tsl_config import config
 from generator.utils.dict_utils import deep_update_dict, keep_in_list
 from generator.utils.log_utils import LogInit
@@ -92,6 +93,7 @@ class TSLPrimitive:
         @LogInit()
         def __init__(self, data_dict: dict):
             self.__data_dict = data_dict
+            self.__lscpu_flag_requirement = TSLLscpuFlagRequirement(self.__data_dict["lscpu_flags"])
             self.log(logging.INFO,
                      f"Created Primitive Definition for {self.__data_dict['target_extension']} using {self.__data_dict['ctype']}")
 
@@ -124,6 +126,30 @@ class TSLPrimitive:
         def architecture_flags(self) -> Generator[str, None, None]:
             yield from self.__data_dict["lscpu_flags"]
 
+        @property
+        def lscpu_flag_requirement(self) -> TSLLscpuFlagRequirement:
+            return self.__lscpu_flag_requirement
+
+        def __overlay(self, changes: dict) -> TSLPrimitive.Definition:
+            """
+            Creates a definition which shares the data of this definition, except for the changed top level entries.
+            Thus, the data of both definitions must not be modified in place afterwards.
+            """
+            result = copy.copy(self)
+            result.__data_dict = {**self.__data_dict, **changes}
+            return result
+
+        def with_lscpu_flag_group(self, term: int) -> TSLPrimitive.Definition:
+            """
+            Replaces a disjunction of lscpu flag groups by a single group (e.g., the first one supported by the target).
+            :param term: Index of the group within the disjunction.
+            :return: Overlay of this definition, which requires the flags of the group.
+            """
+            group = set(self.__lscpu_flag_requirement.group(term))
+            result = self.__overlay({"lscpu_flags": group})
+            result.__lscpu_flag_requirement = TSLLscpuFlagRequirement(group)
+            return result
+
         @property
         def is_native(self) -> bool:
             return self.__data_dict["is_native"]
@@ -166,6 +192,43 @@ class TSLPrimitive:
             aste = self.__data_dict['additional_simd_template_extension']
             return aste if aste else self.target_extension
 
+        def with_types(self, ct: List[str]) -> TSLPrimitive.Definition:
+            """
+            Restricts the types of the definition like update_types, without modifying it.
+            :param ct: Types to keep.
+            :return: This definition, if all types are kept, otherwise an overlay holding the reduced type lists.
+            """
+            changes = dict()
+            if not isinstance(self.ctype, str):
+                ctypes = [t for t in self.ctype if t in ct]
+                if len(ctypes) != len(self.ctype):
+                    changes["ctype"] = ctypes
+            astbt = self.additional_simd_template_base_types
+            kept_astbt = [t for t in astbt if t in ct]
+            if len(kept_astbt) != len(astbt):
+                changes["additional_simd_template_base_type"] = kept_astbt
+            astbtmd = self.additional_simd_template_base_type_mapping_dict
+            if len(astbtmd) != 0:
+                kept_astbtmd = deep_update_dict(astbtmd, ct, False)
+                if kept_astbtmd != astbtmd:
+                    changes["additional_simd_template_base_type_mapping_dict"] = kept_astbtmd
+            if len(changes) == 0:
+                return self
+            return self.__overlay(changes)
+
+        def without_ctypes(self, ctypes: List[str]) -> TSLPrimitive.Definition:
+            """
+            Removes the given types like remove_ctypes, without modifying the definition.
+            :param ctypes: Types to remove.
+            :return: This definition, if no type is removed, otherwise an overlay holding the reduced type lists.
+            """
+            result = self.__overlay(dict())
+            result.remove_ctypes(ctypes)
+            for key in ("ctype", "additional_simd_template_base_type", "additional_simd_template_base_type_mapping_dict"):
+                if result.data[key] != self.__data_dict[key]:
+                    return result
+            return self
+
         def update_types(self, ct: List[str]):
             ctypes = copy.deepcopy(self.ctypes)
             astbt = copy.deepcopy(self.additional_simd_template_base_types)
@@ -222,14 +285,14 @@ class TSLPrimitive:
             otherset = set([f"{x},{y}" for x,y in other_definition.types])
             return len(selfset & otherset) > 0
 
-        def greater_than(self, other_definition:TSLPrimitive.Definition, relevant_architecture_flags: Set[str]) -> bool:
+        def greater_than(self, other_definition:TSLPrimitive.Definition, relevant_architecture_flags_mask: int) -> bool:
             if not self.is_native and other_definition.is_native:
                 return False
             if self.is_native and not other_definition.is_native:
                 return True
-            self_flags: Set[str] = set([flag for flag in self.architecture_flags])
-            other_flags: Set[str] = set([flag for flag in other_definition.architecture_flags])
-            return len(self_flags & relevant_architecture_flags) > len(other_flags & relevant_architecture_flags)
+            self_flags_mask: int = self.__lscpu_flag_requirement.flags_mask & relevant_architecture_flags_mask
+            other_flags_mask: int = other_definition.lscpu_flag_requirement.flags_mask & relevant_architecture_flags_mask
+            return TSLLscpuFlags.popcount(self_flags_mask) > TSLLscpuFlags.popcount(other_flags_mask)
 
         def remove_ctypes(self, ctypes: List[str]) -> None:
             if isinstance(self.ctype, str):
@@ -466,7 +529,9 @@ class TSLPrimitiveClassSet:
         self.__primitive_classes.add(primitive_class)
 
     def __iter__(self):
-        for primitive_class in self.__primitive_classes:
+        # the iteration order of a set depends on the string hashes of the current process, thus the primitive classes
+        # are ordered by name to generate identical outputs in every run
+        for primitive_class in sorted(self.__primitive_classes, key=lambda primitive_class: primitive_class.name):
             yield primitive_class
 
     def __deepcopy__(self, memodict={}):
@@ -477,18 +542,28 @@ class TSLPrimitiveClassSet:
             setattr(result, k, deepcopy(v, memodict))
         return result
 
+    def __copy__(self):
+        """
+        Creates a view of the primitive class set, which shares the primitive classes (and their primitives).
+        """
+        cls = self.__class__
+        result = cls.__new__(cls)
+        result.__dict__.update(self.__dict__)
+        result.__primitive_classes = set(self.__primitive_classes)
+        return result
+
     def definitions(self) -> Generator[TSLPrimitive.Definition, None, None]:
-        for primitive_class in self.__primitive_classes:
+        for primitive_class in self:
             for primitive in primitive_class:
                 yield from primitive.definitions
 
     def primitives(self) -> Generator[TSLPrimitive, None, None]:
-        for primitive_class in self.__primitive_classes:
+        for primitive_class in self:
             for primitive in primitive_class:
                 yield primitive
 
     def definitions_names(self) -> Generator[str, None, None]:
-        for primitive_class in self.__primitive_classes:
+        for primitive_class in self:
             for primitive in primitive_class:
                 name = primitive.declaration.functor_name
                 for definition in primitive.definitions:
@@ -497,7 +572,7 @@ class TSLPrimitiveClassSet:
 
     def get_declaration_dict(self) -> Dict[Dict[str, TSLPrimitive.Declaration]]:
         result: Dict[Dict[str, TSLPrimitive.Declaration]] = dict()
-        for primitive_class in self.__primitive_classes:
+        for primitive_class in self:
             result[primitive_class.name] = {primitive.declaration.functor_name: primitive.declaration for primitive in
                                             primitive_class}
         return result
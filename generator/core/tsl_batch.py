@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from generator.core.tsl_config import config
+from generator.core.tsl_generator import TSLGenerator
+from generator.utils.output_writer import output_writer
+from generator.utils.parallel_utils import parallel_map
+
+
+@dataclass
+class TSLFlavor:
+    """
+    Target platform of target_specs.json, for which a separate library (flavor) is generated.
+    """
+    architecture: str
+    name: str
+    flags: List[str]
+
+    @property
+    def directory_name(self) -> str:
+        return f"{self.architecture}-{self.name}"
+
+
+@dataclass
+class TSLFlavorResult:
+    flavor: TSLFlavor
+    output_path: Path
+    seconds: float
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    error: Union[str, None] = None
+
+
+def load_flavors(target_specs_file: Path, archids: Union[List[str], None] = None) -> List[TSLFlavor]:
+    """
+    Reads the target platforms from the target specification file.
+    :param target_specs_file: Path to target_specs.json.
+    :param archids: Names of the requested platforms or None for all platforms.
+    :return: Flavors in the order of the specification file.
+    """
+    with open(target_specs_file, 'r') as specs_file:
+        target_specs = json.load(specs_file)
+    flavors: List[TSLFlavor] = [
+        TSLFlavor(architecture, target['name'], [flag.strip() for flag in target['flags'].split(" ") if flag.strip()])
+        for architecture, targets in target_specs.items() for target in targets
+    ]
+    if archids is None:
+        return flavors
+    unknown_archids = sorted(set(archids) - set(flavor.name for flavor in flavors))
+    if len(unknown_archids) > 0:
+        raise ValueError(f"Unknown target archids: {', '.join(unknown_archids)}")
+    return [flavor for flavor in flavors if flavor.name in archids]
+
+
+# Flavors are generated within forked worker processes, which inherit the loaded model through this module level
+# variable (generator, root of the output directories, jobs per flavor, content store). It is only set for the duration
+# of a batch.
+_batch_context: Union[Tuple[TSLGenerator, Path, int, Union[Path, None]], None] = None
+
+
+def _generate_flavor(flavor: TSLFlavor) -> TSLFlavorResult:
+    generator, root_path, flavor_jobs, content_store_path = _batch_context
+    result = TSLFlavorResult(flavor, root_path.joinpath(flavor.directory_name), 0.0)
+    started = time.perf_counter()
+    configuration_overlay = {"root_path": f"{result.output_path}", "jobs": flavor_jobs}
+    if content_store_path is not None:
+        # all flavors share a single store
+        configuration_overlay["content_store"] = {"root_path": f"{content_store_path}"}
+    try:
+        with config.overlay({"configuration": configuration_overlay}):
+            generator.generate(flavor.flags, update_model=False)
+            if config.get_config_entry("clean"):
+                output_writer.prune(config.generation_out_path)
+        result.written, result.unchanged, result.removed = \
+            output_writer.written, output_writer.unchanged, output_writer.removed
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {str(e)}"
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def generate_flavors(generator: TSLGenerator, flavors: List[TSLFlavor], root_path: Path,
+                     jobs: int) -> List[TSLFlavorResult]:
+    """
+    Generates every flavor into <root_path>/<architecture>-<name> from the model, which was loaded and validated only
+    once. The flavors are sliced and rendered concurrently by forked worker processes. If a content store is used,
+    it is shared by all flavors (default: <root_path>/.tsl_blobs).
+    :param generator: Generator holding the loaded model.
+    :param flavors: Flavors which should be generated.
+    :param root_path: Common root of the output directories.
+    :param jobs: Maximum number of flavors which are generated concurrently.
+    :return: Result for every flavor in the order of flavors.
+    """
+    global _batch_context
+    workers = max(1, min(jobs, len(flavors)))
+    # the cores are split among the flavors, instead of every flavor using a pool of its own
+    _batch_context = (generator, Path(root_path), max(1, config.jobs // workers), config.content_store_path)
+    try:
+        return parallel_map(_generate_flavor, flavors, workers)
+    finally:
+        _batch_context = None
+
+
+def format_flavor_table(results: List[TSLFlavorResult], seconds: float) -> str:
+    """
+    :return: Table with the timings and output statistics of every flavor.
+    """
+    name_width = max([len("Flavor")] + [len(result.flavor.directory_name) for result in results])
+    lines = [f"{'Flavor':<{name_width}}  {'Flags':>5}  {'Written':>7}  {'Unchanged':>9}  {'Removed':>7}  {'Seconds':>8}"]
+    for result in results:
+        if result.error is not None:
+            lines.append(f"{result.flavor.directory_name:<{name_width}}  {len(result.flavor.flags):>5}  "
+                         f"failed: {result.error}")
+            continue
+        lines.append(f"{result.flavor.directory_name:<{name_width}}  {len(result.flavor.flags):>5}  "
+                     f"{result.written:>7}  {result.unchanged:>9}  {result.removed:>7}  {result.seconds:>8.2f}")
+    lines.append(f"{'Total':<{name_width}}  {'':>5}  {sum(result.written for result in results):>7}  "
+                 f"{sum(result.unchanged for result in results):>9}  {sum(result.removed for result in results):>7}  "
+                 f"{seconds:>8.2f}")
+    return "\n".join(lines)
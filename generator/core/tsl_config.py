@@ -1,27 +1,33 @@
 import argparse
 import copy
+import datetime
+import hashlib
 import json
 import logging.config
 import pathlib
 import os
 import re
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Generator, List
+from typing import Dict, Any, FrozenSet, Generator, Iterable, List, Mapping, Set, Tuple, Union
 
-from jinja2 import Template, Environment, FileSystemLoader
+from jinja2 import Template, Environment, FileSystemLoader, FileSystemBytecodeCache, BytecodeCache, meta
 
-from generator.utils.file_template import load_template_from_file
-from generator.utils.file_utils import StaticFileTree
+from generator.utils.dict_utils import dict_update, freeze, stable_digest
+from generator.utils.file_utils import StaticFileTree, file_digest, tree_content_digest, tree_state_digest
 from generator.utils.git_utils import GitUtils
-from generator.utils.requirement import requirement
+from generator.utils.lru_cache import LRUCache
+from generator.utils.log_utils import enable_fast_logging, reset_log_thresholds
+from generator.utils.parallel_utils import available_cores
+from generator.utils.requirement import requirement, enable_requirement_checks
 from generator.utils.yaml_schema import Schema
-from generator.utils.yaml_utils import yaml_load, SafeLineLoader
-from yaml.loader import SafeLoader
+from generator.utils.yaml_utils import yaml_load, SafeLineLoader, FastSafeLoader, FastSafeLineLoader
 
 class TSLGeneratorConfig:
     class JinjaConfig:
-        def __init__(self, root_path: Path):
-            self.__env = Environment(trim_blocks=True, lstrip_blocks=True, loader=FileSystemLoader(f"{root_path.resolve()}"))
+        def __init__(self, root_path: Path, bytecode_cache: BytecodeCache = None, auto_reload: bool = True):
+            self.__env = Environment(trim_blocks=True, lstrip_blocks=True, loader=FileSystemLoader(f"{root_path.resolve()}"),
+                                     bytecode_cache=bytecode_cache, auto_reload=auto_reload)
 
         @property
         def env(self) -> Environment:
@@ -33,23 +39,40 @@ class TSLGeneratorConfig:
         self.__valid = False
         self.__logger = None
         self.__jinja_templates_str: Dict[str, str] = dict()
-        self.__jinja_templates: Dict[str, Template] = dict()
+        self.__jinja_template_files: Dict[str, str] = dict()
+        self.__jinja_template_suffix_index: Dict[str, List[str]] = dict()
+        self.__compiled_templates: LRUCache[str, Template] = None
         self.__schemes: Dict[str, Schema] = dict()
         self.__general_configuration_dict: Dict[str, Any] = None
         self.__extensions_file_tree: StaticFileTree = None
         self.__primitives_file_tree: StaticFileTree = None
         self.__configuration_files_dict: Dict[str, Any] = None
+        self.__frozen_configuration: Mapping[str, Any] = None
+        self.__frozen_configuration_files: Mapping[str, Any] = None
         self.__jinja_config = None
+        self.__jinja_template_root_path: Path = None
+        self.__template_file_digests: Dict[str, Tuple[int, int, str]] = dict()
+        self.__template_file_dependencies: Dict[Tuple[str, str], FrozenSet[str]] = dict()
+        self.__support_files_digest: Union[str, None] = None
+        self.__generator_version: str = None
+        self.__configuration_digest: str = None
 
     def __setup(self, config_dict: dict) -> None:
         self.__general_configuration_dict = copy.deepcopy(config_dict["configuration"])
         self.__configuration_files_dict = copy.deepcopy(config_dict["configuration_files"])
+        self.__frozen_configuration = freeze(self.__general_configuration_dict)
+        self.__frozen_configuration_files = freeze(self.__configuration_files_dict)
+        self.__configuration_digest = None
 
         def configure_logger():
             """
             Configure Logger
             """
             logging.config.dictConfig(yaml_load(Path(self.__configuration_files_dict["log_config_file"]).resolve()))
+            reset_log_thresholds()
+            if self.__general_configuration_dict.get("fast", False):
+                enable_fast_logging()
+                enable_requirement_checks(False)
             self.__logger = logging.getLogger(f"{self.__class__.__name__}")
             self.__logger.info(f"Started TSL Generator. Loaded Logging Context.",
                                extra={"decorated_funcName": "setup", "decorated_filename": "tsl_config.py"})
@@ -71,19 +94,36 @@ class TSLGeneratorConfig:
 
         def load_jinja_templates():
             """
-            Load Templates.
+            Index Templates.
             Iterates through the jinja_templates basepath. All files with *.template-extension are gathered and inserted
-            into the self.__jinja_templates dict. The key results from the relative path, where all path seperators are
-            substituted by '::'.
+            into the self.__jinja_template_files dict. The key results from the relative path, where all path seperators
+            are substituted by '::'. Additionally, every template is indexed by all '::'-suffixes of its name.
+            The templates are compiled lazily on first use (see get_template). If enabled, the compiled templates are
+            persisted in a bytecode cache, which is keyed by the template name and checked against the template source.
             """
             template_root_path: Path = Path(self.__configuration_files_dict["jinja_templates"]["root_path"]).resolve()
-            self.__jinja_config = TSLGeneratorConfig.JinjaConfig(template_root_path)
+            bytecode_cache = None
+            if self.template_cache_enabled:
+                try:
+                    self.template_cache_root_path.mkdir(parents=True, exist_ok=True)
+                    bytecode_cache = FileSystemBytecodeCache(str(self.template_cache_root_path))
+                except OSError as e:
+                    self.__logger.warning(f"Could not create template cache directory. Exception: {str(e)}",
+                                          extra={"decorated_funcName": "setup", "decorated_filename": "tsl_config.py"})
+            # if a file watcher reports template changes, templates do not have to be checked on every use
+            self.__jinja_config = TSLGeneratorConfig.JinjaConfig(template_root_path, bytecode_cache,
+                                                                 not self.file_watching_enabled)
+            self.__jinja_template_root_path = template_root_path
+            self.__compiled_templates = LRUCache(int(self.get_config_entry("template_cache")["max_compiled_templates"]))
             for template_file in StaticFileTree(template_root_path, "*.template").get_files():
                 template_name = re.sub(rf"{self.path_seperator}", "::", str(template_file.relative_to(template_root_path)))[
                                 : -len(''.join(template_file.suffix))]
-                self.__jinja_templates[template_name] = self.__jinja_config.env.from_string(load_template_from_file(template_file))
-                self.__logger.info(f"Loaded template {template_name} (from file {template_file}).",
-                                   extra={"decorated_funcName": "setup", "decorated_filename": "tsl_config.py"})
+                self.__jinja_template_files[template_name] = template_file.relative_to(template_root_path).as_posix()
+                name_parts = template_name.split("::")
+                for part_idx in range(len(name_parts)):
+                    self.__jinja_template_suffix_index.setdefault("::".join(name_parts[part_idx:]), []).append(template_name)
+            self.__logger.info(f"Indexed {len(self.__jinja_template_files)} templates (from {template_root_path}).",
+                               extra={"decorated_funcName": "setup", "decorated_filename": "tsl_config.py"})
 
 
         def create_file_tress_for_primitive_data():
@@ -95,6 +135,18 @@ class TSLGeneratorConfig:
             self.__primitives_file_tree = StaticFileTree(primitive_data_root_path.joinpath(primitives_root_path), "*.yaml")
             extensions_root_path: Path = Path(self.__configuration_files_dict["primitive_data"]["extensions_path"])
             self.__extensions_file_tree = StaticFileTree(primitive_data_root_path.joinpath(extensions_root_path), "*.yaml")
+            restore_file_tree_states()
+
+        def restore_file_tree_states():
+            """
+            Restore the state of the file trees after the last successful generation into the output directory
+            """
+            try:
+                states = json.loads(self.file_tree_state_path.read_text())
+                self.__extensions_file_tree.restore_state(states["extensions"])
+                self.__primitives_file_tree.restore_state(states["primitives"])
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass
 
         def load_library_configs():
             """
@@ -119,9 +171,20 @@ class TSLGeneratorConfig:
     @property
     def yaml_loader(self):
         if self.__general_configuration_dict["debug_generator"]:
+            if self.yaml_lazy_origin_lines:
+                return FastSafeLineLoader
             return SafeLineLoader
         else:
-            return SafeLoader
+            return FastSafeLoader
+
+    @property
+    def yaml_lazy_origin_lines(self) -> bool:
+        """
+        If set, only documents and their top-level list entries are annotated with their origin line during loading.
+        The origin lines of all mappings are only recovered for documents which could not be validated.
+        """
+        return self.__general_configuration_dict["debug_generator"] and \
+            self.__general_configuration_dict.get("lazy_origin_lines", True)
 
     def yaml_loader_params(self):
         return {"Loader": self.yaml_loader, "save_filename": self.__general_configuration_dict["debug_generator"]}
@@ -130,19 +193,42 @@ class TSLGeneratorConfig:
     def schema_dict(self):
         return self.__schema_yaml
 
-    @requirement(entry_name="NonEmptyString")
-    def get_template(self, template_name: str) -> Template:
+    @property
+    def schema_digest(self) -> str:
+        return file_digest(Path(self.__configuration_files_dict["schema_file"]).resolve())
+
+    @property
+    def generator_version(self) -> str:
         """
-        Retrieves a specific Jinja2 template.
-        :param template_name: Name of the template (e.g., 'license', 'extension',...).
-        :return:  Copy of the requested Jinja2 Template object.
+        Digest over all python sources of the generator. Any change to the generator code results in a new version.
+        """
+        if self.__generator_version is None:
+            generator_root_path: Path = Path(__file__).resolve().parent.parent
+            version_hash = hashlib.sha256()
+            for source_file in sorted(generator_root_path.rglob("*.py")):
+                version_hash.update(f"{source_file.relative_to(generator_root_path)}".encode("utf-8"))
+                version_hash.update(source_file.read_bytes())
+            self.__generator_version = version_hash.hexdigest()
+        return self.__generator_version
+
+    @property
+    def configuration_digest(self) -> str:
         """
-        if template_name not in self.__jinja_templates:
+        Digest over the configuration, which excludes entries that do not influence the generated files.
+        """
+        if self.__configuration_digest is None:
+            self.__configuration_digest = stable_digest([
+                {key: value for key, value in self.__general_configuration_dict.items()
+                 if key not in RUNTIME_ONLY_CONFIGURATION_ENTRIES},
+                self.__configuration_files_dict])
+        return self.__configuration_digest
+
+    def __template_file_name(self, template_name: str) -> str:
+        if template_name not in self.__jinja_template_files:
             """
-            If the provided template_name is not fully qualified (without prefix), we apply a pattern search
+            If the provided template_name is not fully qualified (without prefix), we look it up in the suffix index
             """
-            regex = re.compile(rf".*{template_name}.*")
-            result_keys = [key for key in self.__jinja_templates.keys() if regex.match(key)]
+            result_keys = self.__jinja_template_suffix_index.get(template_name, [])
             if len(result_keys) == 0:
                 self.__logger.critical(f"Template {template_name} not found.",
                                        extra={"decorated_funcName": "get_template",
@@ -154,12 +240,155 @@ class TSLGeneratorConfig:
                                        extra={"decorated_funcName": "get_template",
                                               "decorated_filename": "tsl_config.py"})
                 raise ValueError
-            return self.__jinja_templates[result_keys[0]]
-        return self.__jinja_templates[template_name]
+            template_name = result_keys[0]
+        return self.__jinja_template_files[template_name]
+
+    @requirement(entry_name="NonEmptyString")
+    def get_template(self, template_name: str) -> Template:
+        """
+        Retrieves a specific Jinja2 template. The template is compiled on first use.
+        :param template_name: Name of the template (e.g., 'license', 'extension',...).
+        :return:  The requested Jinja2 Template object.
+        """
+        return self.__jinja_config.env.get_template(self.__template_file_name(template_name))
+
+    def template_file_digest(self, template_file: str) -> Union[str, None]:
+        """
+        Computes the digest of a template file. Digests are recomputed if the file was modified.
+        :param template_file: Path of the template file relative to the template root (as used by Jinja2).
+        :return: sha256 digest of the template source or None, if the file does not exist.
+        """
+        template_path: Path = self.__jinja_template_root_path.joinpath(template_file)
+        if self.file_watching_enabled and template_file in self.__template_file_digests:
+            return self.__template_file_digests[template_file][2]
+        try:
+            stat = template_path.stat()
+            cached = self.__template_file_digests.get(template_file)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached[2]
+            digest = file_digest(template_path)
+        except OSError:
+            return None
+        self.__template_file_digests[template_file] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    @property
+    def jinja_template_root_path(self) -> Path:
+        return self.__jinja_template_root_path
+
+    @property
+    def support_files_root_paths(self) -> List[Path]:
+        """
+        Directories of all files besides the extension and primitive files, which are read during generation
+        (templates, static files and supplementary files).
+        """
+        return [self.__jinja_template_root_path, self.static_files_root_path,
+                Path(self.get_configuration_files_entry("supplementary")["root_path"])]
+
+    @property
+    def support_files_digest(self) -> str:
+        """
+        Digest over the state of all files within the support_files_root_paths. If a file watcher tracks the changes
+        (daemon mode), the digest is only recomputed after changes were reported (see support_files_changed). Otherwise,
+        the trees are scanned for every call.
+        """
+        if self.file_watching_enabled and self.__support_files_digest is not None:
+            return self.__support_files_digest
+        digest = tree_state_digest(self.support_files_root_paths)
+        if self.file_watching_enabled:
+            self.__support_files_digest = digest
+        return digest
+
+    def support_files_changed(self, changed_files: Union[Iterable[Path], None] = None) -> None:
+        """
+        Invalidates the support files digest after a file watcher reported changes.
+        :param changed_files: Changed files or None, if all files may have changed.
+        """
+        if changed_files is None:
+            self.__support_files_digest = None
+            return
+        root_paths = [root_path.resolve() for root_path in self.support_files_root_paths]
+        for changed_file in changed_files:
+            changed_file = changed_file.resolve()
+            if any(changed_file == root_path or root_path in changed_file.parents for root_path in root_paths):
+                self.__support_files_digest = None
+                return
+
+    def templates_changed(self, template_files: Union[Iterable[Path], None] = None) -> None:
+        """
+        Invalidates compiled templates and template digests after a file watcher reported changes.
+        :param template_files: Changed template files or None, if all templates may have changed.
+        """
+        if template_files is None:
+            self.__template_file_digests.clear()
+        else:
+            changed = False
+            for template_file in template_files:
+                try:
+                    relative_path = template_file.resolve().relative_to(self.__jinja_template_root_path).as_posix()
+                except ValueError:
+                    continue
+                self.__template_file_digests.pop(relative_path, None)
+                changed = True
+            if not changed:
+                return
+        # imports of templates are resolved at render time, thus the templates compiled from strings stay valid
+        self.__jinja_config.env.cache.clear()
+
+    def __referenced_template_files(self, source: str) -> FrozenSet[str]:
+        referenced = set()
+        for template_file in meta.find_referenced_templates(self.__jinja_config.env.parse(source)):
+            if template_file is None:
+                # dynamic reference, every template could be used
+                referenced.update(self.__jinja_template_files.values())
+            else:
+                referenced.update(self.__template_file_closure(template_file))
+        return frozenset(referenced)
+
+    def __template_file_closure(self, template_file: str) -> FrozenSet[str]:
+        memo_key = (template_file, self.template_file_digest(template_file))
+        if memo_key not in self.__template_file_dependencies:
+            # guard against cyclic references
+            self.__template_file_dependencies[memo_key] = frozenset([template_file])
+            if memo_key[1] is not None:
+                source = self.__jinja_template_root_path.joinpath(template_file).read_text()
+                self.__template_file_dependencies[memo_key] = \
+                    frozenset([template_file]) | self.__referenced_template_files(source)
+        return self.__template_file_dependencies[memo_key]
+
+    @requirement(template_name="NonEmptyString")
+    def template_dependencies(self, template_name: str) -> FrozenSet[str]:
+        """
+        Determines the template files which are used when a template is rendered.
+        :param template_name: Name of the template (e.g., 'license', 'core::primitive_definition',...).
+        :return: Relative paths of the template file and all (transitively) imported or included template files.
+        """
+        return self.__template_file_closure(self.__template_file_name(template_name))
+
+    def template_source_dependencies(self, source: str) -> FrozenSet[str]:
+        """
+        Determines the template files which are (transitively) imported or included by a template source.
+        :param source: Source of the template (e.g., the implementation of a primitive definition).
+        :return: Relative paths of the referenced template files.
+        """
+        if "{%" not in source:
+            return frozenset()
+        return self.__referenced_template_files(source)
 
     @requirement(entry_name="NonEmptyString")
     def create_template(self, template: str) -> Template:
-        return self.__jinja_config.env.from_string(template)
+        """
+        Compiles a Jinja2 template from a string. Compiled templates are kept in a bounded LRU cache keyed by the
+        template source, thus identical sources (e.g., an implementation which is rendered for multiple ctypes) are
+        only compiled once.
+        :param template: Source of the template.
+        :return: Compiled Jinja2 Template object.
+        """
+        return self.__compiled_templates.get_or_create(template, self.__jinja_config.env.from_string)
+
+    @property
+    def compiled_templates_cache(self) -> LRUCache:
+        return self.__compiled_templates
 
     def schemes(self):
         return [scheme for scheme in self.__schemes]
@@ -175,63 +404,63 @@ class TSLGeneratorConfig:
         """
         Retrieves a specific schema used for Jinja2 templates.
         :param schema_entry_name: Name of the schema (e.g., 'extension', 'primitive').
-        :return: Copy of the requested schema object.
+        :return: Requested (shared) schema object. Schemes are not altered by validation, thus no copy is needed.
         """
         if schema_entry_name not in self.__schemes:
             self.__logger.critical(f"Schema {schema_entry_name} not found.",
                                    extra={"decorated_funcName": "get_schema", "decorated_filename": "tsl_config.py"})
             raise ValueError
-        return copy.deepcopy(self.__schemes[schema_entry_name])
+        return self.__schemes[schema_entry_name]
 
     @requirement(entry_name="NonEmptyString")
     def get_config_entry(self, entry_name: str) -> Any:
         """
         Retrieves a specific configuration value.
         :param entry_name: Name of an entry (e.g., 'lib_generation_out_path').
-        :return: Copy of the requested configuration object.
+        :return: Read-only view of the requested configuration object (dicts are read-only mappings, lists are tuples).
         """
         if entry_name not in self.__general_configuration_dict:
             self.__logger.critical(f"Entry {entry_name} not found.",
                                    extra={"decorated_funcName": "get_schema", "decorated_filename": "tsl_config.py"})
             raise ValueError
-        return copy.deepcopy(self.__general_configuration_dict[entry_name])
+        return self.__frozen_configuration[entry_name]
 
     @requirement(entry_name="NonEmptyString")
     def get_config_entry_silent(self, entry_name: str) -> bool:
         """
         Retrieves a specific configuration value.
         :param entry_name: Name of an entry (e.g., 'lib_generation_out_path').
-        :return: Copy of the requested configuration object.
+        :return: Read-only view of the requested configuration object (dicts are read-only mappings, lists are tuples).
         """
         if entry_name not in self.__general_configuration_dict:
             raise ValueError
-        return copy.deepcopy(self.__general_configuration_dict[entry_name])
+        return self.__frozen_configuration[entry_name]
 
     @requirement(entry_name="NonEmptyString")
     def get_library_config_entry(self, entry_name: str) -> Any:
         """
         Retrieves a specific configuration value.
         :param entry_name: Name of an entry (e.g., 'lib_generation_out_path').
-        :return: Copy of the requested configuration object.
+        :return: Read-only view of the requested configuration object (dicts are read-only mappings, lists are tuples).
         """
         if entry_name not in self.__general_configuration_dict["library"]:
             self.__logger.critical(f"Entry {entry_name} not found.",
                                    extra={"decorated_funcName": "get_schema", "decorated_filename": "tsl_config.py"})
             raise ValueError
-        return copy.deepcopy(self.__general_configuration_dict["library"][entry_name])
+        return self.__frozen_configuration["library"][entry_name]
 
     @requirement(entry_name="NonEmptyString")
     def get_configuration_files_entry(self, entry_name: str) -> Any:
         """
         Retrieves a specific configuration value.
         :param entry_name: Name of an entry (e.g., 'lib_generation_out_path').
-        :return: Copy of the requested configuration object.
+        :return: Read-only view of the requested configuration object (dicts are read-only mappings, lists are tuples).
         """
         if entry_name not in self.__configuration_files_dict:
             self.__logger.critical(f"Entry {entry_name} not found.",
                                    extra={"decorated_funcName": "get_schema", "decorated_filename": "tsl_config.py"})
             raise ValueError
-        return copy.deepcopy(self.__configuration_files_dict[entry_name])
+        return self.__frozen_configuration_files[entry_name]
 
     @property
     def lib_namespace(self) -> str:
@@ -309,7 +538,7 @@ class TSLGeneratorConfig:
         return self.static_files_root_path.joinpath(self.get_configuration_files_entry("static_files")["lib"])
 
     def static_lib_files(self) -> Generator[Path, None, None]:
-        for file in self.static_lib_files_root_path.rglob("*.yaml"):
+        for file in sorted(self.static_lib_files_root_path.rglob("*.yaml")):
             yield file
 
     def primitive_files(self) -> Generator[Path, None, None]:
@@ -318,11 +547,46 @@ class TSLGeneratorConfig:
     def extension_files(self) -> Generator[Path, None, None]:
         yield from self.__extensions_file_tree.get_files()
 
-    def modified_primitive_files(self) -> Generator[Path, None, None]:
-        yield from self.__primitives_file_tree.get_recently_updated_files()
+    def modified_primitive_files(self, candidates: Union[Iterable[Path], None] = None) -> Generator[Path, None, None]:
+        yield from self.__primitives_file_tree.get_recently_updated_files(candidates)
+
+    def modified_extension_files(self, candidates: Union[Iterable[Path], None] = None) -> Generator[Path, None, None]:
+        yield from self.__extensions_file_tree.get_recently_updated_files(candidates)
+
+    def data_file_digest(self, file: Path) -> Union[str, None]:
+        """
+        :return: Content digest of an extension or primitive file, which was already seen, or None.
+        """
+        digest = self.__primitives_file_tree.digest(file)
+        if digest is None:
+            digest = self.__extensions_file_tree.digest(file)
+        return digest
+
+    def changed_extension_files(self) -> Tuple[List[Path], List[Path]]:
+        """
+        :return: Extension files which were added or modified and which were removed since the last generation.
+        """
+        return self.__extensions_file_tree.changed_since_commit()
 
-    def modified_extension_files(self) -> Generator[Path, None, None]:
-        yield from self.__extensions_file_tree.get_recently_updated_files()
+    def changed_primitive_files(self) -> Tuple[List[Path], List[Path]]:
+        """
+        :return: Primitive files which were added or modified and which were removed since the last generation.
+        """
+        return self.__primitives_file_tree.changed_since_commit()
+
+    @property
+    def file_tree_state_path(self) -> Path:
+        return self.generation_out_path.joinpath(".tsl_file_state.json")
+
+    def commit_file_tree_states(self) -> str:
+        """
+        Marks the current state of the extension and primitive files as generated.
+        :return: JSON representation of the states, which is restored on the next setup.
+        """
+        self.__extensions_file_tree.commit()
+        self.__primitives_file_tree.commit()
+        return json.dumps({"extensions": self.__extensions_file_tree.state(),
+                           "primitives": self.__primitives_file_tree.state()}, indent=1, sort_keys=True)
 
     def get_primitive_files_path(self, entry_name: str) -> Path:
         return Path(self.__configuration_files_dict["primitive_data"]["root_path"]).joinpath(
@@ -354,13 +618,288 @@ class TSLGeneratorConfig:
             for file in Path(expansion_config["static_files"]["root_path"]).rglob("*.yaml"):
                 yield file
 
+    @property
+    def git_information_enabled(self) -> bool:
+        """
+        If disabled, no git metadata is written into the generated files, thus the files do not change with every
+        commit (e.g., for cache-friendly builds).
+        """
+        return self.__general_configuration_dict.get("git_information", True)
+
     @property
     def git_config_as_list(self) -> List[str]:
-        return GitUtils.get_git_data().create_indented_list()
+        if not self.git_information_enabled:
+            return []
+        return list(GitUtils.git_information()[0])
 
     @property
     def get_version_str(self) -> str:
-        return GitUtils.get_git_data().create_version_str()
+        if not self.git_information_enabled:
+            return ""
+        return GitUtils.git_information()[1]
+
+    @property
+    def jobs(self) -> int:
+        """
+        Number of worker processes used by the generator. Defaults to the number of available cores.
+        """
+        try:
+            jobs = self.get_config_entry_silent("jobs")
+        except ValueError:
+            jobs = None
+        if jobs is None or jobs <= 0:
+            return available_cores()
+        return jobs
+
+    @property
+    def template_cache_enabled(self) -> bool:
+        return self.get_config_entry("template_cache")["enabled"]
+
+    @property
+    def template_cache_root_path(self) -> Path:
+        return Path(self.get_config_entry("template_cache")["root_path"]).resolve()
+
+    @property
+    def model_cache_enabled(self) -> bool:
+        return self.get_config_entry("model_cache")["enabled"]
+
+    @property
+    def model_cache_root_path(self) -> Path:
+        return Path(self.get_config_entry("model_cache")["root_path"]).resolve()
+
+    @property
+    def model_cache_max_size(self) -> int:
+        return int(self.get_config_entry("model_cache")["max_size_mb"]) * 1024 * 1024
+
+    @property
+    def daemon_mode(self) -> bool:
+        """
+        The generator keeps running and serves requests (either from stdin or from a socket).
+        """
+        return self.__general_configuration_dict.get("daemon", False) or self.server_enabled
+
+    @property
+    def server_enabled(self) -> bool:
+        return bool(self.get_config_entry("server")["socket_path"])
+
+    @property
+    def server_socket_path(self) -> Path:
+        return Path(self.get_config_entry("server")["socket_path"]).resolve()
+
+    @property
+    def server_workers(self) -> int:
+        workers = int(self.get_config_entry("server")["workers"])
+        return workers if workers > 0 else available_cores()
+
+    @staticmethod
+    def check_overlay(overlay_dict: dict) -> None:
+        """
+        Checks whether a configuration overlay can be applied (see overlay).
+        :raises ValueError: If the overlay is malformed or changes entries which are bound to the running process.
+        """
+        if not isinstance(overlay_dict, dict) or len(overlay_dict.keys() - {"configuration"}) > 0:
+            raise ValueError("A configuration overlay may only contain the 'configuration' section.")
+        configuration_overlay = overlay_dict.get("configuration", dict())
+        if not isinstance(configuration_overlay, dict):
+            raise ValueError("The 'configuration' section of an overlay has to be a mapping.")
+        fixed_entries = sorted(configuration_overlay.keys() & set(PROCESS_CONFIGURATION_ENTRIES))
+        if len(fixed_entries) > 0:
+            raise ValueError(f"The entries {', '.join(fixed_entries)} can not be changed by an overlay.")
+
+    @contextmanager
+    def overlay(self, overlay_dict: dict) -> Generator["TSLGeneratorConfig", None, None]:
+        """
+        Merges a configuration overlay on top of the current configuration for the duration of the context. The
+        overlay has the layout of the configuration file, but only entries of the 'configuration' section which do not
+        influence the loaded model, schemas and templates may be changed (see PROCESS_CONFIGURATION_ENTRIES). Thus, a
+        single warm generator can serve differently configured requests.
+        :param overlay_dict: Configuration overlay (e.g., {"configuration": {"relevant_types": ["float"]}}).
+        """
+        self.check_overlay(overlay_dict)
+        base = (self.__general_configuration_dict, self.__frozen_configuration, self.__configuration_digest)
+        self.__general_configuration_dict = dict_update(self.__general_configuration_dict,
+                                                        overlay_dict.get("configuration", dict()))
+        self.__frozen_configuration = freeze(self.__general_configuration_dict)
+        self.__configuration_digest = None
+        try:
+            yield self
+        finally:
+            self.__general_configuration_dict, self.__frozen_configuration, self.__configuration_digest = base
+
+    @property
+    def file_watching_enabled(self) -> bool:
+        """
+        Changed files are tracked by a file watcher in daemon mode (unless disabled).
+        """
+        return self.daemon_mode and self.file_watcher_mode != "off"
+
+    @property
+    def file_watcher_mode(self) -> str:
+        return self.get_config_entry("file_watcher")["mode"]
+
+    @property
+    def file_watcher_poll_interval(self) -> float:
+        return float(self.get_config_entry("file_watcher")["poll_interval_s"])
+
+    @property
+    def result_cache_enabled(self) -> bool:
+        """
+        Rendered outputs are only cached in-process, thus the cache is only used in daemon mode.
+        """
+        return self.daemon_mode and self.get_config_entry("result_cache")["enabled"] and not self.print_output_only
+
+    @property
+    def result_cache_max_entries(self) -> int:
+        return int(self.get_config_entry("result_cache")["max_entries"])
+
+    @property
+    def result_cache_max_size(self) -> int:
+        return int(self.get_config_entry("result_cache")["max_size_mb"]) * 1024 * 1024
+
+    @property
+    def content_store_path(self) -> Union[Path, None]:
+        """
+        Root of the content store, which deduplicates the generated files (default: <root_path>/.tsl_blobs), or None if
+        every file is written separately.
+        """
+        content_store = self.get_config_entry("content_store")
+        if not content_store["enabled"]:
+            return None
+        if content_store["root_path"]:
+            return Path(content_store["root_path"]).resolve()
+        return self.generation_out_path.joinpath(".tsl_blobs")
+
+    @property
+    def generation_cache_enabled(self) -> bool:
+        """
+        Complete output trees of single runs are cached across processes and output directories. If the cache is
+        neither enabled nor disabled explicitly, setting the environment variable TSL_GENERATOR_CACHE_DIR enables it.
+        """
+        if self.daemon_mode or self.print_output_only:
+            return False
+        enabled = self.get_config_entry("generation_cache")["enabled"]
+        if enabled is None:
+            return len(os.environ.get(GENERATION_CACHE_DIR_VARIABLE, "")) > 0
+        return enabled
+
+    @property
+    def generation_cache_root_path(self) -> Path:
+        """
+        Directory of the generation cache: the configured path, TSL_GENERATOR_CACHE_DIR or the user cache directory.
+        """
+        root_path = self.get_config_entry("generation_cache")["root_path"] or \
+            os.environ.get(GENERATION_CACHE_DIR_VARIABLE, "")
+        if root_path:
+            return Path(root_path).resolve()
+        return Path(os.environ.get("XDG_CACHE_HOME", Path.home().joinpath(".cache"))).joinpath("tsl_generator")
+
+    @property
+    def generation_cache_max_size(self) -> int:
+        return int(self.get_config_entry("generation_cache")["max_size_mb"]) * 1024 * 1024
+
+    @property
+    def __generation_input_roots(self) -> List[Path]:
+        return [Path(self.__configuration_files_dict["primitive_data"]["root_path"]), self.__jinja_template_root_path,
+                self.static_files_root_path, Path(self.get_configuration_files_entry("supplementary")["root_path"])]
+
+    @property
+    def generation_inputs_digest(self) -> str:
+        """
+        Digest over the content of all files the generated library is derived from (primitive data, templates, static
+        files, supplementary files, schema and generator sources). In contrast to support_files_digest, it does not
+        depend on modification times, thus it is equal for all checkouts of the same revision.
+        """
+        generator_root_path: Path = Path(__file__).resolve().parent.parent
+        return stable_digest([
+            self.generator_version,
+            [[source_file.name, file_digest(source_file)] for source_file in sorted(generator_root_path.parent.glob("*.py"))],
+            self.schema_digest,
+            tree_content_digest(self.__generation_input_roots)])
+
+    @property
+    def generation_input_files(self) -> List[Path]:
+        """
+        All files which are read by a generation (the files covered by generation_inputs_digest, the generator
+        configuration and the target specifications), e.g., for depfiles of build systems.
+        """
+        generator_root_path: Path = Path(__file__).resolve().parent.parent
+        input_files: List[Path] = sorted(generator_root_path.parent.glob("*.py")) + \
+            sorted(generator_root_path.rglob("*.py")) + sorted(generator_root_path.joinpath("config").glob("*.yaml")) + \
+            [Path(self.__configuration_files_dict["schema_file"]).resolve(),
+             generator_root_path.parent.joinpath("target_specs.json")]
+        for root_path in self.__generation_input_roots:
+            input_files.extend(sorted(file.resolve() for file in root_path.rglob("*") if file.is_file()))
+        return list(dict.fromkeys(input_files))
+
+    @property
+    def generation_input_directories(self) -> List[Path]:
+        """
+        All directories of the generation_input_files and of the input trees. The modification time of a directory
+        changes if a file is added, removed or renamed within it, thus depfiles which list the directories trigger a
+        regeneration for new primitive data or templates as well.
+        """
+        input_directories: Set[Path] = {file.parent for file in self.generation_input_files}
+        for root_path in self.__generation_input_roots:
+            input_directories.add(root_path.resolve())
+            input_directories.update(directory.resolve() for directory in root_path.rglob("*") if directory.is_dir())
+        return sorted(input_directories)
+
+    def generation_stamp_key(self, relevant_hardware_flags: Union[List[str], None]) -> str:
+        """
+        Builds the key of a single run from its inputs, the (normalized) command line arguments and the git
+        information, which is embedded into the generated files. The output path is not part of the key.
+        :param relevant_hardware_flags: Requested hardware flags or None for all flags.
+        """
+        return stable_digest([
+            self.generation_inputs_digest,
+            {key: value for key, value in self.__general_configuration_dict.items()
+             if key not in RUNTIME_ONLY_CONFIGURATION_ENTRIES and key != "root_path"},
+            self.__configuration_files_dict,
+            None if relevant_hardware_flags is None else sorted(set(relevant_hardware_flags)),
+            self.git_config_as_list,
+            self.get_version_str])
+
+    def generation_cache_key(self, relevant_hardware_flags: Union[List[str], None]) -> str:
+        """
+        Builds the key of a single run for the generation cache. In addition to the stamp key, the date is part of the
+        key, as it is embedded into the generated files. The output path is relocated instead (see
+        tsl_generation_cache).
+        :param relevant_hardware_flags: Requested hardware flags or None for all flags.
+        """
+        return stable_digest([self.generation_stamp_key(relevant_hardware_flags), f"{datetime.date.today()}"])
+
+    @property
+    def stamp_enabled(self) -> bool:
+        """
+        Single runs are skipped, if the output directory holds the outputs of a run with the same stamp key (see
+        tsl_stamp). A depfile or an output list implies the stamp.
+        """
+        if self.daemon_mode or self.print_output_only:
+            return False
+        stamp = self.get_config_entry("stamp")
+        return stamp["enabled"] or bool(stamp["depfile"]) or bool(stamp["output_list"])
+
+    @property
+    def stamp_path(self) -> Path:
+        return self.generation_out_path.joinpath(".tsl_stamp.json")
+
+    @property
+    def stamp_depfile_path(self) -> Union[Path, None]:
+        depfile = self.get_config_entry("stamp")["depfile"]
+        return Path(depfile).resolve() if depfile else None
+
+    @property
+    def stamp_output_list_path(self) -> Union[Path, None]:
+        output_list = self.get_config_entry("stamp")["output_list"]
+        return Path(output_list).resolve() if output_list else None
+
+    @property
+    def incremental_enabled(self) -> bool:
+        return self.get_config_entry("incremental")["enabled"]
+
+    @property
+    def incremental_root_path(self) -> Path:
+        return Path(self.get_config_entry("incremental")["root_path"]).resolve()
 
     @property
     def print_output_only(self) -> bool:
@@ -383,6 +922,21 @@ class TSLGeneratorConfig:
         return Path(self.get_config_entry("emit_tsl_extensions_to"))
 
 
+# Entries which only control how the generator runs, but not what it generates.
+RUNTIME_ONLY_CONFIGURATION_ENTRIES: Tuple[str, ...] = (
+    "jobs", "fast", "clean", "daemon", "silent", "print_output_only", "template_cache", "model_cache", "incremental",
+    "result_cache", "server", "content_store", "generation_cache", "stamp")
+
+# Entries which are bound to the running generator process (e.g., as they determine how the model is loaded), thus
+# they can not be changed by a configuration overlay.
+PROCESS_CONFIGURATION_ENTRIES: Tuple[str, ...] = (
+    "daemon", "server", "fast", "debug_generator", "lazy_origin_lines", "file_watcher", "template_cache", "model_cache",
+    "result_cache")
+
+# Environment variable which enables the generation cache and sets its directory (e.g., for all build directories of a
+# CI machine).
+GENERATION_CACHE_DIR_VARIABLE: str = "TSL_GENERATOR_CACHE_DIR"
+
 config = TSLGeneratorConfig()
 
 
@@ -390,14 +944,21 @@ def add_bool_arg(parser, name, dest, help_true_prefix="", help_false_prefix="",
     true_args = copy.deepcopy(kwargs)
     false_args = kwargs
     if "help" in kwargs:
-        if default:
+        if default is None:
+            # neither of both is the default, an unset argument leaves the decision to the configuration
+            true_args["help"] = f"{help_true_prefix}{true_args['help']}"
+            false_args["help"] = f"{help_false_prefix}{true_args['help']}"
+        elif default:
             true_args["help"] = f"{help_true_prefix}{true_args['help']} (Default)"
             false_args["help"] = f"{help_false_prefix}{true_args['help']}"
         else:
             true_args["help"] = f"{help_true_prefix}{true_args['help']}"
             false_args["help"] = f"{help_false_prefix}{true_args['help']} (Default)"
     else:
-        if default:
+        if default is None:
+            true_args["help"] = f""
+            false_args["help"] = f""
+        elif default:
             true_args["help"] = f"(Default)"
             false_args["help"] = f""
         else:
@@ -413,8 +974,14 @@ def add_bool_arg(parser, name, dest, help_true_prefix="", help_false_prefix="",
 def parse_args(**kwargs) -> dict:
     parser = argparse.ArgumentParser(description="TSL Generator", epilog="To apply fine-tuned changes to the generator please change the config files (config/default_conf.yaml and config/log_conf.yaml).")
     parser.add_argument('-d', '--daemon', dest='configuration:daemon', action='store_true', help="Run the generator as daemon.")
-    parser.add_argument('-c', '--clean', dest='configuration:clean', action='store_true', help="Clean the output directory before generation.")
+    parser.add_argument('--socket', dest='configuration:server:socket_path', metavar="Path", required=False,
+                        help="Run the generator as JSON-RPC server listening on the given Unix domain socket.")
+    parser.add_argument('--server-workers', type=int, dest='configuration:server:workers', metavar="Workers", required=False,
+                        help="Maximum number of requests which are generated concurrently in server mode (Default: number of cores).")
+    parser.add_argument('-c', '--clean', dest='configuration:clean', action='store_true', help="Remove stale files from the output directory after generation. Unchanged files are not rewritten.")
     parser.add_argument('-s', '--silent', dest='configuration:silent', action='store_true', help="Suppress all generator output.")
+    parser.add_argument('-j', '--jobs', type=int, dest='configuration:jobs', metavar="Jobs", required=False,
+                        help="Number of worker processes used for loading and validation (Default: number of cores).")
     parser.add_argument('-o', '--out', type=pathlib.Path, help="Generation output path.", required=False,
                                   dest='configuration:root_path', metavar="OutPath")
     parser.add_argument('-i', '--in', type=pathlib.Path,
@@ -424,6 +991,10 @@ def parse_args(**kwargs) -> dict:
                         help='List of target flags which match the lscpu_flags from the extension/primitive files.',
                         dest='targets')
     parser.add_argument('--archid', type=str, dest='target_archid', metavar="ArchId", help="Identifier of a target platform (e.g., 'skylake').")
+    parser.add_argument('--archids', type=str, nargs='+', dest='target_archids', metavar="ArchId",
+                        help="Generate a separate library for every given target platform into <root_path>/<architecture>-<name> (the model is only loaded once).")
+    parser.add_argument('--all-archids', dest='all_archids', action='store_true', required=False,
+                        help="Generate a separate library for every target platform of target_specs.json (see --archids).")
     types_help = 'List of types which should be considered for generation.'
     if "known_types" in kwargs:
         types_help += f" Choose from the following list: [{', '.join(kwargs['known_types'])}]"
@@ -445,6 +1016,29 @@ def parse_args(**kwargs) -> dict:
     parser.add_argument('--copy-additional-www-files', dest='configuration:expansions:primitive_vis:copy_media', action="store_true", required=False, help="This flag is necessary for index.html deployment.")
 
     parser.add_argument('--no-debug-info', dest='configuration:debug_generator', action='store_false', required=False)
+    parser.add_argument('--fast', dest='configuration:fast', action='store_true', required=False,
+                        help="Production mode: only emit warnings and errors, skip tracing of calls and object "
+                             "creations and skip argument requirement checks. "
+                             "Set TSL_GENERATOR_FAST=1 to remove the tracing and checks at import time.")
+    add_bool_arg(parser, 'lazy-line-info', 'configuration:lazy_origin_lines', "Enable ", "Disable ", True, help='recovery of yaml line information only for invalid documents', required=False)
+    add_bool_arg(parser, 'git-info', 'configuration:git_information', "Add ", "Omit ", True, help='git metadata to the generated files', required=False)
+    add_bool_arg(parser, 'template-cache', 'configuration:template_cache:enabled', "Enable ", "Disable ", True, help='bytecode cache for compiled templates', required=False)
+    add_bool_arg(parser, 'model-cache', 'configuration:model_cache:enabled', "Enable ", "Disable ", True, help='cache for validated primitive data', required=False)
+    parser.add_argument('--file-watcher', dest='configuration:file_watcher:mode', choices=["auto", "inotify", "poll", "off"],
+                        required=False, help="Tracking of changed data and template files in daemon mode (auto: inotify if available, polling otherwise).")
+    add_bool_arg(parser, 'result-cache', 'configuration:result_cache:enabled', "Enable ", "Disable ", True, help='in-process cache of rendered outputs for repeated daemon requests', required=False)
+    add_bool_arg(parser, 'content-store', 'configuration:content_store:enabled', "Enable ", "Disable ", False, help='deduplication of identical generated files through hardlinks into a content-addressed blob directory', required=False)
+    parser.add_argument('--content-store-path', dest='configuration:content_store:root_path', metavar="Path", required=False,
+                        help="Blob directory of the content store (Default: <root_path>/.tsl_blobs). Has to reside on the file system of the output directory.")
+    add_bool_arg(parser, 'generation-cache', 'configuration:generation_cache:enabled', "Enable ", "Disable ", None, help='cache of complete output trees, which is shared between output directories (Default: enabled if TSL_GENERATOR_CACHE_DIR is set)', required=False)
+    parser.add_argument('--generation-cache-path', dest='configuration:generation_cache:root_path', metavar="Path", required=False,
+                        help="Directory of the generation cache (Default: $TSL_GENERATOR_CACHE_DIR or ~/.cache/tsl_generator).")
+    add_bool_arg(parser, 'stamp', 'configuration:stamp:enabled', "Enable ", "Disable ", False, help='skipping of runs whose inputs and arguments did not change since the last run into the output directory (see <OutPath>/.tsl_stamp.json)', required=False)
+    parser.add_argument('--depfile', dest='configuration:stamp:depfile', metavar="Path", required=False,
+                        help="Write a Make/Ninja depfile, which lists all inputs of the generation as dependencies of the stamp (implies --stamp).")
+    parser.add_argument('--output-list', dest='configuration:stamp:output_list', metavar="Path", required=False,
+                        help="Write the paths of all generated files, one per line (implies --stamp).")
+    add_bool_arg(parser, 'incremental', 'configuration:incremental:enabled', "Enable ", "Disable ", True, help='reuse of outputs whose inputs did not change since the last run', required=False)
     add_bool_arg(parser, 'workaround-warnings', 'configuration:emit_workaround_warnings', "Enable ", "Disable ", True, help='workaround warnings', required=False)
     add_bool_arg(parser, 'concepts', 'configuration:use_concepts', "Enable ", "Disable ", True, help='C++20 concepts.', required=False)
     add_bool_arg(parser, 'draw-test-dependencies', 'configuration:expansions:unit_tests:draw_dependency_graph', "Enable ", "Disable ", False, help="draw dependency graph for test generation", required=False)
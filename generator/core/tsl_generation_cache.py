@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from generator.core.tsl_config import config
+from generator.core.tsl_generator import TSLGenerator
+from generator.utils.content_store import ContentStore
+from generator.utils.generation_cache import GenerationCache
+from generator.utils.output_writer import output_writer
+
+OUTPUT_PATH_PLACEHOLDER: bytes = b"\0TSL_OUTPUT_PATH\0"
+
+
+def output_path_relocations(output_path: Path) -> List[Tuple[bytes, bytes]]:
+    """
+    Determines the occurrences of the output path within the generated files. The generated files refer to themselves
+    relative to the output directory (see output_relative_path), thus only templates which embed absolute paths
+    below the output directory are affected. As such a path is always followed by the remainder of the file path, only
+    occurrences followed by a path separator are relocated.
+    :param output_path: Resolved output directory.
+    :return: Relocations for the generation cache.
+    """
+    return [(OUTPUT_PATH_PLACEHOLDER + os.sep.encode("utf-8"), f"{output_path}{os.sep}".encode("utf-8"))]
+
+
+def generate_through_cache(generation_cache: GenerationCache,
+                           relevant_hardware_flags: Union[List[str], None]) -> Tuple[Union[TSLGenerator, None], bool]:
+    """
+    Generates the library into the configured output directory. If the generation cache holds the output tree of an
+    identical generation (possibly into another output directory), it is materialized without loading the primitive
+    data. Otherwise, the library is generated and stored in the cache.
+    :param generation_cache: Generation cache.
+    :param relevant_hardware_flags: Requested hardware flags or None for all flags.
+    :return: Tuple of the generator which generated the library (None, if the library was served from the cache) and
+    whether the library was generated.
+    """
+    key = config.generation_cache_key(relevant_hardware_flags)
+    relocations = output_path_relocations(config.generation_out_path)
+    with generation_cache.locked(key):
+        recorded = generation_cache.get(key, relocations)
+        if recorded is not None:
+            output_writer.reset(ContentStore(config.content_store_path) if config.content_store_path is not None else None)
+            output_writer.materialize(config.generation_out_path, recorded)
+            if config.file_tree_state_path.exists():
+                # still describes the last generation from the primitive data into this output directory
+                output_writer.keep(config.file_tree_state_path)
+            output_writer.flush()
+            return None, True
+        generator = TSLGenerator()
+        output_writer.start_recording(config.generation_out_path)
+        try:
+            generated = generator.generate(relevant_hardware_flags)
+        finally:
+            recorded = output_writer.stop_recording()
+        if generated:
+            # the file state refers to the primitive data of this checkout
+            recorded.pop(Path(config.file_tree_state_path.name), None)
+            generation_cache.put(key, recorded, relocations)
+        return generator, generated
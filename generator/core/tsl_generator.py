@@ -1,10 +1,13 @@
 import re
+import hashlib
 import logging
 from pathlib import Path
-from typing import List
+from typing import Dict, Hashable, List, Set, Tuple, Union
 
 
 from generator.core.ctrl.tsl_libfile_generator import TSLFileGenerator
+from generator.core.ctrl.tsl_loader import TSLDataFileLoadResult, load_data_file
+from generator.core.ctrl.tsl_renderer import render_files
 from generator.expansions.tsl_cmake import TSLCMakeGenerator
 from generator.core.ctrl.tsl_lib import TSLLib
 from generator.core.ctrl.tsl_slicer import TSLSlicer
@@ -15,9 +18,15 @@ from generator.core.ctrl.tsl_dependencies import TSLDependencyGraph
 from generator.expansions.tsl_readme_md import create_readme
 from generator.expansions.tsl_translation_unit import TSLTranslationUnitContainer
 from generator.expansions.tsl_unit_test import TSLTestGenerator
+from generator.utils.content_store import ContentStore
+from generator.utils.dependency_map import DependencyMap
+from generator.utils.document_cache import DocumentCache
+from generator.utils.file_watcher import FileWatcher, create_file_watcher
 from generator.utils.log_utils import LogInit
-from generator.utils.requirement import requirement
-from generator.utils.yaml_utils import yaml_load, yaml_load_all, yaml_store
+from generator.utils.lru_cache import LRUCache
+from generator.utils.output_writer import output_writer
+from generator.utils.parallel_utils import parallel_map
+from generator.utils.yaml_utils import yaml_dumps
 from parseForPrimitiveTable import create_primitive_index_html
 from generator.core.model.tsl_file import TSLHeaderFile
 
@@ -27,74 +36,231 @@ class TSLGenerator:
     def __init__(self) -> None:
         self.__tsl_extension_set: TSLExtensionSet = TSLExtensionSet()
         self.__tsl_primitiveclass_set: TSLPrimitiveClassSet = TSLPrimitiveClassSet()
+        self.__document_cache: DocumentCache = None
+        self.__dependency_map: DependencyMap = None
+        self.__file_watcher: FileWatcher = None
+        self.__result_cache: LRUCache[Hashable, Dict[Path, bytes]] = None
+        # incremented whenever the loaded extensions or primitive classes change
+        self.__model_version: int = 0
+        if config.result_cache_enabled:
+            self.__result_cache = LRUCache(
+                config.result_cache_max_entries, config.result_cache_max_size,
+                lambda recorded: sum(len(data) for data in recorded.values()))
+        if config.model_cache_enabled:
+            self.__document_cache = DocumentCache(
+                config.model_cache_root_path,
+                f"{config.generator_version}:{config.schema_digest}:{config.yaml_loader.__name__}",
+                config.model_cache_max_size)
+        if config.file_watching_enabled:
+            # the watcher is started before the initial scan, thus no change gets lost
+            self.__file_watcher = create_file_watcher(
+                [config.get_primitive_files_path("extensions_path"), config.get_primitive_files_path("primitives_path"),
+                 *config.support_files_root_paths], config.file_watcher_mode, config.file_watcher_poll_interval)
+            self.log(logging.INFO, f"Watching for changes using {self.__file_watcher.name}.")
         self.update()
 
-    @requirement(extension_file="NotNone")
-    def __add_extension(self, extension_file: Path) -> None:
-        extension_data_dict = None
-        try:
-            extension_data_dict = config.get_schema("extension").validate(yaml_load(extension_file, **config.yaml_loader_params()))
-        except Exception as e:
-            self.log(logging.ERROR,
-                     f"Error while validating extension {extension_file}. Exception: {str(e)}")
-        if extension_data_dict is not None:
-            self.__tsl_extension_set.add_extension_from_data_dict(extension_file, extension_data_dict)
-
-    def __add_primitive_class(self, primitive_class_file: Path) -> None:
-        class_schema = config.get_schema("primitive_class")
-        primitive_schema = config.get_schema("primitive")
-
-        primitive_class: TSLPrimitiveClass = None
-        for yaml_document in yaml_load_all(primitive_class_file, **(config.yaml_loader_params())):
-            if primitive_class is None:
-                class_dict = None
-                try:
-                    class_dict = class_schema.validate(yaml_document)
-                except Exception as e:
-                    self.log(logging.ERROR,
-                             f"Error while validating Primitive class in file {primitive_class_file}. "
-                             f"Exception: {str(e)}.")
-                    return
-                if class_dict is not None:
-                    primitive_class = TSLPrimitiveClass.create_from_dict(primitive_class_file, class_dict)
-            else:
-                primitive_dict = None
-                try:
-                    primitive_dict = primitive_schema.validate(yaml_document)
-                except Exception as e:
-                    self.log(logging.ERROR,
-                             f"Error while validating Primitive class in file {primitive_class_file} with "
-                             f"primitive data ({yaml_document}). "
-                             f"Exception: {str(e)}.")
-                if primitive_dict is not None:
-                    primitive_class.add_primitive_from_dict(primitive_dict)
+    @property
+    def document_cache(self) -> DocumentCache:
+        return self.__document_cache
+
+    @property
+    def file_watcher(self) -> FileWatcher:
+        return self.__file_watcher
+
+    @property
+    def dependency_map(self) -> DependencyMap:
+        return self.__dependency_map
+
+    @property
+    def result_cache(self) -> LRUCache:
+        return self.__result_cache
+
+    @property
+    def model_version(self) -> int:
+        return self.__model_version
+
+    @property
+    def extension_set(self) -> TSLExtensionSet:
+        return self.__tsl_extension_set
+
+    @property
+    def primitive_class_set(self) -> TSLPrimitiveClassSet:
+        return self.__tsl_primitiveclass_set
+
+    @staticmethod
+    def __load_dependency_map() -> DependencyMap:
+        """
+        Loads the dependency map of the previous run into the current output directory. Changes to the generator or to
+        the configuration invalidate the whole map.
+        """
+        output_digest = hashlib.sha256(f"{config.generation_out_path}".encode("utf-8")).hexdigest()
+        return DependencyMap(config.incremental_root_path.joinpath(f"{output_digest}.pickle"),
+                             f"{config.generator_version}:{config.configuration_digest}")
+
+    @staticmethod
+    def __content_store() -> Union[ContentStore, None]:
+        return ContentStore(config.content_store_path) if config.content_store_path is not None else None
+
+    def __add_extension(self, result: TSLDataFileLoadResult) -> None:
+        self.__tsl_extension_set.add_extension_from_data_dict(result.file, result.documents[0])
+
+    def __add_primitive_class(self, result: TSLDataFileLoadResult) -> None:
+        primitive_class: TSLPrimitiveClass = TSLPrimitiveClass.create_from_dict(result.file, result.documents[0])
+        for primitive_dict in result.documents[1:]:
+            primitive_class.add_primitive_from_dict(primitive_dict)
         self.__tsl_primitiveclass_set.add_primitive_class(primitive_class)
 
     def update(self) -> None:
+        """
+        Loads and validates all modified extension and primitive class files concurrently and merges them into the
+        model afterwards. The merge order is the order of the files within the file trees (extensions first), thus the
+        resulting model is independent of the number of jobs.
+        If a file watcher is active, only the files reported by the watcher are checked instead of scanning the file
+        trees.
+        """
+        candidates: Union[Set[Path], None] = None
+        if self.__file_watcher is not None:
+            dirty_files, rescan_required = self.__file_watcher.take_changes()
+            if rescan_required:
+                config.templates_changed()
+                config.support_files_changed()
+            else:
+                candidates = dirty_files
+                config.templates_changed(dirty_files)
+                config.support_files_changed(dirty_files)
+            # the digest is computed by the process which owns the watcher, thus forked workers inherit it
+            config.support_files_digest
+        load_jobs: List[Tuple[str, Path, DocumentCache, str]] = []
+        if candidates is None or len(candidates) > 0:
+            load_jobs = \
+                [("extension", extension_file, self.__document_cache, config.data_file_digest(extension_file))
+                 for extension_file in config.modified_extension_files(candidates)] + \
+                [("primitive_class", primitive_file, self.__document_cache, config.data_file_digest(primitive_file))
+                 for primitive_file in config.modified_primitive_files(candidates)]
         updated_extensions_count = 0
         updated_primitives_count = 0
-        for extension_file in config.modified_extension_files():
-            self.__add_extension(extension_file)
-            updated_extensions_count += 1
-        for primitive_file in config.modified_primitive_files():
-            self.__add_primitive_class(primitive_file)
-            updated_primitives_count += 1
+        for result in parallel_map(load_data_file, load_jobs, config.jobs):
+            for error in result.errors:
+                self.log(logging.ERROR, error)
+            for warning in result.warnings:
+                self.log(logging.WARNING, warning)
+            if self.__document_cache is not None:
+                self.__document_cache.count_lookup(result.from_cache)
+            if result.kind == "extension":
+                if result.documents is not None:
+                    self.__add_extension(result)
+                updated_extensions_count += 1
+            else:
+                if result.documents is not None:
+                    self.__add_primitive_class(result)
+                updated_primitives_count += 1
+        changed_extensions, removed_extensions = config.changed_extension_files()
+        changed_primitives, removed_primitives = config.changed_primitive_files()
+        if updated_extensions_count > 0 or updated_primitives_count > 0:
+            self.__model_version += 1
         msg = ""
         if updated_extensions_count > 0:
-            msg += f"Updated {updated_extensions_count} extensions. "
+            msg += f"Updated {updated_extensions_count} extensions "
+            msg += f"({len(changed_extensions)} changed, {len(removed_extensions)} removed since the last generation). "
         else:
             msg += f"No changes to extensions detected. "
         if updated_primitives_count > 0:
-            msg += f"Updated {updated_primitives_count} primitives."
+            msg += f"Updated {updated_primitives_count} primitives "
+            msg += f"({len(changed_primitives)} changed, {len(removed_primitives)} removed since the last generation)."
         else:
             msg += f"No changes to primitives detected."
+        if self.__document_cache is not None:
+            msg += f" Model cache: {self.__document_cache.stats_str}."
         self.log(logging.INFO, msg)
 
-    def generate(self, relevant_hardware_flags: List[str] = None, relevant_primitives: List[str] = None):
+    def result_key(self, relevant_hardware_flags: Union[List[str], None],
+                     relevant_primitives: Union[List[str], None]) -> Hashable:
+        """
+        Builds the key of a request for the result cache. Flags and primitives are normalized, thus requests which only
+        differ in order or duplicates share the same outputs.
+        """
+        if relevant_primitives is None:
+            relevant_primitives = config.get_config_entry("relevant_primitives")
+        return (
+            None if relevant_hardware_flags is None else tuple(sorted(set(relevant_hardware_flags))),
+            tuple(sorted(set(primitive for primitive in relevant_primitives if len(primitive) > 0))),
+            tuple(config.relevant_types),
+            self.__model_version,
+            config.support_files_digest,
+            config.configuration_digest,
+            f"{config.generation_out_path}"
+        )
+
+    def generate(self, relevant_hardware_flags: List[str] = None, relevant_primitives: List[str] = None,
+                 update_model: bool = True) -> bool:
+        """
+        :return: True, if the library was generated.
+        """
+        output_writer.reset(self.__content_store())
+        if update_model:
+            self.update()
+        if not self.__generate(relevant_hardware_flags, relevant_primitives):
+            return False
+        self.__finish(True)
+        return True
+
+    def generate_cached(self, relevant_hardware_flags: List[str] = None, relevant_primitives: List[str] = None,
+                        update_model: bool = True) -> bool:
+        """
+        Generates the library like generate, but serves repeated requests from the result cache (if enabled). A cached
+        result is materialized into the output directory, thus only files which differ from the cached content are
+        written. Cached results are invalidated by changes to the model, the templates or the configuration.
+        :param relevant_hardware_flags: Requested hardware flags or None for all flags.
+        :param relevant_primitives: Requested primitives or None for the configured primitives.
+        :param update_model: False, if the model was already updated (e.g., by the process which forked this one).
+        :return: True, if the request was served from the result cache.
+        """
+        if self.__result_cache is None:
+            self.generate(relevant_hardware_flags, relevant_primitives, update_model)
+            return False
+        output_writer.reset(self.__content_store())
+        if update_model:
+            self.update()
+        result_key = self.result_key(relevant_hardware_flags, relevant_primitives)
+        recorded = self.__result_cache.get(result_key)
+        if recorded is not None:
+            output_writer.materialize(config.generation_out_path, recorded)
+            self.__finish(False)
+            self.log(logging.INFO, f"Served request from the result cache ({self.__result_cache.stats_str}).")
+            return True
+        output_writer.start_recording(config.generation_out_path)
+        try:
+            generated = self.__generate(relevant_hardware_flags, relevant_primitives)
+        finally:
+            recorded = output_writer.stop_recording()
+        if generated:
+            self.__result_cache.put(result_key, recorded)
+            self.__finish(True)
+        return False
+
+    def __finish(self, save_dependency_map: bool) -> None:
+        if not config.print_output_only:
+            output_writer.write_text(config.file_tree_state_path, config.commit_file_tree_states())
+        output_writer.flush()
+        self.log(logging.INFO, f"Output files: {output_writer.stats_str}.")
+        if save_dependency_map and self.__dependency_map is not None and not config.print_output_only:
+            try:
+                self.__dependency_map.save()
+            except OSError as e:
+                self.log(logging.WARNING, f"Could not persist dependency map. Exception: {str(e)}")
+            self.log(logging.INFO, f"Dependency map: {self.__dependency_map.stats_str}.")
+
+    def __generate(self, relevant_hardware_flags: Union[List[str], None],
+                   relevant_primitives: Union[List[str], None]) -> bool:
+        """
+        Slices the model and renders all outputs.
+        :return: True, if the library was generated.
+        """
         if relevant_primitives is None:
             relevant_primitives = config.get_config_entry("relevant_primitives")
 
-        self.update()
+        self.__dependency_map = self.__load_dependency_map() \
+            if config.incremental_enabled and not config.print_output_only else None
         slicer = TSLSlicer(relevant_hardware_flags, config.relevant_types)
 
         relevant_extensions_set: TSLExtensionSet = slicer.slice_extensions(self.__tsl_extension_set)
@@ -126,13 +292,13 @@ class TSLGenerator:
 
 
             extensions_dict = {"generated_extensions": extensions_list}
-            yaml_store(config.tsl_extensions_yaml_output_path, extensions_dict)
+            output_writer.write_text(config.tsl_extensions_yaml_output_path, yaml_dumps(extensions_dict))
         relevant_primitives_class_set: TSLPrimitiveClassSet = slicer.slice_primitives(self.__tsl_primitiveclass_set)
         
         """ Only filter if any relevant primitves are set. Also take care that no empty strings are passed """
         filter_by_primitive = list(filter( lambda x: len(x) > 0, relevant_primitives ))
         if filter_by_primitive:
-            selective_primitive_list = filter_by_primitive + config.get_config_entry("always_required_primitives")
+            selective_primitive_list = filter_by_primitive + list(config.get_config_entry("always_required_primitives"))
             selected_relevant_primitives_class_set = TSLPrimitiveClassSet()
 
             # Filter
@@ -199,16 +365,16 @@ class TSLGenerator:
           self.log(logging.ERROR, "Dependency graph for primitive definitions is not acyclic. Please check your dependencies.")
           for cycle in dep_graph.get_cycles_as_str():
             self.log(logging.ERROR, f"Cycle: {cycle}")
-          return
+          return False
 
-        file_generator: TSLFileGenerator = TSLFileGenerator(lib, dep_graph)
         if not config.print_output_only:
+            file_generator: TSLFileGenerator = TSLFileGenerator(lib, dep_graph, self.__dependency_map)
             for path in file_generator.out_pathes:
                 self.log(logging.INFO, f"Creating directory {path}")
                 path.mkdir(parents=True, exist_ok=True)
-            for tsl_file in file_generator.library_files:
-                self.log(logging.INFO, f"Creating file {tsl_file.file_name}")
-                tsl_file.render_to_file()
+            for rendered_file in render_files(list(file_generator.library_files)):
+                self.log(logging.INFO, f"Creating file {rendered_file.file_name}")
+                output_writer.write_text(rendered_file.file_name, rendered_file.text)
 
             lib.copy_relevant_supplementary_files()
 
@@ -231,7 +397,7 @@ class TSLGenerator:
             install_header.render_to_file()
                 
             try:
-                for path, tu in TSLTestGenerator.generate(lib, dep_graph):
+                for path, tu in TSLTestGenerator.generate(lib, dep_graph, self.__dependency_map):
                     tsl_translation_units.add_tu(path, tu)
             except Exception as e:
                 self.log(logging.ERROR, f"Error while generating test files. Exception: {str(e)}")
@@ -245,6 +411,8 @@ class TSLGenerator:
             if cmake_config["enabled"]:
                 TSLCMakeGenerator.generate_source_file(tsl_translation_units, cmake_config)
         else:
-            print(";".join(f"{tsl_file.file_name}" for tsl_file in file_generator.library_files))
+            # only the names of the files are required, thus nothing is rendered
+            print(";".join(f"{file_name}" for file_name in TSLFileGenerator.plan_library_files(lib)))
 
-        create_readme()
\ No newline at end of file
+        create_readme()
+        return True
@@ -0,0 +1,466 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import time
+import uuid
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+from generator.core.tsl_config import config
+from generator.core.tsl_generator import TSLGenerator
+from generator.utils.dict_utils import dict_update
+from generator.utils.log_utils import LogInit
+from generator.utils.output_writer import output_writer
+
+JSONRPC_VERSION: str = "2.0"
+PARSE_ERROR: int = -32700
+INVALID_REQUEST: int = -32600
+METHOD_NOT_FOUND: int = -32601
+INVALID_PARAMS: int = -32602
+INTERNAL_ERROR: int = -32603
+GENERATION_FAILED: int = -32000
+REQUEST_CANCELLED: int = -32001
+
+
+class TSLServerError(Exception):
+    """
+    Error which is reported to the client as JSON-RPC error object.
+    """
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code: int = code
+        self.message: str = message
+
+
+@dataclass
+class TSLServerRequest:
+    """
+    State of a single generate request.
+    """
+    request_id: str
+    lscpu_flags: Union[List[str], None]
+    primitives: List[str]
+    output_path: Path
+    configuration_overlay: Dict[str, Any] = field(default_factory=dict)
+    clean: bool = False
+    state: str = "queued"
+    message: str = ""
+    cancelled: bool = False
+    submitted: float = field(default_factory=time.monotonic)
+    process: Union[multiprocessing.Process, None] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "state": self.state,
+            "message": self.message,
+            "output_path": f"{self.output_path}",
+            "elapsed_s": round(time.monotonic() - self.submitted, 3)
+        }
+
+
+class _ForwardingLogHandler(logging.Handler):
+    """
+    Forwards warnings and errors of a worker process to the server, which reports them as progress.
+    """
+    def __init__(self, connection: Connection) -> None:
+        super().__init__(logging.WARNING)
+        self.__connection: Connection = connection
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.__connection.send(("progress", record.levelname.lower(), record.getMessage()))
+        except Exception:
+            self.handleError(record)
+
+
+def _serve_request(generator: TSLGenerator, connection: Connection, request: TSLServerRequest) -> None:
+    """
+    Entry point of a forked worker process. The worker inherits the warm model of the server, generates a single
+    request into its output directory and reports the outcome through the connection.
+    """
+    # the signal handlers of the server's event loop must not be triggered by the worker
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    logging.getLogger().addHandler(_ForwardingLogHandler(connection))
+    try:
+        started = time.monotonic()
+        with config.overlay(dict_update(request.configuration_overlay,
+                                        {"configuration": {"root_path": f"{request.output_path}"}})):
+            result_key = None
+            if generator.result_cache is not None:
+                result_key = generator.result_key(request.lscpu_flags, request.primitives)
+            connection.send(("progress", "info", f"Generating into {config.generation_out_path}"))
+            cached = generator.generate_cached(request.lscpu_flags, request.primitives, update_model=False)
+            if request.clean and not config.print_output_only:
+                output_writer.prune(config.generation_out_path)
+        # results are cached within the worker, thus they are handed back to the server for subsequent requests
+        recorded = None
+        if result_key is not None and not cached:
+            recorded = generator.result_cache.get(result_key)
+        connection.send(("done", {
+            "request_id": request.request_id,
+            "output_path": f"{request.output_path}",
+            "cached": cached,
+            "written": output_writer.written,
+            "unchanged": output_writer.unchanged,
+            "removed": output_writer.removed,
+            "duration_s": round(time.monotonic() - started, 3)
+        }, result_key, recorded))
+    except BaseException as e:
+        connection.send(("failed", f"{type(e).__name__}: {str(e)}"))
+    finally:
+        connection.close()
+
+
+class TSLServer:
+    """
+    JSON-RPC 2.0 server which listens on a Unix domain socket. Messages are newline-delimited JSON objects and every
+    client may issue several requests concurrently. Supported methods:
+      generate(lscpu_flags, primitives, config, output_path, request_id, clean): Generates the library into its own
+        output directory (default: <root_path>/<request_id>). The optional config overlay is merged on top of the
+        configuration for this request only (see TSLGeneratorConfig.overlay). Output directories outside of root_path
+        have to be empty or generated before. Stale files are only removed if clean is set. While the request is
+        processed, progress notifications are sent.
+      status(request_id): State of a single request or of all known requests.
+      cancel(request_id): Cancels a queued or running request.
+      health(): State of the server.
+    Every request is generated by a worker process, which is forked from the server and thus starts from the warm
+    model. Requests into the same output directory are serialized, the number of concurrent workers is bounded.
+    """
+    MAX_FINISHED_REQUESTS: int = 256
+
+    @LogInit()
+    def __init__(self, generator: TSLGenerator, socket_path: Path, workers: int) -> None:
+        self.__generator: TSLGenerator = generator
+        self.__socket_path: Path = socket_path
+        self.__workers: int = max(1, workers)
+        self.__mp_context = multiprocessing.get_context("fork")
+        self.__requests: Dict[str, TSLServerRequest] = dict()
+        self.__output_locks: Dict[Path, asyncio.Lock] = dict()
+        self.__worker_slots: Union[asyncio.Semaphore, None] = None
+        self.__model_lock: Union[asyncio.Lock, None] = None
+        self.__stop_event: Union[asyncio.Event, None] = None
+        self.__started: float = time.monotonic()
+        self.__statistics: Dict[str, int] = {"done": 0, "failed": 0, "cancelled": 0, "served_from_cache": 0}
+        self.__methods: Dict[str, Callable[[dict, Callable[[dict], Awaitable[None]]], Awaitable[Any]]] = {
+            "generate": self.__generate,
+            "status": self.__status,
+            "cancel": self.__cancel,
+            "health": self.__health
+        }
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+    def stop(self) -> None:
+        if self.__stop_event is not None:
+            self.__stop_event.set()
+
+    async def serve(self) -> None:
+        """
+        Serves clients until SIGINT or SIGTERM is received (or stop is called).
+        """
+        loop = asyncio.get_running_loop()
+        self.__worker_slots = asyncio.Semaphore(self.__workers)
+        self.__model_lock = asyncio.Lock()
+        self.__stop_event = asyncio.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, self.__stop_event.set)
+        self.__socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.__socket_path.unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self.__handle_client, path=f"{self.__socket_path}",
+                                                 limit=16 * 1024 * 1024)
+        self.log(logging.INFO, f"Listening on {self.__socket_path} with {self.__workers} workers.")
+        print(f"Listening on {self.__socket_path}", flush=True)
+        try:
+            async with server:
+                await self.__stop_event.wait()
+        finally:
+            for request in self.__requests.values():
+                if not request.finished:
+                    self.__cancel_request(request)
+            for signal_number in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signal_number)
+            self.__socket_path.unlink(missing_ok=True)
+
+    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(message: dict) -> None:
+            async with write_lock:
+                try:
+                    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self.__dispatch(line, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            # the results of a disconnected client are not needed anymore
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def __dispatch(self, line: bytes, send: Callable[[dict], Awaitable[None]]) -> None:
+        message_id = None
+        respond = True
+        try:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise TSLServerError(PARSE_ERROR, f"Parse error: {e.msg}")
+            if not isinstance(message, dict) or message.get("jsonrpc") != JSONRPC_VERSION or \
+                    not isinstance(message.get("method"), str):
+                raise TSLServerError(INVALID_REQUEST, "Invalid request")
+            # notifications (requests without id) are not answered
+            respond = "id" in message
+            message_id = message.get("id")
+            params = message.get("params", dict())
+            if not isinstance(params, dict):
+                raise TSLServerError(INVALID_PARAMS, "Parameters have to be passed by name")
+            method = self.__methods.get(message["method"])
+            if method is None:
+                raise TSLServerError(METHOD_NOT_FOUND, f"Method {message['method']} not found")
+            response = {"jsonrpc": JSONRPC_VERSION, "id": message_id, "result": await method(params, send)}
+        except TSLServerError as e:
+            response = {"jsonrpc": JSONRPC_VERSION, "id": message_id, "error": {"code": e.code, "message": e.message}}
+        except Exception as e:
+            self.log(logging.ERROR, f"Error while serving request. Exception: {str(e)}")
+            response = {"jsonrpc": JSONRPC_VERSION, "id": message_id,
+                        "error": {"code": INTERNAL_ERROR, "message": f"Internal error: {str(e)}"}}
+        if respond:
+            await send(response)
+
+    @staticmethod
+    def __string_list_param(params: dict, name: str, default: Union[List[str], None]) -> Union[List[str], None]:
+        value = params.get(name, default)
+        if value is None:
+            return None
+        if not isinstance(value, list) or not all(isinstance(entry, str) for entry in value):
+            raise TSLServerError(INVALID_PARAMS, f"Parameter {name} has to be a list of strings")
+        return value
+
+    def __request_param(self, params: dict) -> TSLServerRequest:
+        request_id = params.get("request_id")
+        if not isinstance(request_id, str) or request_id not in self.__requests:
+            raise TSLServerError(INVALID_PARAMS, f"Unknown request {request_id}")
+        return self.__requests[request_id]
+
+    @staticmethod
+    def __checked_output_path(output_path: Path, name: str) -> Path:
+        """
+        Clients may only generate into directories below the root_path of the server, into empty (or not yet existing)
+        directories and into directories which were generated before. Thus, no foreign files are overwritten.
+        :param output_path: Resolved output directory requested by the client.
+        :param name: Name of the parameter, which is reported on errors.
+        :return: The given output directory.
+        """
+        if config.generation_out_path in output_path.parents or not output_path.exists():
+            return output_path
+        if output_path.is_dir() and (output_path.joinpath(config.file_tree_state_path.name).is_file() or
+                                     next(output_path.iterdir(), None) is None):
+            return output_path
+        raise TSLServerError(INVALID_PARAMS, f"Parameter {name} has to be below {config.generation_out_path}, an empty "
+                                             f"directory or a previously generated directory")
+
+    def __create_request(self, params: dict) -> TSLServerRequest:
+        request_id = params.get("request_id", uuid.uuid4().hex)
+        if not isinstance(request_id, str) or len(request_id) == 0:
+            raise TSLServerError(INVALID_PARAMS, "Parameter request_id has to be a non-empty string")
+        # the request id names the default output directory below root_path
+        if request_id in (".", "..") or Path(request_id).is_absolute() or ".." in request_id or \
+                any(separator in request_id for separator in (os.sep, os.altsep, "/") if separator):
+            raise TSLServerError(INVALID_PARAMS, "Parameter request_id must not contain path separators or '..'")
+        if request_id in self.__requests and not self.__requests[request_id].finished:
+            raise TSLServerError(INVALID_PARAMS, f"Request {request_id} is already in progress")
+        output_path = params.get("output_path")
+        if output_path is not None and not isinstance(output_path, str):
+            raise TSLServerError(INVALID_PARAMS, "Parameter output_path has to be a string")
+        clean = params.get("clean", False)
+        if not isinstance(clean, bool):
+            raise TSLServerError(INVALID_PARAMS, "Parameter clean has to be a boolean")
+        configuration_overlay = params.get("config", dict())
+        try:
+            with config.overlay(configuration_overlay):
+                overlay_out_path = config.generation_out_path
+        except (ValueError, TypeError) as e:
+            raise TSLServerError(INVALID_PARAMS, f"Invalid configuration overlay: {str(e)}")
+        if output_path is not None:
+            output_path = TSLServer.__checked_output_path(Path(output_path).resolve(), "output_path")
+        elif "root_path" in configuration_overlay.get("configuration", dict()):
+            output_path = TSLServer.__checked_output_path(overlay_out_path, "root_path")
+        else:
+            output_path = config.generation_out_path.joinpath(request_id)
+        request = TSLServerRequest(
+            request_id,
+            self.__string_list_param(params, "lscpu_flags", None),
+            self.__string_list_param(params, "primitives", []),
+            output_path,
+            configuration_overlay,
+            clean)
+        self.__requests.pop(request_id, None)
+        self.__requests[request_id] = request
+        finished = [other_id for other_id, other in self.__requests.items() if other.finished]
+        for other_id in finished[:max(0, len(finished) - TSLServer.MAX_FINISHED_REQUESTS)]:
+            del self.__requests[other_id]
+        return request
+
+    async def __generate(self, params: dict, send: Callable[[dict], Awaitable[None]]) -> dict:
+        request = self.__create_request(params)
+
+        async def notify(level: str = "info") -> None:
+            await send({"jsonrpc": JSONRPC_VERSION, "method": "progress", "params": {**request.status, "level": level}})
+
+        try:
+            result = await self.__execute(request, notify)
+        except asyncio.CancelledError:
+            self.__cancel_request(request)
+            request.state = "cancelled"
+            self.__statistics["cancelled"] += 1
+            raise
+        except TSLServerError:
+            self.__statistics[request.state] += 1
+            await notify()
+            raise
+        self.__statistics["done"] += 1
+        if result["cached"]:
+            self.__statistics["served_from_cache"] += 1
+        await notify()
+        return result
+
+    async def __execute(self, request: TSLServerRequest, notify: Callable[..., Awaitable[None]]) -> dict:
+        await notify()
+        output_lock = self.__output_locks.setdefault(request.output_path, asyncio.Lock())
+        async with output_lock, self.__worker_slots:
+            if request.cancelled:
+                request.state = "cancelled"
+                raise TSLServerError(REQUEST_CANCELLED, f"Request {request.request_id} was cancelled")
+            connection, child_connection = self.__mp_context.Pipe(duplex=False)
+            request.process = self.__mp_context.Process(target=_serve_request,
+                                                        args=(self.__generator, child_connection, request),
+                                                        name=f"tsl_request_{request.request_id}")
+            # workers are forked from the server, thus they start from the current model. Reloading the model does not
+            # block the event loop, but it is serialized with all other reloads and forks, so no worker is forked from
+            # a partially updated model.
+            async with self.__model_lock:
+                await asyncio.get_running_loop().run_in_executor(None, self.__generator.update)
+                request.process.start()
+            child_connection.close()
+            request.state = "running"
+            request.message = f"Started worker {request.process.pid}"
+            await notify()
+            try:
+                outcome = await self.__receive_outcome(connection, request, notify)
+            except BaseException:
+                self.__cancel_request(request)
+                raise
+            finally:
+                connection.close()
+                request.process.join()
+        if outcome is None:
+            if request.cancelled:
+                request.state = "cancelled"
+                request.message = "Cancelled"
+                raise TSLServerError(REQUEST_CANCELLED, f"Request {request.request_id} was cancelled")
+            request.state = "failed"
+            request.message = f"Worker exited with code {request.process.exitcode}"
+            raise TSLServerError(GENERATION_FAILED, request.message)
+        if outcome[0] == "failed":
+            request.state = "failed"
+            request.message = outcome[1]
+            raise TSLServerError(GENERATION_FAILED, outcome[1])
+        _, result, result_key, recorded = outcome
+        if recorded is not None and self.__generator.result_cache is not None:
+            async with self.__model_lock:
+                self.__generator.result_cache.put(result_key, recorded)
+        request.state = "done"
+        request.message = "Served from the result cache" if result["cached"] else \
+            f"{result['written']} written, {result['unchanged']} unchanged, {result['removed']} removed"
+        return result
+
+    @staticmethod
+    async def __receive_outcome(connection: Connection, request: TSLServerRequest,
+                                notify: Callable[..., Awaitable[None]]) -> Union[tuple, None]:
+        """
+        Forwards the progress of a worker until it reports its outcome.
+        :return: Outcome message or None, if the worker exited without reporting one (e.g., it was cancelled).
+        """
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(connection.fileno(), readable.set)
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                while connection.poll():
+                    try:
+                        message = connection.recv()
+                    except (EOFError, OSError):
+                        return None
+                    if message[0] != "progress":
+                        return message
+                    request.message = message[2]
+                    await notify(message[1])
+        finally:
+            loop.remove_reader(connection.fileno())
+
+    @staticmethod
+    def __cancel_request(request: TSLServerRequest) -> None:
+        request.cancelled = True
+        if request.process is not None and request.process.is_alive():
+            # SIGKILL, as the worker may not have reset the inherited signal handlers yet
+            request.process.kill()
+
+    async def __status(self, params: dict, send: Callable[[dict], Awaitable[None]]) -> Union[dict, List[dict]]:
+        if "request_id" not in params:
+            return [request.status for request in self.__requests.values()]
+        return self.__request_param(params).status
+
+    async def __cancel(self, params: dict, send: Callable[[dict], Awaitable[None]]) -> dict:
+        request = self.__request_param(params)
+        if not request.finished:
+            self.__cancel_request(request)
+            request.message = "Cancellation requested"
+        return request.status
+
+    async def __health(self, params: dict, send: Callable[[dict], Awaitable[None]]) -> dict:
+        result_cache = self.__generator.result_cache
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "uptime_s": round(time.monotonic() - self.__started, 3),
+            "workers": self.__workers,
+            "queued": sum(1 for request in self.__requests.values() if request.state == "queued"),
+            "running": sum(1 for request in self.__requests.values() if request.state == "running"),
+            **self.__statistics,
+            "model_version": self.__generator.model_version,
+            "result_cache": result_cache.stats_str if result_cache is not None else None
+        }
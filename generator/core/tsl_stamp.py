@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Union
+
+from generator.core.tsl_config import config
+from generator.utils.output_writer import output_writer
+
+# The stamp records a successful single run into the output directory: the stamp key (see
+# TSLGeneratorConfig.generation_stamp_key), the normalized arguments and the size and modification time of every
+# output. A run with the same key is skipped, unless an output was removed or modified in the meantime. The
+# modification time of the stamp is refreshed by every run, thus it can serve as output of a build rule, whose
+# dependencies are listed by the depfile.
+STAMP_VERSION: int = 1
+
+
+def _escape_depfile_path(file: Path) -> str:
+    return f"{file}".replace("\\", "\\\\").replace(" ", "\\ ").replace("#", "\\#").replace("$", "$$")
+
+
+def _output_name(file: Path) -> str:
+    try:
+        return file.relative_to(config.generation_out_path).as_posix()
+    except ValueError:
+        return f"{file}"
+
+
+def stamp_is_up_to_date(key: str) -> bool:
+    """
+    Checks whether the output directory holds the unmodified outputs of a run with the given stamp key.
+    """
+    try:
+        stamp = json.loads(config.stamp_path.read_text())
+        if stamp["version"] != STAMP_VERSION or stamp["key"] != key:
+            return False
+        for file_name, (size, mtime_ns) in stamp["outputs"].items():
+            file_stat = config.generation_out_path.joinpath(file_name).stat()
+            if file_stat.st_size != size or file_stat.st_mtime_ns != mtime_ns:
+                return False
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return True
+
+
+def invalidate_stamp() -> None:
+    """
+    Removes the stamp before the generation starts, thus an interrupted run is never considered up to date.
+    """
+    config.stamp_path.unlink(missing_ok=True)
+
+
+def _emit(stamp_text: Union[str, None], output_files: List[Path]) -> None:
+    if stamp_text is not None:
+        output_writer.write_text(config.stamp_path, stamp_text)
+    if config.stamp_depfile_path is not None:
+        # new input files only change the modification time of their directory, thus the directories are listed as well
+        dependencies = " \\\n".join(f"  {_escape_depfile_path(file)}" for file in
+                                     config.generation_input_files + config.generation_input_directories)
+        output_writer.write_text(config.stamp_depfile_path,
+                                 f"{_escape_depfile_path(config.stamp_path)}: \\\n{dependencies}\n")
+    if config.stamp_output_list_path is not None:
+        output_writer.write_text(config.stamp_output_list_path, "".join(f"{file}\n" for file in output_files))
+    output_writer.flush()
+    # the stamp is the output of the build rule, thus it has to be newer than all inputs after every run
+    os.utime(config.stamp_path)
+
+
+def commit_stamp(key: str, arguments: dict) -> None:
+    """
+    Records a successful run together with the depfile and the output list (if requested). The outputs are taken from
+    the output writer, thus the stamp has to be committed after the generation (and pruning) is finished.
+    :param key: Stamp key of the run.
+    :param arguments: Parsed command line arguments of the run.
+    """
+    output_writer.flush()
+    excluded_files = {config.stamp_path, config.stamp_depfile_path, config.stamp_output_list_path}
+    outputs: Dict[str, List[int]] = dict()
+    output_files: List[Path] = []
+    for file in output_writer.output_files:
+        if file in excluded_files:
+            continue
+        try:
+            file_stat = file.stat()
+        except OSError:
+            continue
+        outputs[_output_name(file)] = [file_stat.st_size, file_stat.st_mtime_ns]
+        output_files.append(file)
+    _emit(json.dumps({"version": STAMP_VERSION, "key": key, "inputs": config.generation_inputs_digest,
+                      "arguments": arguments, "outputs": outputs}, indent=1, sort_keys=True, default=str),
+          output_files)
+
+
+def refresh_stamp() -> None:
+    """
+    Marks the stamp of an up-to-date output directory as current and emits the depfile and the output list (if
+    requested).
+    """
+    stamp = json.loads(config.stamp_path.read_text())
+    _emit(None, [config.generation_out_path.joinpath(file_name) for file_name in stamp["outputs"]])
@@ -8,6 +8,7 @@ from generator.core.tsl_config import config
 from generator.expansions.tsl_translation_unit import TSLTranslationUnitContainer
 from generator.utils.file_utils import strip_common_path_prefix, strip_path_prefix
 from generator.utils.log_utils import LogInit
+from generator.utils.output_writer import output_writer
 
 
 class TSLCMakeGenerator:
@@ -32,7 +33,8 @@ class TSLCMakeGenerator:
                         if flag in hollistic_arch_flags_dict:
                             f = hollistic_arch_flags_dict[flag]
                         result.add(f"{config.compiler_architecture_prefix}{f}")
-            return " ".join(result)
+            # sorted, as the CMakeLists.txt would be rewritten otherwise (forcing a reconfiguration) in every run
+            return " ".join(sorted(result))
         def get_warning_options() -> str:
             silent_warnings = " ".join(config.silent_warnings)
             app = ''
@@ -42,7 +44,7 @@ class TSLCMakeGenerator:
 
         header_files: List[Path] = [strip_common_path_prefix(hf.file_name, config.generation_out_path) for hf in file_generator.library_files]
 
-        config.generation_out_path.joinpath("CMakeLists.txt").write_text(
+        output_writer.write_text(config.generation_out_path.joinpath("CMakeLists.txt"),
             config.get_template("expansions::cmake_lib").render(
                 { **cmake_config,
                     **{
@@ -82,7 +84,7 @@ class TSLCMakeGenerator:
                 tup = ([strip_common_path_prefix(hf.file_name, path) for hf in unit.header_files],
                        [strip_common_path_prefix(sf.file_name, path) for sf in unit.source_files])
                 targets[unit.target_name] = tup
-            path.joinpath("CMakeLists.txt").write_text(
+            output_writer.write_text(path.joinpath("CMakeLists.txt"),
                 config.get_template("expansions::cmake").render(
                     {
                         **cmake_config,
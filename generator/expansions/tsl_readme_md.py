@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Tuple, Generator, Dict, Any
 
 from generator.core.tsl_config import config
+from generator.utils.output_writer import output_writer
 
 
 def create_primitive_data_readme(readme_md_root_path: Path):
@@ -102,7 +103,7 @@ def create_primitive_data_readme(readme_md_root_path: Path):
     primitive_required_fields_list = [x for x in get_field_names(primitive_dict, "required")]
     primitive_optional_fields_list = [x for x in get_field_names(primitive_dict, "optional")]
     primitive_fields_list = list(itertools.zip_longest(primitive_required_fields_list, primitive_optional_fields_list))
-    readme_md_root_path.joinpath("primitive_data/README.md").write_text(
+    output_writer.write_text(readme_md_root_path.joinpath("primitive_data/README.md"),
         config.get_template("readme_md_primitive_data_files").render(
             {
                 "extension": extension_dict,
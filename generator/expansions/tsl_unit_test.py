@@ -12,12 +12,16 @@ from generator.core.ctrl.tsl_lib import TSLLib
 
 import wget
 
+from generator.core.ctrl.tsl_renderer import recorded_input_digest, template_inputs
 from generator.core.model.tsl_file import TSLSourceFile, TSLHeaderFile
 from generator.core.model.tsl_primitive import TSLPrimitive
 from generator.core.tsl_config import config
 from generator.expansions.tsl_translation_unit import TSLTranslationUnit
+from generator.utils.dependency_map import DependencyMap
+from generator.utils.dict_utils import stable_digest
 from generator.utils.file_utils import strip_common_path_prefix
 from generator.utils.log_utils import LogInit
+from generator.utils.output_writer import output_writer
 from generator.utils.yaml_utils import YamlDataType, yaml_load
 from generator.core.ctrl.tsl_dependencies import TSLDependencyGraph
 
@@ -251,7 +255,9 @@ class TSLTestSuite:
                             test["test_name"] = test_name
                         if test_node is None:
                             raise ValueError(f"Does not know test {primitive.declaration.name}::{test['test_name']}")
-                        test['requires'] = list({*test['requires'], *{dep for dep in dep_graph.get_required_primitives(test_node)}})
+                        # sorted, as the order of the missing requirements would differ in every run otherwise (nodes and
+                        # names of the same primitive are ordered by type, as they are equal as strings)
+                        test['requires'] = sorted({*test['requires'], *{dep for dep in dep_graph.get_required_primitives(test_node)}}, key=lambda dep: (str(dep), isinstance(dep, str)))
                         if ("requires" in test) and (len(test['requires']) > 0):
                             updated_primitive_definition_extension_ctype: Dict[str, List[str]] = dict()
                             for target_extension in primitive_definition_extension_ctype:
@@ -459,7 +465,7 @@ class TSLTestDependencyGraph:
                                             missing_tests[key][ctype].extend([offender for offender in offenders[ctype] if offender not in missing_tests[key][ctype]])
                         if len(complete_tests_extension_ctype_dict) > 0:
                             complete_tests_extension_ctype_dict = {
-                                key: list(set(complete_tests_extension_ctype_dict[key]) & set(node.lib_definitions[key]))
+                                key: sorted(set(complete_tests_extension_ctype_dict[key]) & set(node.lib_definitions[key]))
                                 for key in complete_tests_extension_ctype_dict.keys() & node.lib_definitions.keys()}
                         node.complete_tests_lib_definitions = complete_tests_extension_ctype_dict
 
@@ -489,7 +495,7 @@ class TSLTestGenerator:
         pass
 
     @staticmethod
-    def generate(lib: TSLLib, dep_graph: TSLDependencyGraph) -> Generator[Tuple[Path,TSLTranslationUnit], None, None]:
+    def generate(lib: TSLLib, dep_graph: TSLDependencyGraph, dependency_map: DependencyMap = None) -> Generator[Tuple[Path,TSLTranslationUnit], None, None]:
         if not config.expansion_enabled("unit_tests"):
             return
 
@@ -509,6 +515,7 @@ class TSLTestGenerator:
 
         if unit_test_config["draw_dependency_graph"]:
             dependency_graph.draw(root_path.joinpath("test_dependencies.png"))
+            output_writer.keep(root_path.joinpath("test_dependencies.png"))
 
         # print(f"Downloading ... {unit_test_config['test_header_url']}", end='', flush=True)
         tsltestgenerator = TSLTestGenerator()
@@ -526,6 +533,7 @@ class TSLTestGenerator:
             except Exception as e:
                 tsltestgenerator.log(logging.WARN,
                                     f"Could not download the necessary test header file. Check your network connection. {e}")
+        output_writer.keep(root_path.joinpath(header_name))
 
         tests: Dict[str,TSLPrimitiveClassTests] = dict()
         primitive_test: TSLPrimitiveTest = None
@@ -588,19 +596,28 @@ class TSLTestGenerator:
 
             test_by_primitive_dict[primitive_class.primitive_class_name].import_includes(case.data_dict)
 
+        unit_test_templates: Dict[str, str] = template_inputs(config.template_dependencies("expansions::unit_test"))
         for primitiveClassTest, tsf in test_by_primitive_dict.items():
             if primitiveClassTest in tests:
-                tsf.add_code(
-                    config.get_template("expansions::unit_test").render(
-                        {
-                            "tsl_namespace": config.lib_namespace,
-                            "known_extensions": lib.extension_set.known_extensions,
-                            "known_ctypes": lib.primitive_class_set.known_ctypes,
-                            "tests": [tests[primitiveClassTest].as_dict()],
-                            "nested_namespaces": [unit_test_config["namespace"]]
-                        }
-                    )
-                )
+                unit_test_data = {
+                    "tsl_namespace": config.lib_namespace,
+                    "known_extensions": lib.extension_set.known_extensions,
+                    "known_ctypes": lib.primitive_class_set.known_ctypes,
+                    "tests": [tests[primitiveClassTest].as_dict()],
+                    "nested_namespaces": [unit_test_config["namespace"]]
+                }
+                unit_test_code = None
+                if dependency_map is not None:
+                    # the tests of a class depend on the test completeness of other classes, thus the rendered data
+                    # itself is used as input
+                    unit_test_inputs = {**unit_test_templates,
+                                        f"unit_test:{primitiveClassTest}": stable_digest(unit_test_data)}
+                    unit_test_code = dependency_map.lookup(f"{tsf.file_name}", unit_test_inputs, recorded_input_digest)
+                if unit_test_code is None:
+                    unit_test_code = config.get_template("expansions::unit_test").render(unit_test_data)
+                    if dependency_map is not None:
+                        dependency_map.store(f"{tsf.file_name}", unit_test_inputs, unit_test_code)
+                tsf.add_code(unit_test_code)
                 tsf.render_to_file()
                 tsltu.add_source(tsf)
 
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Tuple
+
+
+class ContentStore:
+    """
+    Content-addressed store for generated files. Every unique content is written once as blob (named by its sha256
+    digest) and the generated files are hardlinks to the blobs. Thus, identical files of different output trees (e.g.,
+    the static headers of all flavors) occupy the disk only once. Archivers like tar preserve the hardlinks.
+    Blobs are read-only, as modifying a generated file would modify all trees sharing it. A blob which is not linked
+    from any output tree anymore has a link count of one and is removed by collect_garbage. A blob which is older than
+    the file it should replace is renewed, the trees linked to the previous blob keep their (unmodified) copy.
+    """
+    def __init__(self, root_path: Path) -> None:
+        self.__root_path: Path = Path(os.path.realpath(root_path))
+
+    @property
+    def root_path(self) -> Path:
+        return self.__root_path
+
+    def blob_path(self, digest: str) -> Path:
+        return self.__root_path.joinpath(digest[:2]).joinpath(digest[2:])
+
+    def store(self, data: bytes) -> Path:
+        """
+        Writes a blob for the given content, unless it already exists.
+        :return: Path of the blob.
+        """
+        blob = self.blob_path(hashlib.sha256(data).hexdigest())
+        if not blob.exists():
+            self.__write_blob(blob, data, False)
+        return blob
+
+    @staticmethod
+    def __write_blob(blob: Path, data: bytes, renew: bool) -> None:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = blob.with_name(f".{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_file.write_bytes(data)
+            os.chmod(tmp_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            if renew:
+                # files which are linked to the previous blob keep its inode (and modification time)
+                os.replace(tmp_file, blob)
+            else:
+                # in contrast to a replace, linking fails if a concurrent writer already stored the blob, thus files
+                # which were linked to it in the meantime stay links to the blob
+                os.link(tmp_file, blob)
+        except FileExistsError:
+            pass
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+    def link(self, file: Path, data: bytes) -> bool:
+        """
+        Materializes a file as hardlink to the blob of its content.
+        :param file: Target file. Missing parent directories are created.
+        :param data: Content of the file.
+        :return: False, if the file already was a link to the blob.
+        :raises OSError: If the file can not be linked (e.g., the store resides on another file system).
+        """
+        blob = self.store(data)
+        try:
+            file_stat = os.stat(file)
+        except FileNotFoundError:
+            file_stat = None
+        if file_stat is not None:
+            blob_stat = os.stat(blob)
+            if os.path.samestat(file_stat, blob_stat):
+                return False
+            if blob_stat.st_mtime_ns <= file_stat.st_mtime_ns:
+                # a reused blob carries the modification time of its first write, which may be older than the replaced
+                # file (build systems would miss the change). Touching the blob would modify the modification time of
+                # all other trees linked to it, thus a fresh blob is written instead.
+                self.__write_blob(blob, data, True)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_name(f".{file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(blob, tmp_file)
+            os.replace(tmp_file, file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        return True
+
+    def statistics(self) -> Tuple[int, int, int]:
+        """
+        :return: Number of blobs, stored bytes and bytes of all files linked to the blobs.
+        """
+        blobs = 0
+        stored_bytes = 0
+        linked_bytes = 0
+        for current_root, _, file_names in os.walk(self.__root_path):
+            for file_name in file_names:
+                try:
+                    blob_stat = os.stat(os.path.join(current_root, file_name))
+                except OSError:
+                    continue
+                blobs += 1
+                stored_bytes += blob_stat.st_size
+                linked_bytes += blob_stat.st_size * max(0, blob_stat.st_nlink - 1)
+        return blobs, stored_bytes, linked_bytes
+
+    @property
+    def stats_str(self) -> str:
+        blobs, stored_bytes, linked_bytes = self.statistics()
+        ratio = linked_bytes / stored_bytes if stored_bytes > 0 else 0.0
+        return f"{blobs} blobs, {stored_bytes / (1024 * 1024):.1f} MiB stored for " \
+               f"{linked_bytes / (1024 * 1024):.1f} MiB of outputs (dedup ratio {ratio:.2f})"
+
+    def collect_garbage(self) -> int:
+        """
+        Removes all blobs which are not linked from any output tree.
+        Must not run concurrently to a generation which uses the store.
+        :return: Number of removed blobs.
+        """
+        removed = 0
+        for current_root, _, file_names in os.walk(self.__root_path, topdown=False):
+            for file_name in file_names:
+                blob = Path(current_root).joinpath(file_name)
+                try:
+                    if blob.stat().st_nlink <= 1:
+                        blob.unlink()
+                        removed += 1
+                except OSError:
+                    continue
+            if current_root != f"{self.__root_path}" and not any(Path(current_root).iterdir()):
+                Path(current_root).rmdir()
+        return removed
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, Union
+
+
+class DependencyMap:
+    """
+    Persisted map from generated outputs to the inputs they were derived from.
+    Every record holds the digests of all inputs (e.g., primitive documents, extensions, templates) of a single output
+    together with the rendered payload. An output is up-to-date if its current inputs match the recorded ones, in that
+    case the recorded payload is reused instead of rendering the output again. Thus, a change to a single input only
+    invalidates the outputs which were derived from it.
+    The map is bound to a salt (e.g., generator version and configuration digest). A different salt discards all
+    records. Only records which were used during the last run are persisted.
+    """
+    MAGIC: bytes = b"TSLDM1"
+    DIGEST_SIZE: int = hashlib.sha256().digest_size
+
+    def __init__(self, file: Path, salt: str) -> None:
+        self.__file: Path = file
+        self.__salt: str = salt
+        self.__records: Dict[str, Tuple[Dict[str, str], Any]] = self.__load()
+        self.__used_records: Dict[str, Tuple[Dict[str, str], Any]] = dict()
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def stats_str(self) -> str:
+        return f"{self.__hits} outputs reused, {self.__misses} outputs rendered"
+
+    def __load(self) -> Dict[str, Tuple[Dict[str, str], Any]]:
+        try:
+            raw = self.__file.read_bytes()
+        except OSError:
+            return dict()
+        header_size = len(DependencyMap.MAGIC) + DependencyMap.DIGEST_SIZE
+        payload = raw[header_size:]
+        try:
+            if raw[:len(DependencyMap.MAGIC)] != DependencyMap.MAGIC or \
+                    raw[len(DependencyMap.MAGIC):header_size] != hashlib.sha256(payload).digest():
+                raise ValueError("Checksum mismatch")
+            salt, records = pickle.loads(payload)
+        except Exception:
+            return dict()
+        if salt != self.__salt:
+            return dict()
+        return records
+
+    def lookup(self, output_key: str, inputs: Dict[str, str],
+               digest_fn: Callable[[str], Union[str, None]]) -> Union[Any, None]:
+        """
+        Retrieves the recorded payload of an output, if the output is up-to-date.
+        :param output_key: Identifier of the output.
+        :param inputs: Digests of all inputs of the output which are known upfront.
+        :param digest_fn: Computes the current digest of a recorded input, which is not part of inputs (e.g., a template
+        which was used during rendering). Returns None if the input does not exist anymore.
+        :return: Recorded payload or None, if the output has to be rendered.
+        """
+        record = self.__records.get(output_key)
+        if record is not None and self.__up_to_date(record[0], inputs, digest_fn):
+            self.__hits += 1
+            self.__used_records[output_key] = record
+            return record[1]
+        self.__misses += 1
+        return None
+
+    @staticmethod
+    def __up_to_date(recorded_inputs: Dict[str, str], inputs: Dict[str, str],
+                     digest_fn: Callable[[str], Union[str, None]]) -> bool:
+        for input_key, digest in inputs.items():
+            if recorded_inputs.get(input_key) != digest:
+                return False
+        for input_key, digest in recorded_inputs.items():
+            if input_key not in inputs and digest_fn(input_key) != digest:
+                return False
+        return True
+
+    def store(self, output_key: str, inputs: Dict[str, str], payload: Any) -> None:
+        """
+        Records the inputs and the rendered payload of an output.
+        :param output_key: Identifier of the output.
+        :param inputs: Digests of all inputs of the output.
+        :param payload: Picklable rendered content.
+        """
+        record = (dict(inputs), payload)
+        self.__records[output_key] = record
+        self.__used_records[output_key] = record
+
+    def dependents(self, input_key: str) -> Tuple[str, ...]:
+        """
+        :return: Identifiers of all recorded outputs which were derived from the given input.
+        """
+        return tuple(output_key for output_key, (inputs, _) in self.__records.items() if input_key in inputs)
+
+    def save(self) -> None:
+        """
+        Persists all records which were used (i.e., reused or stored) since the map was loaded.
+        """
+        payload = pickle.dumps((self.__salt, self.__used_records), protocol=pickle.HIGHEST_PROTOCOL)
+        self.__file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.__file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_bytes(DependencyMap.MAGIC + hashlib.sha256(payload).digest() + payload)
+        os.replace(tmp_file, self.__file)
@@ -1,4 +1,8 @@
 import copy
+import hashlib
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
 
 
 def dict_update(left: dict, right: dict) -> dict:
@@ -20,6 +24,45 @@ def dict_update(left: dict, right: dict) -> dict:
             result[right_key] = right_value
     return result
 
+def freeze(data: Any) -> Any:
+    """
+    Creates a read-only snapshot of (nested) dicts and lists. Dicts are turned into read-only mappings and lists into
+    tuples, thus the snapshot can be shared without copying.
+    """
+    if isinstance(data, dict):
+        return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return tuple(freeze(value) for value in data)
+    return data
+
+def __digest_update(digest, data: Any) -> None:
+    if isinstance(data, Mapping):
+        digest.update(b"{")
+        for key, value in data.items():
+            __digest_update(digest, key)
+            digest.update(b":")
+            __digest_update(digest, value)
+        digest.update(b"}")
+    elif isinstance(data, (list, tuple)):
+        digest.update(b"[")
+        for value in data:
+            __digest_update(digest, value)
+            digest.update(b",")
+        digest.update(b"]")
+    elif isinstance(data, (set, frozenset)):
+        __digest_update(digest, sorted(data, key=repr))
+    else:
+        digest.update(f"{type(data).__name__}={data!r};".encode("utf-8"))
+
+def stable_digest(data: Any) -> str:
+    """
+    Computes a sha256 digest of (nested) data, which is independent of the hash seed, thus it can be persisted.
+    Dicts are digested in insertion order, as the order of entries may influence rendered output.
+    """
+    digest = hashlib.sha256()
+    __digest_update(digest, data)
+    return digest.hexdigest()
+
 def intersects(left: set, right: set) -> bool:
     """
     relaxed intersection check (empty set intersects with every set)
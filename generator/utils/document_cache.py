@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import List, Union
+
+from generator.utils.yaml_utils import YamlDataType
+
+
+class DocumentCache:
+    """
+    On-disk cache for validated yaml documents.
+    Every entry holds all validated documents of a single yaml file in a pickled form. The key of an entry is derived
+    from the content of the yaml file and a salt (e.g., schema hash and generator version), thus changes to the file,
+    the schema or the generator invalidate the entry implicitly.
+    Entries are evicted in least-recently-used order if the cache exceeds its size bound. Corrupted entries are
+    removed and treated as a miss.
+    """
+    MAGIC: bytes = b"TSLDC1"
+    DIGEST_SIZE: int = hashlib.sha256().digest_size
+
+    def __init__(self, root_path: Path, salt: str, max_size_bytes: int) -> None:
+        self.__root_path: Path = root_path
+        self.__salt: str = salt
+        self.__max_size_bytes: int = max_size_bytes
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def stats_str(self) -> str:
+        return f"{self.__hits} hits, {self.__misses} misses"
+
+    def count_lookup(self, hit: bool) -> None:
+        """
+        Records the outcome of a lookup. Lookups may happen within worker processes, thus the statistics are
+        maintained by the owner of the cache.
+        """
+        if hit:
+            self.__hits += 1
+        else:
+            self.__misses += 1
+
+    def key(self, file: Path, content_digest: Union[str, None] = None) -> str:
+        """
+        Computes the cache key for a given file.
+        :param file: Path to the yaml file.
+        :param content_digest: Optional precomputed sha256 digest of the file content.
+        :return: hex digest which identifies the cache entry.
+        """
+        if content_digest is None:
+            content_digest = hashlib.sha256(file.read_bytes()).hexdigest()
+        return hashlib.sha256(f"{self.__salt}:{content_digest}".encode("utf-8")).hexdigest()
+
+    def __entry_path(self, key: str) -> Path:
+        return self.__root_path.joinpath(key[:2]).joinpath(f"{key}.pickle")
+
+    def get(self, file: Path, content_digest: Union[str, None] = None) -> Union[List[YamlDataType], None]:
+        """
+        Retrieves the validated documents of a given file.
+        :param file: Path to the yaml file.
+        :param content_digest: Optional precomputed sha256 digest of the file content.
+        :return: List of validated documents or None, if no (valid) entry exists.
+        """
+        entry_path = self.__entry_path(self.key(file, content_digest))
+        try:
+            raw = entry_path.read_bytes()
+        except OSError:
+            return None
+        header_size = len(DocumentCache.MAGIC) + DocumentCache.DIGEST_SIZE
+        payload = raw[header_size:]
+        try:
+            if raw[:len(DocumentCache.MAGIC)] != DocumentCache.MAGIC or \
+                    raw[len(DocumentCache.MAGIC):header_size] != hashlib.sha256(payload).digest():
+                raise ValueError("Checksum mismatch")
+            documents = pickle.loads(payload)
+        except Exception:
+            entry_path.unlink(missing_ok=True)
+            return None
+        try:
+            # refresh modification time, as it is used for LRU eviction
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return documents
+
+    def put(self, file: Path, documents: List[YamlDataType], content_digest: Union[str, None] = None) -> None:
+        """
+        Stores the validated documents of a given file.
+        :param file: Path to the yaml file.
+        :param documents: List of validated documents.
+        :param content_digest: Optional precomputed sha256 digest of the file content.
+        """
+        entry_path = self.__entry_path(self.key(file, content_digest))
+        payload = pickle.dumps(documents, protocol=pickle.HIGHEST_PROTOCOL)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(DocumentCache.MAGIC + hashlib.sha256(payload).digest() + payload)
+        os.replace(tmp_path, entry_path)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes least recently used entries until the cache size is below the size bound.
+        """
+        entries = []
+        total_size = 0
+        for entry in self.__root_path.rglob("*.pickle"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+            total_size += stat.st_size
+        if total_size <= self.__max_size_bytes:
+            return
+        for _, size, entry in sorted(entries, key=lambda x: x[0]):
+            entry.unlink(missing_ok=True)
+            total_size -= size
+            if total_size <= self.__max_size_bytes:
+                break
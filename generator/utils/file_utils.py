@@ -1,11 +1,26 @@
 from __future__ import annotations
 
 from pathlib import Path
+import hashlib
+import os
 import shutil
-from typing import Dict, Generator, Tuple, List
+from typing import Dict, Generator, Iterable, Tuple, List, NamedTuple, Union
 import re
 
+
+class FileState(NamedTuple):
+    size: int
+    mtime_ns: int
+    digest: str
+
+
 class StaticFileTree:
+    """
+    Tracks the files of a directory tree which match a given pattern.
+    For every file, size, modification time and content digest are recorded. The state can be persisted and restored
+    (see state and restore_state), thus changes can be detected across process invocations. The content of a file is
+    only hashed if its size or modification time changed.
+    """
 
     @staticmethod
     def escape_pathstr(p: str) -> str:
@@ -16,7 +31,8 @@ class StaticFileTree:
         return rf"(.*\/{StaticFileTree.escape_pathstr(p)}\/.*)"
 
     def __init__(self, path: Path, pattern: str = "", exclude_paths: List[str] = []):
-        self.__files: Dict[Path, int] = dict()
+        self.__files: Dict[Path, FileState] = dict()
+        self.__committed_files: Dict[Path, FileState] = dict()
         self.__path = path
         self.__pattern = pattern.split("|")
         self.__exclude_paths_regex_str = r"|".join([StaticFileTree.get_dirstr(e) for e in exclude_paths])
@@ -37,40 +53,121 @@ class StaticFileTree:
                 #     print(f"Excluded {f}")
             #yield from self.__path.rglob(p)
 
-    def get_recently_updated_files(self) -> Generator[Path, None, None]:
-        for file in self.__glob():
+    def __current_state(self, file: Path) -> Union[FileState, None]:
+        """
+        Determines the state of a file. The content is only hashed, if the file differs in size or modification time
+        from the last known (or committed) state.
+        """
+        try:
+            stat = file.stat()
+        except OSError:
+            return None
+        for known_state in (self.__files.get(file), self.__committed_files.get(file)):
+            if known_state is not None and known_state.size == stat.st_size and known_state.mtime_ns == stat.st_mtime_ns:
+                return known_state
+        return FileState(stat.st_size, stat.st_mtime_ns, file_digest(file))
+
+    def __filter(self, candidates: Iterable[Path]) -> Generator[Path, None, None]:
+        root_path = self.__path.resolve()
+        for candidate in candidates:
+            try:
+                relative_path = candidate.resolve().relative_to(root_path)
+            except ValueError:
+                continue
+            if not any(relative_path.match(p) for p in self.__pattern):
+                continue
+            file = self.__path.joinpath(relative_path)
+            if len(self.__exclude_paths_regex_str) > 0 and bool(self.__exclude_paths_regex.search(f"{file}")):
+                continue
+            yield file
+
+    def get_recently_updated_files(self, candidates: Union[Iterable[Path], None] = None) -> Generator[Path, None, None]:
+        """
+        Yields all files which were added or modified since the last call within this process.
+        :param candidates: If given, only these files are checked instead of scanning the whole tree (e.g., files
+        reported by a file watcher). Candidates outside of the tree are ignored. Removed candidates are forgotten.
+        """
+        files = self.__glob() if candidates is None else self.__filter(candidates)
+        seen_files = set()
+        for file in files:
+            if candidates is not None and not file.is_file():
+                self.__files.pop(file, None)
+                continue
             if file.is_file():
-                last_accessed_time = file.stat().st_mtime_ns
-                if file not in self.__files:
-                    self.__files[file] = last_accessed_time
+                state = self.__current_state(file)
+                if state is None:
+                    continue
+                seen_files.add(file)
+                known_state = self.__files.get(file)
+                self.__files[file] = state
+                if known_state is None or state != known_state:
                     yield file
-                else:
-                    if last_accessed_time > self.__files[file]:
-                        self.__files[file] = last_accessed_time
-                        yield file
+        if candidates is None:
+            for file in self.__files.keys() - seen_files:
+                del self.__files[file]
 
     def get_files(self) -> Generator[Path, None, None]:
         for file in self.__glob():
             if file.is_file():
-                last_accessed_time = file.stat().st_mtime_ns
-                self.__files[file] = last_accessed_time
-                yield file
+                state = self.__current_state(file)
+                if state is not None:
+                    self.__files[file] = state
+                    yield file
 
     def build(self) -> StaticFileTree:
-        for file in self.__glob():
-            if file.is_file():
-                last_accessed_time = file.stat().st_mtime_ns
-                self.__files[file] = last_accessed_time
+        for _ in self.get_files():
+            pass
         return self
 
+    def digest(self, file: Path) -> Union[str, None]:
+        """
+        :return: Content digest of a file, which was already seen, or None.
+        """
+        state = self.__files.get(file)
+        return state.digest if state is not None else None
+
+    def changed_since_commit(self) -> Tuple[List[Path], List[Path]]:
+        """
+        Compares the known files with the files at the time of the last commit (see commit and restore_state).
+        :return: Tuple of added or modified files and removed files.
+        """
+        modified = [file for file, state in self.__files.items()
+                    if file not in self.__committed_files or self.__committed_files[file].digest != state.digest]
+        removed = [file for file in self.__committed_files if file not in self.__files]
+        return modified, removed
+
+    def commit(self) -> None:
+        """
+        Marks the current state as reference for changed_since_commit (e.g., after a successful generation).
+        """
+        self.__committed_files = dict(self.__files)
+
+    def state(self) -> Dict[str, List]:
+        """
+        :return: JSON serializable representation of the committed state.
+        """
+        return {f"{file}": list(state) for file, state in self.__committed_files.items()}
+
+    def restore_state(self, state: Dict[str, List]) -> None:
+        """
+        Restores a committed state (e.g., from a previous process invocation). Invalid entries are ignored.
+        """
+        committed_files: Dict[Path, FileState] = dict()
+        for file, file_state in state.items():
+            try:
+                committed_files[Path(file)] = FileState(int(file_state[0]), int(file_state[1]), str(file_state[2]))
+            except (TypeError, ValueError, IndexError):
+                continue
+        self.__committed_files = committed_files
+
     @property
     def items(self) -> Generator[Tuple[Path,int], None, None]:
         for k, v in self.__files.items():
-            yield [k,v]
+            yield [k,v.mtime_ns]
 
     @property
     def files(self) -> Dict[Path, int]:
-        return self.__files
+        return {file: state.mtime_ns for file, state in self.__files.items()}
 
 def strip_common_path_prefix(file: Path, prefix: Path) -> Path:
     prefix_parts = prefix.parts
@@ -93,6 +190,58 @@ def remove_path(folder: Path) -> bool:
     return False
 
 
+def file_digest(file: Path) -> str:
+    """
+    Computes the sha256 digest of the content of a given file.
+    :param file: Path to the file.
+    :return: hex digest of the file content.
+    """
+    return hashlib.sha256(file.read_bytes()).hexdigest()
+
+
+def tree_state_digest(root_paths: List[Path]) -> str:
+    """
+    Computes a digest over the paths, sizes and modification times of all files within the given directory trees.
+    The content of the files is not read, thus the digest is cheap to compute, but only suited to detect changes.
+    :param root_paths: Directories which are scanned recursively.
+    :return: hex digest of the state of the trees.
+    """
+    sha = hashlib.sha256()
+    for root_path in root_paths:
+        for current_root, dir_names, file_names in os.walk(root_path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                file = os.path.join(current_root, file_name)
+                try:
+                    stat = os.stat(file)
+                except OSError:
+                    continue
+                sha.update(f"{file}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf-8"))
+    return sha.hexdigest()
+
+
+def tree_content_digest(root_paths: List[Path]) -> str:
+    """
+    Computes a digest over the relative paths and the content of all files within the given directory trees. In
+    contrast to tree_state_digest, it is independent of modification times and of the location of the trees.
+    :param root_paths: Directories which are scanned recursively.
+    :return: hex digest of the content of the trees.
+    """
+    sha = hashlib.sha256()
+    for root_path in root_paths:
+        sha.update(b"\1")
+        for current_root, dir_names, file_names in os.walk(root_path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                file = Path(current_root).joinpath(file_name)
+                try:
+                    digest = file_digest(file)
+                except OSError:
+                    continue
+                sha.update(f"{file.relative_to(root_path).as_posix()}\0{digest}\0".encode("utf-8"))
+    return sha.hexdigest()
+
+
 def get_relative_path(from_path: Path, to_path: Path) -> Path:
     first_divergence = 0
     for idx in range(min(len(from_path.parts), len(to_path.parts))):
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, List, Set, Tuple, Union
+
+
+class FileWatcher(abc.ABC):
+    """
+    Watches directory trees in the background and collects the paths of all files which were created, modified or
+    removed (the dirty set). If the watcher lost track of changes (e.g., an event queue overflow), a full rescan is
+    requested instead.
+    """
+    def __init__(self, root_paths: List[Path]) -> None:
+        self._root_paths: List[Path] = list(root_paths)
+        self._lock: threading.Lock = threading.Lock()
+        self._dirty_files: Set[Path] = set()
+        # nothing is known about the watched trees upfront, thus the first consumer has to scan them
+        self._rescan_required: bool = True
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: Union[threading.Thread, None] = None
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__
+
+    def _mark_dirty(self, file: Path) -> None:
+        with self._lock:
+            self._dirty_files.add(file)
+
+    def _mark_rescan(self) -> None:
+        with self._lock:
+            self._rescan_required = True
+
+    def take_changes(self) -> Tuple[Set[Path], bool]:
+        """
+        Retrieves and resets the changes since the last call.
+        :return: Tuple of dirty files and whether a full rescan is required.
+        """
+        with self._lock:
+            dirty_files, rescan_required = self._dirty_files, self._rescan_required
+            self._dirty_files = set()
+            self._rescan_required = False
+        return dirty_files, rescan_required
+
+    def start(self) -> FileWatcher:
+        self._thread = threading.Thread(target=self._run, name=f"tsl_{self.name}", daemon=True)
+        _running_watchers.add(self)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        _running_watchers.discard(self)
+
+    def _before_fork(self) -> None:
+        self._lock.acquire()
+
+    def _after_fork_in_parent(self) -> None:
+        self._lock.release()
+
+    def _after_fork_in_child(self) -> None:
+        # the watcher thread is not inherited by the child, which only keeps the changes collected so far
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @abc.abstractmethod
+    def _run(self) -> None:
+        """
+        Collects changes on the watcher thread until the stop event is set.
+        """
+
+
+# The lock of every running watcher is held while the process forks (e.g., the loader pool of parallel_map or the
+# workers of the server), thus a child never inherits a lock which was held by a watcher thread.
+_running_watchers: weakref.WeakSet = weakref.WeakSet()
+
+
+def _before_fork() -> None:
+    for watcher in list(_running_watchers):
+        watcher._before_fork()
+
+
+def _after_fork_in_parent() -> None:
+    for watcher in list(_running_watchers):
+        watcher._after_fork_in_parent()
+
+
+def _after_fork_in_child() -> None:
+    for watcher in list(_running_watchers):
+        watcher._after_fork_in_child()
+    _running_watchers.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent,
+                        after_in_child=_after_fork_in_child)
+
+
+class PollingFileWatcher(FileWatcher):
+    """
+    Portable watcher, which periodically compares the size and modification time of all files.
+    """
+    def __init__(self, root_paths: List[Path], interval_s: float = 1.0) -> None:
+        super().__init__(root_paths)
+        self.__interval_s: float = interval_s
+        self.__snapshot: Dict[Path, Tuple[int, int]] = self.__scan()
+
+    def __scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot: Dict[Path, Tuple[int, int]] = dict()
+        pending: List[Path] = list(self._root_paths)
+        while pending:
+            try:
+                entries = list(os.scandir(pending.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(Path(entry.path))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        snapshot[Path(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return snapshot
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.__interval_s):
+            snapshot = self.__scan()
+            for file, file_state in snapshot.items():
+                if self.__snapshot.get(file) != file_state:
+                    self._mark_dirty(file)
+            for file in self.__snapshot.keys() - snapshot.keys():
+                self._mark_dirty(file)
+            self.__snapshot = snapshot
+
+
+class InotifyFileWatcher(FileWatcher):
+    """
+    Linux watcher based on inotify. Every directory of the watched trees is registered, newly created directories are
+    registered as they appear.
+    """
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | \
+        IN_DELETE_SELF | IN_MOVE_SELF
+    EVENT_HEADER = struct.Struct("iIII")
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux") and InotifyFileWatcher.__load_libc() is not None
+
+    @staticmethod
+    def __load_libc():
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch"):
+                return libc
+        except OSError:
+            pass
+        return None
+
+    def __init__(self, root_paths: List[Path]) -> None:
+        super().__init__(root_paths)
+        self.__libc = InotifyFileWatcher.__load_libc()
+        self.__fd: int = self.__libc.inotify_init1(InotifyFileWatcher.IN_NONBLOCK | InotifyFileWatcher.IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.__watched_dirs: Dict[int, Path] = dict()
+        for root_path in self._root_paths:
+            self.__add_tree(root_path, False)
+
+    def __add_tree(self, dir_path: Path, mark_files_dirty: bool) -> None:
+        pending: List[Path] = [dir_path]
+        while pending:
+            current_dir = pending.pop()
+            wd = self.__libc.inotify_add_watch(self.__fd, os.fsencode(current_dir), InotifyFileWatcher.WATCH_MASK)
+            if wd < 0:
+                # the watch limit may be exhausted, thus changes can not be tracked reliably anymore
+                self._mark_rescan()
+                continue
+            self.__watched_dirs[wd] = current_dir
+            try:
+                entries = list(os.scandir(current_dir))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif mark_files_dirty:
+                    self._mark_dirty(Path(entry.path))
+
+    def __handle_events(self, buffer: bytes) -> None:
+        offset = 0
+        while offset + InotifyFileWatcher.EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, name_length = InotifyFileWatcher.EVENT_HEADER.unpack_from(buffer, offset)
+            offset += InotifyFileWatcher.EVENT_HEADER.size
+            name = buffer[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+            if mask & InotifyFileWatcher.IN_Q_OVERFLOW:
+                self._mark_rescan()
+                continue
+            if mask & InotifyFileWatcher.IN_IGNORED:
+                self.__watched_dirs.pop(wd, None)
+                continue
+            dir_path = self.__watched_dirs.get(wd)
+            if dir_path is None or len(name) == 0:
+                continue
+            path = dir_path.joinpath(os.fsdecode(name))
+            if mask & InotifyFileWatcher.IN_ISDIR:
+                if mask & (InotifyFileWatcher.IN_CREATE | InotifyFileWatcher.IN_MOVED_TO):
+                    self.__add_tree(path, True)
+                elif mask & InotifyFileWatcher.IN_MOVED_FROM:
+                    # the files of the moved directory are unknown at this point
+                    self._mark_rescan()
+            else:
+                self._mark_dirty(path)
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([self.__fd], [], [], 0.5)
+                if not readable:
+                    continue
+                try:
+                    buffer = os.read(self.__fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self.__handle_events(buffer)
+        finally:
+            os.close(self.__fd)
+
+
+def create_file_watcher(root_paths: List[Path], mode: str = "auto", poll_interval_s: float = 1.0) -> FileWatcher:
+    """
+    Creates and starts a watcher for the given directory trees.
+    :param root_paths: Directories which are watched recursively.
+    :param mode: 'inotify', 'poll' or 'auto' (inotify if available, polling otherwise).
+    :param poll_interval_s: Interval of the polling watcher in seconds.
+    :return: Started watcher.
+    """
+    if mode in ("auto", "inotify") and InotifyFileWatcher.available():
+        try:
+            return InotifyFileWatcher(root_paths).start()
+        except OSError:
+            if mode == "inotify":
+                raise
+    elif mode == "inotify":
+        raise OSError("inotify is not available on this platform")
+    return PollingFileWatcher(root_paths, poll_interval_s).start()
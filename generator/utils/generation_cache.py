@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Generator, List, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:
+    # e.g., Windows: entries are still replaced atomically, only concurrent generations are not serialized
+    fcntl = None
+
+
+class GenerationCache:
+    """
+    On-disk cache for complete output trees, which is shared by all generator processes using the same cache directory
+    (e.g., the build directories of a CI machine). Every entry holds the content of all files of a single generation,
+    keyed by a digest over all inputs of the generation (see TSLGeneratorConfig.generation_cache_key). Thus, a hit
+    materializes the output tree without loading the primitive data.
+    Generated files may embed their own location. Before a tree is stored, these occurrences are replaced by
+    placeholders (relocations), which are substituted by the location of the requesting output directory on a hit.
+    Processes which generate the same key are serialized through file locks, thus concurrently started builds
+    generate a tree only once. Entries are evicted in least-recently-used order if the cache exceeds its size bound.
+    Corrupted entries are removed and treated as a miss.
+    """
+    MAGIC: bytes = b"TSLGC1"
+    DIGEST_SIZE: int = hashlib.sha256().digest_size
+    LOCK_STRIPES: int = 256
+
+    def __init__(self, root_path: Path, max_size_bytes: int) -> None:
+        self.__root_path: Path = Path(root_path)
+        self.__max_size_bytes: int = max_size_bytes
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    @property
+    def root_path(self) -> Path:
+        return self.__root_path
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __entry_path(self, key: str) -> Path:
+        return self.__root_path.joinpath(key[:2]).joinpath(f"{key}.entry")
+
+    def __entries(self) -> Generator[Tuple[Path, os.stat_result], None, None]:
+        for entry in self.__root_path.glob("*/*.entry"):
+            try:
+                yield entry, entry.stat()
+            except OSError:
+                continue
+
+    @contextmanager
+    def __file_lock(self, lock_file: Path) -> Generator[None, None, None]:
+        if fcntl is None:
+            yield
+            return
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_file, "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def locked(self, key: str) -> Generator[GenerationCache, None, None]:
+        """
+        Serializes all processes which look up (and generate) the given key. Keys are mapped onto a fixed number of
+        lock files, thus no lock file has to be removed during eviction.
+        """
+        stripe = int(key[:2], 16) % GenerationCache.LOCK_STRIPES
+        with self.__file_lock(self.__root_path.joinpath("locks").joinpath(f"{stripe:02x}.lock")):
+            yield self
+
+    @staticmethod
+    def __relocate(data: bytes, replacements: List[Tuple[bytes, bytes]]) -> bytes:
+        for source, target in replacements:
+            data = data.replace(source, target)
+        return data
+
+    def get(self, key: str, relocations: List[Tuple[bytes, bytes]]) -> Union[Dict[Path, bytes], None]:
+        """
+        Retrieves the output tree of a given key.
+        :param key: Key of the generation.
+        :param relocations: Pairs of (placeholder, occurrence of the location of the output directory). The placeholders
+        are substituted within the content of all files.
+        :return: Content of all files keyed by their path relative to the output directory or None, if no (valid) entry
+        exists.
+        """
+        entry_path = self.__entry_path(key)
+        try:
+            raw = entry_path.read_bytes()
+        except OSError:
+            self.__count_lookup(False)
+            return None
+        header_size = len(GenerationCache.MAGIC) + GenerationCache.DIGEST_SIZE
+        payload = raw[header_size:]
+        try:
+            if raw[:len(GenerationCache.MAGIC)] != GenerationCache.MAGIC or \
+                    raw[len(GenerationCache.MAGIC):header_size] != hashlib.sha256(payload).digest():
+                raise ValueError("Checksum mismatch")
+            stored: Dict[str, bytes] = pickle.loads(zlib.decompress(payload))
+        except Exception:
+            entry_path.unlink(missing_ok=True)
+            self.__count_lookup(False)
+            return None
+        try:
+            # refresh modification time, as it is used for LRU eviction
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.__count_lookup(True)
+        return {Path(file): GenerationCache.__relocate(data, relocations) for file, data in stored.items()}
+
+    def put(self, key: str, recorded: Dict[Path, bytes], relocations: List[Tuple[bytes, bytes]]) -> bool:
+        """
+        Stores the output tree of a given key.
+        :param key: Key of the generation.
+        :param recorded: Content of all files keyed by their path relative to the output directory.
+        :param relocations: Pairs of (placeholder, occurrence of the location of the output directory). The occurrences
+        are substituted by the placeholders within the content of all files.
+        :return: False, if the tree could not be stored, as it contains files outside of the output directory.
+        """
+        if any(file.is_absolute() for file in recorded.keys()):
+            return False
+        replacements = [(location, placeholder) for placeholder, location in relocations]
+        payload = zlib.compress(pickle.dumps(
+            {file.as_posix(): GenerationCache.__relocate(data, replacements) for file, data in recorded.items()},
+            protocol=pickle.HIGHEST_PROTOCOL), 1)
+        entry_path = self.__entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(GenerationCache.MAGIC + hashlib.sha256(payload).digest() + payload)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """
+        Removes least recently used entries until the cache size is below the size bound.
+        """
+        with self.__file_lock(self.__root_path.joinpath("cache.lock")):
+            entries = [(entry_stat.st_mtime_ns, entry_stat.st_size, entry) for entry, entry_stat in self.__entries()]
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries, key=lambda x: x[0]):
+                if total_size <= self.__max_size_bytes:
+                    break
+                entry.unlink(missing_ok=True)
+                total_size -= size
+
+    def __statistics_path(self) -> Path:
+        return self.__root_path.joinpath("stats.json")
+
+    def __count_lookup(self, hit: bool) -> None:
+        """
+        Records the outcome of a lookup within this process and within the statistics of the cache directory.
+        """
+        if hit:
+            self.__hits += 1
+        else:
+            self.__misses += 1
+        try:
+            with self.__file_lock(self.__root_path.joinpath("cache.lock")):
+                hits, misses = self.statistics()[:2]
+                self.__root_path.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.__statistics_path().with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps({"hits": hits + int(hit), "misses": misses + int(not hit)}))
+                os.replace(tmp_path, self.__statistics_path())
+        except OSError:
+            pass
+
+    def statistics(self) -> Tuple[int, int, int, int]:
+        """
+        :return: Hits and misses of all processes which used the cache directory, number of entries and their size.
+        """
+        try:
+            counters = json.loads(self.__statistics_path().read_text())
+            hits, misses = int(counters["hits"]), int(counters["misses"])
+        except (OSError, ValueError, KeyError, TypeError):
+            hits, misses = 0, 0
+        entries = [entry_stat.st_size for _, entry_stat in self.__entries()]
+        return hits, misses, len(entries), sum(entries)
+
+    @property
+    def stats_str(self) -> str:
+        hits, misses, entries, size = self.statistics()
+        return f"{self.__hits} hits, {self.__misses} misses (overall {hits} hits, {misses} misses, " \
+               f"{entries} entries, {size / (1024 * 1024):.1f} MiB)"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Tuple, Union
+import functools
 import re
 from pathlib import Path
 import subprocess
@@ -17,7 +18,10 @@ class GitUtils:
     abbrev_hash: str
     hash: str
     submodules: List[GitUtils]
+    abbrev_hash_length = 7
     submodule_regex_pattern = re.compile(r"(\S+)\s+(\S+)\s+(\S+)")
+    config_section_regex_pattern = re.compile(r'^\s*\[\s*([^\s"\]]+)(?:\s+"(.*)")?\s*\]')
+    config_entry_regex_pattern = re.compile(r'^\s*([A-Za-z0-9-]+)\s*=\s*(.*?)\s*$')
 
     def __create_list(self, indentation: int) -> List[str]:
         result: List[str] = []
@@ -53,14 +57,137 @@ class GitUtils:
         return f"{self.remote_url}:/{self.branch}@{self.abbrev_hash}"
 
     @staticmethod
-    def get_git_data() -> GitUtils:
+    def __find_git_dir(path: Path) -> Tuple[Path, Path, Path]:
+        """
+        Searches the git directory for a given working tree path (or one of its parents).
+        :return: Tuple of working tree root, git directory and common git directory (differs for worktrees).
+        """
+        for candidate in [path, *path.parents]:
+            dot_git = candidate.joinpath(".git")
+            if dot_git.is_dir():
+                git_dir = dot_git
+            elif dot_git.is_file():
+                content = dot_git.read_text().strip()
+                if not content.startswith("gitdir:"):
+                    raise LookupError(f"Unsupported .git file in {candidate}")
+                git_dir = candidate.joinpath(content[len("gitdir:"):].strip()).resolve()
+            else:
+                continue
+            common_dir = git_dir
+            if git_dir.joinpath("commondir").is_file():
+                common_dir = git_dir.joinpath(git_dir.joinpath("commondir").read_text().strip()).resolve()
+            return candidate, git_dir, common_dir
+        raise LookupError(f"{path} is not within a git repository")
+
+    @staticmethod
+    def __read_config(file: Path) -> Dict[str, Dict[str, str]]:
+        """
+        Minimal reader for git config style files (.git/config, .gitmodules).
+        :return: Dict of sections ('section' or 'section "subsection"') to the entries of the section.
+        """
+        result: Dict[str, Dict[str, str]] = dict()
+        current: Union[Dict[str, str], None] = None
+        if not file.is_file():
+            return result
+        for line in file.read_text().splitlines():
+            stripped = line.strip()
+            if len(stripped) == 0 or stripped[0] in "#;":
+                continue
+            section_match = GitUtils.config_section_regex_pattern.match(line)
+            if section_match:
+                name = section_match.group(1).lower()
+                if section_match.group(2) is not None:
+                    name = f'{name} "{section_match.group(2)}"'
+                current = result.setdefault(name, dict())
+                continue
+            entry_match = GitUtils.config_entry_regex_pattern.match(line)
+            if entry_match and current is not None:
+                current[entry_match.group(1).lower()] = entry_match.group(2).strip('"')
+        return result
+
+    @staticmethod
+    def __resolve_ref(ref: str, git_dir: Path, common_dir: Path) -> str:
+        for directory in (git_dir, common_dir):
+            ref_file = directory.joinpath(ref)
+            if ref_file.is_file():
+                return ref_file.read_text().strip()
+        packed_refs = common_dir.joinpath("packed-refs")
+        if packed_refs.is_file():
+            for line in packed_refs.read_text().splitlines():
+                if line.startswith("#") or line.startswith("^"):
+                    continue
+                parts = line.split(" ", 1)
+                if len(parts) == 2 and parts[1].strip() == ref:
+                    return parts[0]
+        raise LookupError(f"Could not resolve {ref}")
+
+    @staticmethod
+    def read_git_data(path: Path = None) -> GitUtils:
+        """
+        Reads the git metadata of a working tree directly from the git directory (HEAD, refs and config) without
+        spawning git processes. Submodules which are not checked out are skipped.
+        :param path: Path within the working tree (default: current working directory).
+        :return: Git metadata.
+        :raises LookupError: If any information can not be determined.
+        """
+        local_path: Path = Path().resolve() if path is None else path.resolve()
+        root_path, git_dir, common_dir = GitUtils.__find_git_dir(local_path)
+        remote = GitUtils.__read_config(common_dir.joinpath("config")).get('remote "origin"', dict())
+        if "url" not in remote:
+            raise LookupError("No remote origin configured")
+        head = git_dir.joinpath("HEAD").read_text().strip()
+        if head.startswith("ref:"):
+            ref = head[len("ref:"):].strip()
+            branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+            hash = GitUtils.__resolve_ref(ref, git_dir, common_dir)
+        else:
+            branch = "HEAD"
+            hash = head
+        submodules: List[GitUtils] = []
+        for name, submodule in GitUtils.__read_config(root_path.joinpath(".gitmodules")).items():
+            if not name.startswith("submodule") or "path" not in submodule:
+                continue
+            submodule_path = root_path.joinpath(submodule["path"])
+            if submodule_path.joinpath(".git").exists():
+                submodules.append(GitUtils.read_git_data(submodule_path))
+        return GitUtils(local_path, remote["url"], branch, GitUtils.abbreviate(hash), hash, submodules)
+
+    @staticmethod
+    def abbreviate(hash: str) -> str:
+        """
+        Abbreviates a commit hash. Both ways of reading the git metadata use a fixed length (instead of 'git describe'),
+        thus the version embedded into the generated files does not depend on whether git had to be spawned.
+        """
+        return hash[:GitUtils.abbrev_hash_length]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def git_information(path: Path = None) -> Tuple[Tuple[str, ...], str]:
+        """
+        Collects the git metadata once per process.
+        :param path: Path within the working tree (default: current working directory).
+        :return: Tuple of the indented information lines and the version string.
+        """
+        git_data = GitUtils.get_git_data(path)
+        return tuple(git_data.create_indented_list()), git_data.create_version_str()
+
+    @staticmethod
+    def get_git_data(path: Path = None) -> GitUtils:
+        try:
+            return GitUtils.read_git_data(path)
+        except Exception:
+            pass
+        return GitUtils.query_git_data()
+
+    @staticmethod
+    def query_git_data() -> GitUtils:
         local_path: Path = Path().resolve()
         try:
             remote_url: str = subprocess.check_output(["git", "config", "--get", "remote.origin.url"]).strip().decode(
                 "utf-8")
             branch: str = subprocess.check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"]).strip().decode("utf-8")
-            abbrev_hash: str = subprocess.check_output(["git", "describe", "--always"]).strip().decode("utf-8")
-            hash: str = subprocess.check_output(["git", "rev-parse", abbrev_hash]).strip().decode("utf-8")
+            hash: str = subprocess.check_output(["git", "rev-parse", "HEAD"]).strip().decode("utf-8")
+            abbrev_hash: str = GitUtils.abbreviate(hash)
             submodules_status: List[str] = subprocess.check_output(["git", "submodule", "status"]).strip().decode(
                 "utf-8").split("\n")
             submodules: List[GitUtils] = []
@@ -69,7 +196,7 @@ class GitUtils:
                     continue
                 submodule_path: str = GitUtils.submodule_regex_pattern.search(submodule_str).group(2)
                 os.chdir(local_path.joinpath(submodule_path))
-                submodules.append(GitUtils.get_git_data())
+                submodules.append(GitUtils.query_git_data())
                 os.chdir(local_path)
             return GitUtils(local_path, remote_url, branch, abbrev_hash, hash, submodules)
         except Exception as err:
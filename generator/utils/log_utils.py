@@ -1,9 +1,73 @@
 import functools
 import inspect
 import logging
-import types
+import os
+import sys
 from typing import Union
 
+# If set, the logging decorators are replaced by (almost) pass-through wrappers at decoration time. This only takes
+# effect if the environment variable is set before the generator modules are imported.
+LOGGING_COMPILED_OUT: bool = os.environ.get("TSL_GENERATOR_FAST", "0").lower() not in ("", "0", "false", "no")
+_fast_logging: bool = LOGGING_COMPILED_OUT
+
+
+def enable_fast_logging(enabled: bool = True) -> None:
+    """
+    Switches the logging into fast mode. In fast mode, only warnings and errors are emitted and the @log and LogInit
+    decorators neither trace calls nor format arguments.
+    :param enabled: True, if fast mode should be enabled.
+    """
+    global _fast_logging
+    _fast_logging = enabled or LOGGING_COMPILED_OUT
+    reset_log_thresholds()
+
+
+def fast_logging_enabled() -> bool:
+    return _fast_logging
+
+
+@functools.lru_cache(maxsize=None)
+def log_threshold(logger: logging.Logger) -> int:
+    """
+    Determines the lowest level of a message which would be emitted by any handler of the given logger.
+    The threshold is cached, thus reset_log_thresholds has to be called after the logging configuration changed.
+    :param logger: Logger instance.
+    :return: Lowest log level which is emitted.
+    """
+    handler_levels = []
+    current = logger
+    while current is not None:
+        handler_levels.extend(handler.level for handler in current.handlers)
+        if not current.propagate:
+            break
+        current = current.parent
+    if len(handler_levels) == 0:
+        handler_levels.append(logging.lastResort.level if logging.lastResort is not None else logging.CRITICAL + 1)
+    threshold = max(logger.getEffectiveLevel(), min(handler_levels), logger.manager.disable + 1)
+    if _fast_logging:
+        return max(threshold, logging.WARNING)
+    return threshold
+
+
+def reset_log_thresholds() -> None:
+    log_threshold.cache_clear()
+
+
+def log_enabled(logger: Union[logging.Logger, logging.LoggerAdapter], loglevel: int) -> bool:
+    if isinstance(logger, logging.LoggerAdapter):
+        logger = logger.logger
+    return loglevel >= log_threshold(logger)
+
+
+@functools.lru_cache(maxsize=None)
+def class_file(cls: type) -> str:
+    return inspect.getfile(cls)
+
+
+@functools.lru_cache(maxsize=None)
+def class_log_adapter(class_name: str) -> logging.LoggerAdapter:
+    return TSLLogAdapter(logging.getLogger(class_name))
+
 class TSLLogAdapter(logging.LoggerAdapter):
     def __init__(self, logger):
         super().__init__(logger, {})
@@ -47,7 +111,7 @@ def get_logger(*args, **kwargs):
         return next(iter(logger_params))
     logger = get_logging_instance_from_self(*args)
     if logger is None:
-        return TSLLogAdapter(logging.getLogger(f"{inspect.stack()[1].function}"))
+        return TSLLogAdapter(logging.getLogger(f"{sys._getframe(1).f_code.co_name}"))
         # raise Exception("No logger defined.")
     return logger
 
@@ -64,76 +128,102 @@ def get_params_str_without_logger_and_self(*args, **kwargs) -> str:
 
 
 def logmsg_decorator_fn(self, loglevel, msg: str) -> None:
-    self.decorated_logger.log(
+    logger = self.decorated_logger
+    if loglevel < log_threshold(logger.logger):
+        return
+    logger.log(
         loglevel,
         msg,
         extra={
-            "decorated_filename": inspect.getfile(self.__class__),
-            "decorated_funcName": inspect.stack()[1].function
+            "decorated_filename": class_file(self.__class__),
+            "decorated_funcName": sys._getframe(1).f_code.co_name
         }
     )
 
 class LogInit:
     def __call__(self,f):
+        filename = inspect.getfile(f)
+        if LOGGING_COMPILED_OUT:
+            def wrap_fast(init_self, *args, **kwargs):
+                init_self.decorated_logger = class_log_adapter(init_self.__class__.__name__)
+                init_self.log = functools.partial(logmsg_decorator_fn, init_self)
+                f(init_self, *args, **kwargs)
+            return wrap_fast
+
         def wrap(init_self,*args,**kwargs):
             try:
-                init_self.decorated_logger = TSLLogAdapter(logging.getLogger(f"{init_self.__class__.__name__}"))
-                init_self.log = types.MethodType(logmsg_decorator_fn, init_self)
+                init_self.decorated_logger = class_log_adapter(init_self.__class__.__name__)
+                # a partial (in contrast to a bound method) keeps the instance picklable
+                init_self.log = functools.partial(logmsg_decorator_fn, init_self)
+                if not log_enabled(init_self.decorated_logger, logging.DEBUG):
+                    f(init_self, *args, **kwargs)
+                    return
                 signature = get_params_str_without_logger_and_self(*args, **kwargs)
                 f(init_self,*args,**kwargs)
                 init_self.decorated_logger.debug(
                     f"Created instance of {init_self.__class__.__name__}({signature})",
                     extra={
-                        "decorated_filename":inspect.getfile(f),
+                        "decorated_filename": filename,
                         "decorated_funcName": "__init__"
                     }
                 )
             except Exception as e:
-                TSLLogAdapter(logging.getLogger(f"{init_self.__class__.__name__}")).exception(
-                    f"Exception during creation of {init_self.__class__.__name__}. exception: {str(e)}",
-                    extra={
-                        "decorated_filename": inspect.getfile(f),
-                        "decorated_funcName": "__init__"
-                    }
-                )
+                adapter = class_log_adapter(init_self.__class__.__name__)
+                if log_enabled(adapter, logging.ERROR):
+                    adapter.exception(
+                        f"Exception during creation of {init_self.__class__.__name__}. exception: {str(e)}",
+                        extra={
+                            "decorated_filename": filename,
+                            "decorated_funcName": "__init__"
+                        }
+                    )
                 raise e
         return wrap
 
 
 def log(_func=None, successLevel=logging.DEBUG):
     def decorator_log(func):
+        if LOGGING_COMPILED_OUT:
+            return func
+        filename = inspect.getfile(func)
+
         @functools.wraps(func)
         def logging_wrapper(*args, **kwargs):
+            if _fast_logging:
+                return func(*args, **kwargs)
             logger = get_logger(*args, **kwargs)
-            signature = get_params_str_without_logger_and_self(*args, **kwargs)
-            logger.debug(
-                f"Called {func.__name__}({signature}).",
-                extra={
-                    "decorated_filename":inspect.getfile(func),
-                    "decorated_funcName": func.__name__
-                }
-            )
-            try:
-
-                result = func(*args, **kwargs)
-                logger.log(
-                    successLevel,
-                    f"Returning {type(result)} ({abbrev_str(repr(result))}) from {func.__name__}.",
+            if log_enabled(logger, logging.DEBUG):
+                signature = get_params_str_without_logger_and_self(*args, **kwargs)
+                logger.debug(
+                    f"Called {func.__name__}({signature}).",
                     extra={
-                        "decorated_filename":inspect.getfile(func),
+                        "decorated_filename": filename,
                         "decorated_funcName": func.__name__
                     }
                 )
+            try:
+
+                result = func(*args, **kwargs)
+                if log_enabled(logger, successLevel):
+                    logger.log(
+                        successLevel,
+                        f"Returning {type(result)} ({abbrev_str(repr(result))}) from {func.__name__}.",
+                        extra={
+                            "decorated_filename": filename,
+                            "decorated_funcName": func.__name__
+                        }
+                    )
                 return result
             except Exception as e:
                 # a = inspect.
-                logger.exception(
-                    f"Exception raised in {func.__name__}. exception: {str(e)}",
-                    extra={
-                        "decorated_filename":inspect.getfile(func),
-                        "decorated_funcName": func.__name__
-                    }
-                )
+                if log_enabled(logger, logging.ERROR):
+                    logger.exception(
+                        f"Exception raised in {func.__name__}. exception: {str(e)}",
+                        extra={
+                            "decorated_filename": filename,
+                            "decorated_funcName": func.__name__
+                        }
+                    )
                 raise e
         return logging_wrapper
 
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, TypeVar, Union
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Bounded in-memory cache which evicts the least recently used entry if the maximum number of entries is exceeded.
+    Optionally, the cache is also bounded by the accumulated size of its values (as determined by size_fn). Values
+    which exceed the size bound on their own are not cached at all.
+    The cache records hits and misses for statistics.
+    """
+    def __init__(self, max_entries: int, max_size: int = 0, size_fn: Callable[[V], int] = None) -> None:
+        self.__max_entries: int = max(1, max_entries)
+        self.__max_size: int = max_size if size_fn is not None else 0
+        self.__size_fn: Callable[[V], int] = size_fn
+        self.__entries: OrderedDict[K, V] = OrderedDict()
+        self.__sizes: Dict[K, int] = dict()
+        self.__total_size: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.__entries
+
+    @property
+    def max_entries(self) -> int:
+        return self.__max_entries
+
+    @property
+    def total_size(self) -> int:
+        return self.__total_size
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.__hits + self.__misses
+        return self.__hits / lookups if lookups > 0 else 0.0
+
+    @property
+    def stats_str(self) -> str:
+        return f"{self.__hits} hits, {self.__misses} misses ({self.hit_rate:.1%} hit rate, {len(self)} entries)"
+
+    def get_or_create(self, key: K, create_fn: Callable[[K], V]) -> V:
+        """
+        Retrieves the value for a given key. If the key is not cached, the value is created using create_fn and
+        inserted into the cache.
+        :param key: Key of the entry.
+        :param create_fn: Function which creates the value from the key.
+        :return: Cached or newly created value.
+        """
+        with self.__lock:
+            if key in self.__entries:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+                return self.__entries[key]
+            self.__misses += 1
+        value = create_fn(key)
+        self.put(key, value)
+        return value
+
+    def get(self, key: K) -> Union[V, None]:
+        """
+        Retrieves the value for a given key.
+        :return: Cached value or None, if the key is not cached.
+        """
+        with self.__lock:
+            if key in self.__entries:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+                return self.__entries[key]
+            self.__misses += 1
+            return None
+
+    def put(self, key: K, value: V) -> None:
+        with self.__lock:
+            self.__remove(key)
+            size = self.__size_fn(value) if self.__size_fn is not None else 0
+            if 0 < self.__max_size < size:
+                return
+            self.__entries[key] = value
+            self.__sizes[key] = size
+            self.__total_size += size
+            while len(self.__entries) > self.__max_entries or 0 < self.__max_size < self.__total_size:
+                self.__remove(next(iter(self.__entries)))
+
+    def __remove(self, key: K) -> None:
+        if key in self.__entries:
+            del self.__entries[key]
+            self.__total_size -= self.__sizes.pop(key)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__sizes.clear()
+            self.__total_size = 0
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Set, Union
+
+from generator.utils.content_store import ContentStore
+
+
+class OutputWriter:
+    """
+    Writes generated files only if their content changed. Unchanged files keep their modification time, thus build
+    systems of TSL consumers do not recompile anything which depends on them. Changed files are written into a
+    temporary file which atomically replaces the target, so readers never observe partially written files.
+    Writes are executed asynchronously on a small pool of I/O threads; flush has to be called to wait for them.
+    All files written (or found unchanged) since the last reset are recorded, so stale files can be pruned.
+    Additionally, the content of all outputs can be captured (see start_recording), so it can be materialized again
+    later on without generating it.
+    If a content store is used, files are hardlinks to the deduplicated blobs of the store instead of separate copies.
+    """
+    def __init__(self, io_threads: int = 4) -> None:
+        self.__io_threads: int = max(1, io_threads)
+        self.__executor: Union[ThreadPoolExecutor, None] = None
+        self.__pending: List[Future] = []
+        self.__lock: threading.Lock = threading.Lock()
+        self.__output_files: Set[Path] = set()
+        self.__written: int = 0
+        self.__unchanged: int = 0
+        self.__removed: int = 0
+        self.__recording_root: Union[Path, None] = None
+        self.__recording: Dict[Path, Union[bytes, None]] = dict()
+        self.__content_store: Union[ContentStore, None] = None
+        # a forked child only inherits the calling thread, thus the I/O threads and the lock (which may have been held
+        # by one of them) are replaced
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.__reset_threads)
+
+    def __reset_threads(self) -> None:
+        self.__executor = None
+        self.__pending = []
+        self.__lock = threading.Lock()
+
+    @property
+    def content_store(self) -> Union[ContentStore, None]:
+        return self.__content_store
+
+    @property
+    def written(self) -> int:
+        return self.__written
+
+    @property
+    def unchanged(self) -> int:
+        return self.__unchanged
+
+    @property
+    def removed(self) -> int:
+        return self.__removed
+
+    @property
+    def output_files(self) -> List[Path]:
+        """
+        :return: All files written (or found unchanged) since the last reset.
+        """
+        with self.__lock:
+            return sorted(self.__output_files)
+
+    @property
+    def stats_str(self) -> str:
+        return f"{self.__written} written, {self.__unchanged} unchanged, {self.__removed} removed"
+
+    def reset(self, content_store: Union[ContentStore, None] = None) -> None:
+        """
+        Waits for all pending writes and resets the statistics and the set of recorded output files.
+        :param content_store: Store which holds the content of all subsequently written files or None, if files should
+        be written separately.
+        """
+        self.flush()
+        with self.__lock:
+            self.__content_store = content_store
+            self.__output_files.clear()
+            self.__written = 0
+            self.__unchanged = 0
+            self.__removed = 0
+
+    def write_text(self, file: Path, text: str) -> None:
+        self.write_bytes(file, text.encode("utf-8"))
+
+    def write_bytes(self, file: Path, data: bytes) -> None:
+        """
+        Schedules a write of data to file. The write is skipped if the file already holds the same content.
+        :param file: Path of the target file. Missing parent directories are created.
+        :param data: New content of the file.
+        """
+        file = Path(os.path.realpath(file))
+        with self.__lock:
+            self.__output_files.add(file)
+            if self.__recording_root is not None:
+                self.__recording[file] = data
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.__io_threads,
+                                                     thread_name_prefix="tsl_output_writer")
+            self.__pending.append(self.__executor.submit(self.__write, file, data))
+
+    def keep(self, file: Path) -> None:
+        """
+        Records a file which was created by other means (e.g., a download) as output, so it is not pruned.
+        """
+        file = Path(os.path.realpath(file))
+        with self.__lock:
+            self.__output_files.add(file)
+            if self.__recording_root is not None:
+                self.__recording.setdefault(file, None)
+
+    def copy_file(self, source: Path, target: Path) -> None:
+        self.write_bytes(target, Path(source).read_bytes())
+
+    def copy_tree(self, source: Path, target: Path) -> None:
+        """
+        Copies all files of the source directory into the target directory. Files which do not exist within the
+        source directory are left untouched.
+        """
+        source = Path(source)
+        for source_file in sorted(source.rglob("*")):
+            if source_file.is_file():
+                self.copy_file(source_file, Path(target).joinpath(source_file.relative_to(source)))
+
+    def start_recording(self, root_path: Path) -> None:
+        """
+        Starts capturing the content of all subsequently written (or kept) files.
+        :param root_path: Output directory, recorded files below it are stored relative to it.
+        """
+        with self.__lock:
+            self.__recording_root = Path(os.path.realpath(root_path))
+            self.__recording = dict()
+
+    def stop_recording(self) -> Dict[Path, bytes]:
+        """
+        Stops capturing and waits for all pending writes. The content of kept files is read from disk.
+        :return: Content of all recorded files, keyed by their path (relative to the root path if they are below it).
+        """
+        self.flush()
+        with self.__lock:
+            recording_root, recording = self.__recording_root, self.__recording
+            self.__recording_root = None
+            self.__recording = dict()
+        recorded: Dict[Path, bytes] = dict()
+        for file, data in recording.items():
+            if data is None:
+                try:
+                    data = file.read_bytes()
+                except OSError:
+                    continue
+            try:
+                recorded[file.relative_to(recording_root)] = data
+            except ValueError:
+                recorded[file] = data
+        return recorded
+
+    def materialize(self, root_path: Path, recorded: Dict[Path, bytes]) -> None:
+        """
+        Writes previously recorded files (see stop_recording). Files which already hold the recorded content are left
+        untouched, thus materializing into an up-to-date output directory does not modify anything.
+        :param root_path: Output directory, the relative paths of the recorded files are resolved against it.
+        :param recorded: Recorded content keyed by path.
+        """
+        for file, data in recorded.items():
+            self.write_bytes(Path(root_path).joinpath(file), data)
+
+    def flush(self) -> None:
+        """
+        Waits for all pending writes and shuts down the I/O threads (they are recreated on demand). The first error
+        which occurred during the pending writes is raised.
+        """
+        with self.__lock:
+            pending = self.__pending
+            executor = self.__executor
+            self.__pending = []
+            self.__executor = None
+        if executor is None:
+            return
+        executor.shutdown(wait=True)
+        for future in pending:
+            future.result()
+
+    def prune(self, root_path: Path) -> int:
+        """
+        Removes all files below root_path, which were not written (or found unchanged) since the last reset, and all
+        directories which are empty afterwards.
+        :param root_path: Output directory.
+        :return: Number of removed files.
+        """
+        self.flush()
+        root_path = Path(os.path.realpath(root_path))
+        if not root_path.is_dir():
+            return 0
+        removed = 0
+        for current_root, dir_names, file_names in os.walk(root_path, topdown=False):
+            current_path = Path(current_root)
+            if self.__content_store is not None and (
+                    current_path == self.__content_store.root_path or
+                    self.__content_store.root_path in current_path.parents):
+                continue
+            for file_name in file_names:
+                file = current_path.joinpath(file_name)
+                if file not in self.__output_files:
+                    file.unlink(missing_ok=True)
+                    removed += 1
+            if current_path != root_path and not any(current_path.iterdir()):
+                current_path.rmdir()
+        with self.__lock:
+            self.__removed += removed
+        return removed
+
+    def __write(self, file: Path, data: bytes) -> None:
+        if self.__content_store is not None:
+            try:
+                changed = self.__content_store.link(file, data)
+            except OSError:
+                # e.g., hardlinks are not supported, the file is written separately instead
+                pass
+            else:
+                with self.__lock:
+                    if changed:
+                        self.__written += 1
+                    else:
+                        self.__unchanged += 1
+                return
+        try:
+            if file.stat().st_size == len(data) and \
+                    hashlib.sha256(file.read_bytes()).digest() == hashlib.sha256(data).digest():
+                with self.__lock:
+                    self.__unchanged += 1
+                return
+        except OSError:
+            pass
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_name(f".{file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_file.write_bytes(data)
+            os.replace(tmp_file, file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        with self.__lock:
+            self.__written += 1
+
+
+output_writer = OutputWriter()
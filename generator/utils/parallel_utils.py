@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, TypeVar
+
+from generator.utils.output_writer import output_writer
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def fork_available() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def parallel_map(func: Callable[[T], R], items: List[T], jobs: int) -> List[R]:
+    """
+    Applies func to every item using a pool of forked worker processes. The workers inherit the state of the calling
+    process (e.g., the global configuration), thus func has to be a module level function and all items and results
+    have to be picklable. Pending writes of the output writer are completed and its I/O threads are shut down before
+    forking, as threads are not inherited by the workers. If only one job is requested (or fork is not supported by
+    the platform), func is applied sequentially within the calling process.
+    :param func: Function which is applied to every item.
+    :param items: List of items.
+    :param jobs: Maximum number of worker processes.
+    :return: List of results in the order of items.
+    """
+    workers = min(jobs, len(items))
+    if workers <= 1 or not fork_available():
+        return [func(item) for item in items]
+    output_writer.flush()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+        return list(executor.map(func, items))
@@ -1,47 +1,96 @@
 import functools
 import inspect
+import os
+from typing import Callable, List, Tuple
 
 global_requirements = dict()
 
+# If set, the requirement decorator returns the decorated function unchanged. This only takes effect if the
+# environment variable is set before the generator modules are imported.
+REQUIREMENTS_COMPILED_OUT: bool = os.environ.get("TSL_GENERATOR_FAST", "0").lower() not in ("", "0", "false", "no")
+_requirement_checks_enabled: bool = not REQUIREMENTS_COMPILED_OUT
+
 
 def create_requirement(name: str, requirement) -> None:
     global_requirements[name] = requirement
 
 
+def enable_requirement_checks(enabled: bool = True) -> None:
+    """
+    Enables or disables the argument checks of all functions decorated with @requirement at runtime.
+    :param enabled: True, if the arguments should be checked.
+    """
+    global _requirement_checks_enabled
+    _requirement_checks_enabled = enabled and not REQUIREMENTS_COMPILED_OUT
+
+
+def requirement_checks_enabled() -> bool:
+    return _requirement_checks_enabled
+
+
+def compile_condition(condition: str) -> Callable[[object, str], None]:
+    """
+    Compiles a single condition into a check function, which raises a ValueError if the argument does not fulfill
+    the condition. A condition is either the name of a registered requirement (see create_requirement), a type name or
+    an expression suffix (e.g., '> 0').
+    :param condition: Condition string.
+    :return: Function which checks a given argument (and its name).
+    """
+    if condition in global_requirements:
+        requirement_fn = global_requirements[condition]
+        if callable(requirement_fn):
+            def check_registered(arg, arg_name: str) -> None:
+                if not requirement_fn(arg):
+                    raise ValueError(f"Argument {arg_name} does not fulfills the requirement {condition}.")
+            return check_registered
+        condition = requirement_fn
+    try:
+        condition_type = eval(f"{condition}")
+    except Exception as _:
+        expression = compile(f"arg {condition}", f"<requirement {condition}>", "eval")
+
+        def check_expression(arg, arg_name: str) -> None:
+            if not eval(expression, {}, {"arg": arg}):
+                raise ValueError(f"Argument {arg_name} does not fulfills the requirement {condition}. "
+                                 f"!({arg} {condition})")
+        return check_expression
+    if inspect.isclass(condition_type):
+        def check_type(arg, arg_name: str) -> None:
+            if not isinstance(arg, condition_type):
+                raise ValueError(f"Argument {arg_name} does not fulfills the requirement {condition}. "
+                                 f"Must be of type: {condition}, but is: of type {type(arg)}")
+        return check_type
+    return lambda arg, arg_name: None
+
+
 def requirement(_func=None, **requirement_kwargs):
-    def verify_requirement(arg, _requirement, arg_name):
-        for con in str(_requirement).split(";"):
-            if con in global_requirements:
-                con = global_requirements[con]
-            if callable(con):
-                if not con(arg):
-                    raise ValueError(f"Argument {arg_name} does not fulfills the requirement {con}.")
-            else:
-                isType = True
-                try:
-                    eval(f"{con}")
-                except Exception as _:
-                    isType = False
-                if isType:
-                    if inspect.isclass(eval(f"{con}")):
-                        if not eval(f"isinstance({arg}, {con})"):
-                            raise ValueError(f"Argument {arg_name} does not fulfills the requirement {con}. "
-                                             f"Must be of type: {con}, but is: of type {type(arg)}")
-                else:
-                    if not eval(f"{arg} {con}"):
-                        raise ValueError(f"Argument {arg_name} does not fulfills the requirement {con}. "
-                                         f"!({arg} {con})")
+    """
+    Decorator which checks the arguments of a function against the given requirements (keyword: argument name,
+    value: semicolon separated list of conditions). The conditions and the signature of the function are resolved
+    once at decoration time.
+    """
     def decorator_requirement(func):
+        if REQUIREMENTS_COMPILED_OUT:
+            return func
+        checks = {
+            arg_name: [compile_condition(con) for con in str(_requirement).split(";")]
+            for arg_name, _requirement in requirement_kwargs.items()
+        }
+        positional_checks: Tuple[Tuple[int, str, List[Callable[[object, str], None]]], ...] = tuple(
+            (argidx, arg_name, checks[arg_name])
+            for argidx, arg_name in enumerate(inspect.getfullargspec(func).args) if arg_name in checks)
+
         @functools.wraps(func)
         def requirement_wrapper(*args, **kwargs):
-            positional_args = inspect.getfullargspec(func).args
-            for argidx in range(len(positional_args)):
-                if positional_args[argidx] in requirement_kwargs:
-                    verify_requirement(args[argidx], requirement_kwargs[positional_args[argidx]], positional_args[argidx])
-                    # print(f"{positional_args[argidx]}: {args[argidx]}")
-            for kwarg in kwargs.keys():
-                if kwarg in requirement_kwargs:
-                    verify_requirement(kwargs[kwarg], requirement_kwargs[kwarg])
+            if _requirement_checks_enabled:
+                for argidx, arg_name, arg_checks in positional_checks:
+                    if argidx < len(args):
+                        for check in arg_checks:
+                            check(args[argidx], arg_name)
+                for kwarg in kwargs.keys():
+                    if kwarg in checks:
+                        for check in checks[kwarg]:
+                            check(kwargs[kwarg], kwarg)
             return func(*args, **kwargs)
         return requirement_wrapper
     if _func is None:
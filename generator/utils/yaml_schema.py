@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Dict, Generator
+import copy
+from typing import Callable, Dict, Generator
 
 from generator.utils.log_utils import LogInit, log
 from generator.utils.yaml_utils import YamlDataType
@@ -196,13 +197,88 @@ class Schema:
 
                 return casted_data
 
+        def compile(self) -> Callable[[YamlDataType], YamlDataType]:
+            """
+            Compiles the (sub-)schema into a validator function which behaves like validate. Types, defaults and
+            nested validators are resolved once, thus the returned function neither evaluates type names nor logs
+            its arguments.
+            :return: Function which validates (and casts) the given data.
+            """
+            if self.__complex:
+                required_fields_dict = self.__required_fields
+                required_fields = tuple(
+                    (field_name, field_node.compile()) for field_name, field_node in self.__required_fields.items())
+                optional_fields = tuple(
+                    (field_name, field_node.compile()) for field_name, field_node in self.__optional_fields.items())
+                default_values = tuple(
+                    (field_name, field_node.__get_default_value(),
+                     isinstance(field_node.__get_default_value(), (list, dict)))
+                    for field_name, field_node in self.__optional_fields.items() if field_node.__has_default_value())
+
+                def validate_complex(data: YamlDataType) -> YamlDataType:
+                    for field_name, field_validator in required_fields:
+                        if field_name not in data:
+                            raise Schema.RequiredFieldError("Required field missing",
+                                                            {"data": data,
+                                                             "required_fields": str(required_fields_dict),
+                                                             "fieldname": field_name
+                                                             })
+                        data[field_name] = field_validator(data[field_name])
+                    for field_name, field_validator in optional_fields:
+                        if field_name in data:
+                            data[field_name] = field_validator(data[field_name])
+                    for field_name, default_value, mutable_default in default_values:
+                        if field_name not in data:
+                            # the schema is shared, thus mutable defaults must not be shared between documents
+                            data[field_name] = copy.deepcopy(default_value) if mutable_default else default_value
+                    return data
+                return validate_complex
+
+            type_name = self.__type
+            target_type = eval(type_name)
+            if self.__entry_type is None:
+                def validate_value(data: YamlDataType) -> YamlDataType:
+                    if isinstance(data, target_type):
+                        return data
+                    try:
+                        return target_type(data)
+                    except Exception as _:
+                        raise Schema.TypeCastError("Cast was not possible.",
+                                                   {"data": data, "cast candidate": data, "target type": type_name})
+                return validate_value
+
+            entry_validator = self.__entry_type.compile()
+            if "list" == type_name:
+                def validate_list(data: YamlDataType) -> YamlDataType:
+                    if not isinstance(data, list):
+                        data = [data]
+                    return [entry_validator(d) for d in data]
+                return validate_list
+            if "dict" == type_name:
+                def validate_dict(data: YamlDataType) -> YamlDataType:
+                    if not isinstance(data, dict):
+                        raise Schema.TypeCastError("Cast was not possible.",
+                                                   {"data": data, "cast candidate": data, "target type": type_name})
+                    return entry_validator(data)
+                return validate_dict
+
+            def validate_unknown(data: YamlDataType) -> YamlDataType:
+                raise Schema.UnknownTypeError("Type has to be list or dict", {"data": data, "type": type_name})
+            return validate_unknown
+
     @LogInit()
     def __init__(self, schema_dict: YamlDataType) -> None:
         self._schema = Schema.SchemaNode(schema_dict)
+        self._validator = self._schema.compile()
 
-    @log
     def validate(self, other_dict: YamlDataType) -> dict:
-        return self._schema.validate(other_dict)
+        """
+        Validates the given data using the compiled schema. Missing optional fields are filled with their default
+        values and values are casted to their specified types (in place).
+        :param other_dict: Data which should be validated.
+        :return: Validated data.
+        """
+        return self._validator(other_dict)
 
     @property
     def root(self) -> SchemaNode:
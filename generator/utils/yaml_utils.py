@@ -6,19 +6,73 @@ from typing import Dict, NewType, Union, TypeVar, Generator
 
 import yaml
 from yaml.loader import SafeLoader
+try:
+    from yaml import CSafeLoader as LibYamlSafeLoader
+except ImportError:
+    LibYamlSafeLoader = SafeLoader
 
 YamlKeyType = TypeVar('YamlKeyType', bound=str)
 YamlValueType = TypeVar('YamlValueType', str, list, dict)
 YamlDataType = NewType('YamlDataType', Union[str, Dict[YamlKeyType, YamlValueType]])
 
 
-class SafeLineLoader(SafeLoader):
+class AliasTrackingConstructor:
+    """
+    Mixin for yaml loaders which records whether a document references an already constructed collection (anchor and
+    alias). Only such documents have to be copied to avoid shared (and thus accidentally mutated) sub-objects.
+    """
+    def construct_document(self, node):
+        self.yaml_has_aliases = False
+        return super().construct_document(node)
+
+    def construct_object(self, node, deep=False):
+        if node in self.constructed_objects and not isinstance(node, yaml.ScalarNode):
+            self.yaml_has_aliases = True
+        return super().construct_object(node, deep=deep)
+
+
+class SafeLineLoader(AliasTrackingConstructor, SafeLoader):
     def construct_mapping(self, node, deep=False):
         mapping = super(SafeLineLoader, self).construct_mapping(node, deep=deep)
         # Add 1 so line numbering starts at 1
         mapping['yaml_origin_line'] = node.start_mark.line + 1
         return mapping
 
+
+class FastSafeLoader(AliasTrackingConstructor, LibYamlSafeLoader):
+    """
+    Loader using the libyaml C implementation (if available).
+    """
+    pass
+
+
+class FastSafeLineLoader(FastSafeLoader):
+    """
+    Loader using the libyaml C implementation (if available). In contrast to SafeLineLoader, only the document itself
+    and the mappings within its top-level lists (e.g., primitive definitions) are annotated with their origin line.
+    Use yaml_load_document_with_origin to recover the line information of all mappings for a specific document.
+    """
+    def construct_document(self, node):
+        data = super().construct_document(node)
+        if isinstance(node, yaml.MappingNode) and isinstance(data, dict):
+            # Add 1 so line numbering starts at 1
+            data['yaml_origin_line'] = node.start_mark.line + 1
+            for key_node, value_node in node.value:
+                if isinstance(value_node, yaml.SequenceNode) and isinstance(data.get(key_node.value), list):
+                    for entry_node, entry in zip(value_node.value, data[key_node.value]):
+                        if isinstance(entry_node, yaml.MappingNode) and isinstance(entry, dict):
+                            entry['yaml_origin_line'] = entry_node.start_mark.line + 1
+        return data
+
+
+def _finalize_document(loader, document: YamlDataType, file: Path, save_filename: bool) -> YamlDataType:
+    if save_filename:
+        document["yaml_origin_file"] = f"{file}"
+    if getattr(loader, "yaml_has_aliases", True):
+        return copy.deepcopy(document)
+    return document
+
+
 def yaml_load_all(file: Path, save_filename=False, Loader=SafeLoader) -> Generator[YamlDataType, None, None]:
     """
     Load YAML-documents from a given path
@@ -32,11 +86,13 @@ def yaml_load_all(file: Path, save_filename=False, Loader=SafeLoader) -> Generat
             try:
                 with open(rfile.resolve(), "r") as yaml_file:
                     num = 0
-                    for x in yaml.load_all(yaml_file, Loader=Loader):
-                        if save_filename:
-                           x["yaml_origin_file"] = f"{file}"
-                        yield copy.deepcopy(x)
-                        num += 1
+                    loader = Loader(yaml_file)
+                    try:
+                        while loader.check_data():
+                            yield _finalize_document(loader, loader.get_data(), file, save_filename)
+                            num += 1
+                    finally:
+                        loader.dispose()
                     if num == 0:
                         print(f"{error_msg}. No yaml documents found.")
                         raise ValueError
@@ -60,10 +116,11 @@ def yaml_load(file: Path, save_filename=False, Loader=SafeLoader) -> YamlDataTyp
         if rfile.suffix == ".yaml":
             try:
                 with open(rfile.resolve(), "r") as yaml_file:
-                    result = yaml.load(yaml_file, Loader=Loader)
-                    if save_filename:
-                       result["yaml_origin_file"] = f"{file}"
-                    return copy.deepcopy(result)
+                    loader = Loader(yaml_file)
+                    try:
+                        return _finalize_document(loader, loader.get_single_data(), file, save_filename)
+                    finally:
+                        loader.dispose()
             except EnvironmentError as e:
                 print(f"{error_msg}.")
         else:
@@ -72,6 +129,35 @@ def yaml_load(file: Path, save_filename=False, Loader=SafeLoader) -> YamlDataTyp
     else:
         print(f"{error_msg}. File does not exist.")
 
+def yaml_load_document_with_origin(file: Path, document_index: int) -> YamlDataType:
+    """
+    Loads a single YAML-document from a given path and annotates every mapping with its origin line (like
+    SafeLineLoader). The preceding documents are only composed (using libyaml, if available) but not constructed.
+    :param file: Filename of YAML file
+    :param document_index: Index of the document within the file
+    :return: yaml document (dict) or None, if the file does not contain enough documents
+    """
+    with open(file.resolve(), "r") as yaml_file:
+        composer = FastSafeLoader(yaml_file)
+        try:
+            node = None
+            for _ in range(document_index + 1):
+                if not composer.check_node():
+                    return None
+                node = composer.get_node()
+        finally:
+            composer.dispose()
+    constructor = SafeLineLoader("")
+    try:
+        result = copy.deepcopy(constructor.construct_document(node))
+    finally:
+        constructor.dispose()
+    result["yaml_origin_file"] = f"{file}"
+    return result
+
+def yaml_dumps(data: dict) -> str:
+    return yaml.dump(data)
+
 def yaml_store(file: Path, data: dict) -> None:
     rfile = file.resolve()
     if not file.parent.exists():
@@ -7,14 +7,26 @@ import sys
 import json
 from pathlib import Path
 
+from generator.core.tsl_batch import format_flavor_table, generate_flavors, load_flavors
+from generator.core.tsl_generation_cache import generate_through_cache
+from generator.core.tsl_stamp import commit_stamp, invalidate_stamp, refresh_stamp, stamp_is_up_to_date
 from generator.core.tsl_generator import TSLGenerator
+from generator.core.tsl_server import TSLServer
+from generator.utils.content_store import ContentStore
 from generator.utils.dict_utils import dict_update
+from generator.utils.generation_cache import GenerationCache
 from generator.utils.yaml_utils import yaml_load
-from generator.utils.file_utils import remove_path
+from generator.utils.output_writer import output_writer
 
 def get_config(config_path: Path) -> dict:
     return yaml_load(config_path)
 
+def prune_output() -> None:
+    # Files which were not generated by the last run are stale. Regenerated files are only rewritten if their content
+    # changed, thus the output directory is pruned after generation instead of being removed beforehand.
+    if not config.print_output_only:
+        output_writer.prune(config.generation_out_path)
+
 def tsl_setup(file_config, additional_config=None) -> None:
     if additional_config is None:
         additional_config = dict()
@@ -30,12 +42,34 @@ if __name__ == '__main__':
     args_dict = parse_args(known_types = file_config["configuration"]["relevant_types"])
     tsl_setup(file_config, args_dict)
 
-    gen = TSLGenerator()
+    flavors = None
+    if args_dict.get("all_archids") or "target_archids" in args_dict:
+        try:
+            flavors = load_flavors(Path("target_specs.json"),
+                                   None if args_dict.get("all_archids") else args_dict["target_archids"])
+        except ValueError as err:
+            print(err)
+            exit(1)
+
+    stamp_key = None
+    if flavors is None and config.stamp_enabled:
+        stamp_key = config.generation_stamp_key(args_dict["targets"])
+        if stamp_is_up_to_date(stamp_key):
+            refresh_stamp()
+            print(f"Output is up to date (see {config.stamp_path}).")
+            print("Generation needed %.2f seconds." % (time.time() - st))
+            exit(0)
+        invalidate_stamp()
 
-    if config.get_config_entry("clean"):
-        remove_path(config.generation_out_path)
+    generation_cache = None
+    if flavors is None and config.generation_cache_enabled:
+        generation_cache = GenerationCache(config.generation_cache_root_path, config.generation_cache_max_size)
+    # on a hit of the generation cache, the primitive data is not loaded at all
+    gen = TSLGenerator() if generation_cache is None else None
 
-    if config.get_config_entry("daemon"):
+    if config.server_enabled:
+        TSLServer(gen, config.server_socket_path, config.server_workers).run()
+    elif config.get_config_entry("daemon"):
         try:
             while True:
                 print("Ready", end='')
@@ -54,17 +88,52 @@ if __name__ == '__main__':
                         flags = targetDict["lscpu_flags"]
                     if "primitives" in targetDict:
                         primitives = targetDict["primitives"]
-                    remove_path(config.generation_out_path)
-                    gen.generate(flags, primitives)
+                    configuration_overlay = targetDict.get("config", dict())
+                    try:
+                        config.check_overlay(configuration_overlay)
+                    except ValueError as err:
+                        print(f"Wrong parameter: {err}", file=sys.stderr, end='')
+                        sys.stderr.flush()
+                        continue
+                    with config.overlay(configuration_overlay):
+                        gen.generate_cached(flags, primitives)
+                        prune_output()
                     print("Done", end='')
                     sys.stdout.flush()
         except KeyboardInterrupt:
             sys.stdout.flush()
             exit(0)
+    elif flavors is not None:
+        batch_st = time.time()
+        flavor_results = generate_flavors(gen, flavors, config.generation_out_path, config.jobs)
+        print(format_flavor_table(flavor_results, time.time() - batch_st))
+        if any(result.error is not None for result in flavor_results):
+            exit(1)
     else:
         print(f"Generating for {args_dict['targets']}")
-        gen.generate(args_dict["targets"])
+        if generation_cache is None:
+            generated = gen.generate(args_dict["targets"])
+        else:
+            gen, generated = generate_through_cache(generation_cache, args_dict["targets"])
+        if config.get_config_entry("clean"):
+            prune_output()
+        if generated and stamp_key is not None:
+            commit_stamp(stamp_key, args_dict)
 
+    if generation_cache is not None:
+        print(f"Generation cache: {generation_cache.stats_str}.")
+    if gen is not None and gen.document_cache is not None:
+        print(f"Model cache: {gen.document_cache.stats_str}.")
+    if gen is not None and gen.dependency_map is not None:
+        print(f"Dependency map: {gen.dependency_map.stats_str}.")
+    if gen is not None and gen.result_cache is not None:
+        print(f"Result cache: {gen.result_cache.stats_str}.")
+    print(f"Output files: {output_writer.stats_str}.")
+    if config.content_store_path is not None:
+        content_store = ContentStore(config.content_store_path)
+        content_store.collect_garbage()
+        print(f"Content store: {content_store.stats_str}.")
+    print(f"Template cache: {config.compiled_templates_cache.stats_str}.")
     print("Generation needed %.2f seconds." % (time.time() - st))
 
 
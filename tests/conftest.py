@@ -0,0 +1,93 @@
+import os
+import shutil
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Union
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+# files which every run of main.py leaves within the repository root (including the rotated logs)
+GENERATOR_ARTIFACTS = ["class_graph.dot", "tslgen.log*", "doc/www"]
+
+
+def generator_environment(hash_seed: Union[int, None] = None) -> Dict[str, str]:
+    env: Dict[str, str] = dict(os.environ)
+    env.pop("TSL_GENERATOR_CACHE_DIR", None)
+    if hash_seed is not None:
+        env["PYTHONHASHSEED"] = str(hash_seed)
+    return env
+
+
+@contextmanager
+def removing_generator_artifacts() -> Iterator[None]:
+    """
+    Removes the artifacts which runs of main.py leave within the repository root, unless they existed beforehand.
+    """
+    existing = {path for artifact in GENERATOR_ARTIFACTS for path in REPO_ROOT.glob(artifact)}
+    try:
+        yield
+    finally:
+        for artifact in GENERATOR_ARTIFACTS:
+            for path in REPO_ROOT.glob(artifact):
+                if path in existing:
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+
+
+@pytest.fixture
+def generator_artifacts() -> Iterator[None]:
+    with removing_generator_artifacts():
+        yield
+
+
+@pytest.fixture(scope="session")
+def tsl_config() -> Iterator:
+    """
+    Sets up the configuration singleton with the default configuration and arguments, like main.py does (relative
+    paths of the configuration refer to the repository root).
+    """
+    os.chdir(REPO_ROOT)
+    from main import get_config, tsl_setup
+    from generator.core.tsl_config import config, parse_args
+    file_config = get_config(Path("generator/config/default_conf.yaml"))
+    argv = sys.argv
+    sys.argv = [str(REPO_ROOT.joinpath("main.py"))]
+    try:
+        args_dict = parse_args(known_types=file_config["configuration"]["relevant_types"])
+    finally:
+        sys.argv = argv
+    with removing_generator_artifacts():
+        tsl_setup(file_config, args_dict)
+        yield config
+
+
+@pytest.fixture(scope="session")
+def tsl_generator(tsl_config):
+    """
+    Generator holding the model loaded from the primitive data of the repository.
+    """
+    from generator.core.tsl_generator import TSLGenerator
+    return TSLGenerator()
+
+
+@pytest.fixture
+def run_generator(generator_artifacts) -> Callable[..., subprocess.CompletedProcess]:
+    """
+    Runs main.py in a separate process.
+    """
+    def run(args: List[str], hash_seed: Union[int, None] = None) -> subprocess.CompletedProcess:
+        result = subprocess.run([sys.executable, str(REPO_ROOT.joinpath("main.py")), *args],
+                                env=generator_environment(hash_seed), capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result
+
+    return run
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from generator.core.tsl_batch import TSLFlavor, TSLFlavorResult, format_flavor_table, load_flavors
+from tests.conftest import REPO_ROOT, generator_environment
+from tests.test_deterministic_output import read_tree
+
+
+def test_flavors_are_loaded_in_the_order_of_the_specification() -> None:
+    flavors = load_flavors(REPO_ROOT.joinpath("target_specs.json"))
+    assert len(flavors) == len({flavor.directory_name for flavor in flavors})
+    selected = load_flavors(REPO_ROOT.joinpath("target_specs.json"), ["avx2", "sse"])
+    assert [flavor.name for flavor in selected] == [flavor.name for flavor in flavors if flavor.name in ("sse", "avx2")]
+    assert all(flag.strip() == flag and len(flag) > 0 for flavor in flavors for flag in flavor.flags)
+
+
+def test_unknown_archids_are_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown target archids: pentium, z80"):
+        load_flavors(REPO_ROOT.joinpath("target_specs.json"), ["z80", "sse", "pentium"])
+
+
+def test_flavor_table() -> None:
+    results = [TSLFlavorResult(TSLFlavor("x86", "avx2", ["sse", "avx2"]), Path("x86-avx2"), 1.5, 3, 2, 1),
+               TSLFlavorResult(TSLFlavor("arm", "neon", ["neon"]), Path("arm-neon"), 0.5, error="ValueError: broken")]
+    lines = format_flavor_table(results, 2.0).split("\n")
+    assert lines[1].split() == ["x86-avx2", "2", "3", "2", "1", "1.50"]
+    assert lines[2].split() == ["arm-neon", "1", "failed:", "ValueError:", "broken"]
+    assert lines[3].split() == ["Total", "3", "2", "1", "2.00"]
+
+
+def test_flavors_match_separate_runs(tmp_path: Path, run_generator) -> None:
+    flavors = load_flavors(REPO_ROOT.joinpath("target_specs.json"), ["sse", "avx2"])
+    result = run_generator(["-o", str(tmp_path.joinpath("batch")), "--archids", "sse", "avx2"])
+    assert all(flavor.directory_name in result.stdout for flavor in flavors)
+    run_generator(["-o", str(tmp_path.joinpath("single")), "--archid", "avx2"])
+    avx2 = next(flavor for flavor in flavors if flavor.name == "avx2")
+    assert read_tree(tmp_path.joinpath("batch", avx2.directory_name)) == read_tree(tmp_path.joinpath("single"))
+
+
+def test_unknown_archids_fail_the_run(generator_artifacts) -> None:
+    result = subprocess.run([sys.executable, str(REPO_ROOT.joinpath("main.py")), "--archids", "z80"],
+                            env=generator_environment(None), capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "Unknown target archids: z80" in result.stdout
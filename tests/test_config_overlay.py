@@ -0,0 +1,49 @@
+import pytest
+
+
+def test_overlay_is_applied_for_the_context_only(tsl_config) -> None:
+    relevant_types = list(tsl_config.relevant_types)
+    digest = tsl_config.configuration_digest
+    with tsl_config.overlay({"configuration": {"relevant_types": ["float"]}}) as overlaid:
+        assert overlaid is tsl_config
+        assert list(tsl_config.relevant_types) == ["float"]
+        assert tsl_config.configuration_digest != digest
+    assert list(tsl_config.relevant_types) == relevant_types
+    assert tsl_config.configuration_digest == digest
+
+
+def test_overlay_is_reverted_on_errors(tsl_config) -> None:
+    root_path = tsl_config.generation_out_path
+    with pytest.raises(RuntimeError):
+        with tsl_config.overlay({"configuration": {"root_path": "/tmp/tsl_overlay"}}):
+            assert f"{tsl_config.generation_out_path}" == "/tmp/tsl_overlay"
+            raise RuntimeError()
+    assert tsl_config.generation_out_path == root_path
+
+
+def test_nested_entries_are_merged(tsl_config) -> None:
+    max_size = tsl_config.generation_cache_max_size
+    with tsl_config.overlay({"configuration": {"generation_cache": {"root_path": "/tmp/tsl_generation_cache"}}}):
+        assert f"{tsl_config.generation_cache_root_path}" == "/tmp/tsl_generation_cache"
+        assert tsl_config.generation_cache_max_size == max_size
+
+
+def test_runtime_only_entries_do_not_change_the_digest(tsl_config) -> None:
+    digest = tsl_config.configuration_digest
+    with tsl_config.overlay({"configuration": {"jobs": 3, "clean": True}}):
+        assert tsl_config.configuration_digest == digest
+
+
+@pytest.mark.parametrize("overlay", [
+    {"configuration": {"model_cache": {"enabled": False}}},
+    {"configuration": {"daemon": True}},
+    {"primitive_data": {"root_path": "elsewhere"}},
+    {"configuration": ["relevant_types"]},
+    ["configuration"]
+])
+def test_invalid_overlays_are_rejected(tsl_config, overlay) -> None:
+    digest = tsl_config.configuration_digest
+    with pytest.raises(ValueError):
+        with tsl_config.overlay(overlay):
+            pass
+    assert tsl_config.configuration_digest == digest
@@ -0,0 +1,48 @@
+from types import MappingProxyType
+
+import pytest
+
+from generator.utils.dict_utils import freeze
+
+
+def test_freeze_creates_a_read_only_snapshot() -> None:
+    data = {"library": {"includes": ["<cstdint>"], "name": "tsl"}, "types": ["float"], "silent": True}
+    frozen = freeze(data)
+    assert isinstance(frozen, MappingProxyType) and isinstance(frozen["library"], MappingProxyType)
+    assert frozen["library"]["includes"] == ("<cstdint>",) and frozen["types"] == ("float",)
+    assert frozen["silent"] is True
+    with pytest.raises(TypeError):
+        frozen["silent"] = False
+    with pytest.raises(TypeError):
+        frozen["library"]["name"] = "other"
+    # the snapshot does not depend on the original data
+    data["library"]["includes"].append("<cstddef>")
+    assert frozen["library"]["includes"] == ("<cstdint>",)
+
+
+def test_configuration_entries_are_shared_read_only_views(tsl_config) -> None:
+    template_cache = tsl_config.get_config_entry("template_cache")
+    assert template_cache is tsl_config.get_config_entry("template_cache")
+    assert template_cache is tsl_config.get_config_entry_silent("template_cache")
+    with pytest.raises(TypeError):
+        template_cache["max_compiled_templates"] = 1
+    supplementary = tsl_config.get_configuration_files_entry("supplementary")
+    assert supplementary is tsl_config.get_configuration_files_entry("supplementary")
+    with pytest.raises(TypeError):
+        supplementary["root_path"] = "/tmp"
+    assert isinstance(tsl_config.get_config_entry("relevant_types"), tuple)
+
+
+def test_unknown_entries_raise(tsl_config) -> None:
+    with pytest.raises(ValueError):
+        tsl_config.get_config_entry_silent("no_such_entry")
+
+
+def test_snapshot_follows_overlays(tsl_config) -> None:
+    with tsl_config.overlay({"configuration": {"relevant_types": ["float"]}}):
+        assert tsl_config.get_config_entry("relevant_types") == ("float",)
+    assert tsl_config.get_config_entry("relevant_types") != ("float",)
+
+
+def test_schemes_are_shared(tsl_config) -> None:
+    assert tsl_config.get_schema("primitive") is tsl_config.get_schema("primitive")
@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+
+from generator.utils.content_store import ContentStore
+from generator.utils.output_writer import OutputWriter
+
+
+def test_identical_files_share_a_blob(tmp_path: Path) -> None:
+    store = ContentStore(tmp_path.joinpath("blobs"))
+    first, second = tmp_path.joinpath("a", "x.hpp"), tmp_path.joinpath("b", "x.hpp")
+    assert store.link(first, b"content")
+    assert store.link(second, b"content")
+    assert not store.link(second, b"content")
+    assert os.path.samestat(first.stat(), second.stat())
+    assert store.statistics() == (1, len(b"content"), 2 * len(b"content"))
+
+
+def test_reused_blob_is_newer_than_the_replaced_file(tmp_path: Path) -> None:
+    store = ContentStore(tmp_path.joinpath("blobs"))
+    store.link(tmp_path.joinpath("other.hpp"), b"new")
+    os.utime(store.store(b"new"), (1, 1))
+    file = tmp_path.joinpath("file.hpp")
+    file.write_bytes(b"old")
+    os.utime(file, (2, 2))
+    assert store.link(file, b"new")
+    assert file.read_bytes() == b"new"
+    assert file.stat().st_mtime > 2
+
+
+def test_reused_blob_does_not_touch_other_trees(tmp_path: Path) -> None:
+    store = ContentStore(tmp_path.joinpath("blobs"))
+    tree_a, tree_b = tmp_path.joinpath("a", "x.hpp"), tmp_path.joinpath("b", "x.hpp")
+    store.link(tree_a, b"new")
+    os.utime(tree_a, (1, 1))
+    tree_a_mtime_ns = tree_a.stat().st_mtime_ns
+    tree_b.parent.mkdir()
+    tree_b.write_bytes(b"old")
+    os.utime(tree_b, (2, 2))
+    assert store.link(tree_b, b"new")
+    assert tree_b.read_bytes() == b"new"
+    assert tree_b.stat().st_mtime > 2
+    assert tree_a.stat().st_mtime_ns == tree_a_mtime_ns
+    # subsequently linked files share the fresh blob
+    tree_c = tmp_path.joinpath("c", "x.hpp")
+    store.link(tree_c, b"new")
+    assert os.path.samestat(tree_b.stat(), tree_c.stat())
+
+
+def test_unlinked_blobs_are_collected(tmp_path: Path) -> None:
+    store = ContentStore(tmp_path.joinpath("blobs"))
+    store.link(tmp_path.joinpath("a.hpp"), b"a")
+    store.link(tmp_path.joinpath("b.hpp"), b"b")
+    tmp_path.joinpath("a.hpp").unlink()
+    assert store.collect_garbage() == 1
+    assert store.statistics()[0] == 1
+
+
+def test_output_writer_links_into_the_store(tmp_path: Path) -> None:
+    writer = OutputWriter()
+    writer.reset(ContentStore(tmp_path.joinpath(".tsl_blobs")))
+    writer.write_text(tmp_path.joinpath("a.hpp"), "same")
+    writer.write_text(tmp_path.joinpath("b.hpp"), "same")
+    writer.prune(tmp_path)
+    assert os.path.samestat(tmp_path.joinpath("a.hpp").stat(), tmp_path.joinpath("b.hpp").stat())
+    assert writer.content_store.statistics()[0] == 1
+
+
+def test_generated_files_do_not_embed_the_output_path(tmp_path: Path, run_generator) -> None:
+    out_path = tmp_path.joinpath("tsl")
+    run_generator(["-o", str(out_path), "--no-testing", "--primitives", "loadu"])
+    header = out_path.joinpath("include", "generated", "declarations", "memory.hpp").read_text()
+    assert " * \\file include/generated/declarations/memory.hpp" in header
+    assert "TUD_D2RG_TSL_INCLUDE_GENERATED_DECLARATIONS_MEMORY_HPP" in header
+    for file in out_path.rglob("*"):
+        if file.is_file():
+            assert str(tmp_path) not in file.read_text(errors="ignore"), file
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+from generator.utils.dependency_map import DependencyMap
+from generator.utils.dict_utils import stable_digest
+from tests.test_deterministic_output import read_tree
+
+
+def no_digest(input_key: str) -> None:
+    return None
+
+
+def test_payload_is_reused_while_the_inputs_match(tmp_path: Path) -> None:
+    dependency_map = DependencyMap(tmp_path.joinpath("map"), "salt")
+    inputs = {"primitive:loadu": "1", "extension:sse": "2"}
+    assert dependency_map.lookup("memory_sse.hpp", inputs, no_digest) is None
+    dependency_map.store("memory_sse.hpp", inputs, "rendered")
+    assert dependency_map.lookup("memory_sse.hpp", inputs, no_digest) == "rendered"
+    assert dependency_map.lookup("memory_sse.hpp", {**inputs, "extension:sse": "3"}, no_digest) is None
+    assert dependency_map.lookup("memory_sse.hpp", {**inputs, "primitive:storeu": "4"}, no_digest) is None
+    assert (dependency_map.hits, dependency_map.misses) == (1, 3)
+
+
+def test_recorded_inputs_are_checked_through_the_digest_function(tmp_path: Path) -> None:
+    dependency_map = DependencyMap(tmp_path.joinpath("map"), "salt")
+    dependency_map.store("memory_sse.hpp", {"primitive:loadu": "1", "core/license.template": "5"}, "rendered")
+    digests = {"core/license.template": "5"}
+    assert dependency_map.lookup("memory_sse.hpp", {"primitive:loadu": "1"}, digests.get) == "rendered"
+    digests["core/license.template"] = "6"
+    assert dependency_map.lookup("memory_sse.hpp", {"primitive:loadu": "1"}, digests.get) is None
+    # removed templates invalidate the output, too
+    assert dependency_map.lookup("memory_sse.hpp", {"primitive:loadu": "1"}, no_digest) is None
+
+
+def test_dependents(tmp_path: Path) -> None:
+    dependency_map = DependencyMap(tmp_path.joinpath("map"), "salt")
+    dependency_map.store("memory_sse.hpp", {"primitive:loadu": "1", "extension:sse": "2"}, "")
+    dependency_map.store("memory_avx2.hpp", {"primitive:loadu": "1", "extension:avx2": "3"}, "")
+    assert sorted(dependency_map.dependents("primitive:loadu")) == ["memory_avx2.hpp", "memory_sse.hpp"]
+    assert dependency_map.dependents("extension:sse") == ("memory_sse.hpp",)
+    assert dependency_map.dependents("extension:neon") == ()
+
+
+def test_only_used_records_are_persisted(tmp_path: Path) -> None:
+    dependency_map = DependencyMap(tmp_path.joinpath("map"), "salt")
+    dependency_map.store("memory_sse.hpp", {"primitive:loadu": "1"}, "sse")
+    dependency_map.store("memory_avx2.hpp", {"primitive:loadu": "1"}, "avx2")
+    dependency_map.save()
+
+    reloaded = DependencyMap(tmp_path.joinpath("map"), "salt")
+    assert reloaded.lookup("memory_sse.hpp", {"primitive:loadu": "1"}, no_digest) == "sse"
+    reloaded.save()
+    reloaded = DependencyMap(tmp_path.joinpath("map"), "salt")
+    assert reloaded.lookup("memory_avx2.hpp", {"primitive:loadu": "1"}, no_digest) is None
+    assert reloaded.lookup("memory_sse.hpp", {"primitive:loadu": "1"}, no_digest) == "sse"
+
+
+def test_different_salt_discards_the_records(tmp_path: Path) -> None:
+    dependency_map = DependencyMap(tmp_path.joinpath("map"), "salt")
+    dependency_map.store("memory_sse.hpp", {"primitive:loadu": "1"}, "sse")
+    dependency_map.save()
+    assert DependencyMap(tmp_path.joinpath("map"), "other configuration").lookup(
+        "memory_sse.hpp", {"primitive:loadu": "1"}, no_digest) is None
+
+
+@pytest.mark.parametrize("corrupt", [lambda raw: raw[:-1], lambda raw: b"TSLDM0" + raw[6:], lambda raw: b""])
+def test_corrupted_maps_are_discarded(tmp_path: Path, corrupt) -> None:
+    dependency_map = DependencyMap(tmp_path.joinpath("map"), "salt")
+    dependency_map.store("memory_sse.hpp", {"primitive:loadu": "1"}, "sse")
+    dependency_map.save()
+    tmp_path.joinpath("map").write_bytes(corrupt(tmp_path.joinpath("map").read_bytes()))
+    assert DependencyMap(tmp_path.joinpath("map"), "salt").lookup(
+        "memory_sse.hpp", {"primitive:loadu": "1"}, no_digest) is None
+
+
+def test_stable_digest() -> None:
+    data = {"lscpu_flags": {"avx2", "avx", "sse4_2"}, "ctype": ["float", "double"], "is_native": True}
+    assert stable_digest(data) == stable_digest({"lscpu_flags": {"sse4_2", "avx2", "avx"},
+                                                 "ctype": ["float", "double"], "is_native": True})
+    assert stable_digest(data) != stable_digest({**data, "ctype": ["double", "float"]})
+    assert stable_digest(data) != stable_digest({**data, "is_native": 1})
+    assert stable_digest(["a", "b"]) != stable_digest(["ab"])
+
+
+def test_template_dependencies_are_resolved_transitively(tsl_config) -> None:
+    assert {"core/header_file.template", "core/license.template", "core/doxygen_file.template"} <= \
+        tsl_config.template_dependencies("core::header_file")
+    assert tsl_config.template_dependencies("core::license") == {"core/license.template"}
+    assert tsl_config.template_source_dependencies("return {{ value }};") == frozenset()
+    assert tsl_config.template_source_dependencies("{% include 'core/header_file.template' %}") == \
+        tsl_config.template_dependencies("core::header_file")
+
+
+def test_reused_outputs_match_rendered_outputs(tmp_path: Path, run_generator) -> None:
+    # the recorded input digests must not depend on the hash seed of the process
+    run_generator(["-o", str(tmp_path.joinpath("incremental")), "--no-stamp"], hash_seed=1)
+    result = run_generator(["-o", str(tmp_path.joinpath("incremental")), "--no-stamp"], hash_seed=2)
+    assert "outputs reused, 0 outputs rendered" in result.stdout
+    run_generator(["-o", str(tmp_path.joinpath("rendered")), "--no-incremental"])
+    assert read_tree(tmp_path.joinpath("incremental")) == read_tree(tmp_path.joinpath("rendered"))
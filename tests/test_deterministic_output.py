@@ -0,0 +1,19 @@
+from pathlib import Path
+from typing import Dict
+
+
+def read_tree(root_path: Path) -> Dict[str, bytes]:
+    return {file.relative_to(root_path).as_posix(): file.read_bytes() for file in sorted(root_path.rglob("*"))
+            if file.is_file()}
+
+
+def test_identical_runs_produce_identical_output(tmp_path: Path, run_generator) -> None:
+    # the iteration order of sets differs between processes with different hash seeds
+    trees = []
+    for hash_seed in (1, 2):
+        out_path = tmp_path.joinpath("tsl")
+        run_generator(["-o", str(out_path), "--no-incremental", "--no-model-cache"], hash_seed=hash_seed)
+        trees.append(read_tree(out_path))
+        out_path.rename(tmp_path.joinpath(f"tsl_{hash_seed}"))
+    assert trees[0].keys() == trees[1].keys()
+    assert [file for file in trees[0] if trees[0][file] != trees[1][file]] == []
@@ -0,0 +1,59 @@
+import hashlib
+import os
+from pathlib import Path
+
+from generator.utils.document_cache import DocumentCache
+
+
+def yaml_file(tmp_path: Path, content: str = "name: loadu\n") -> Path:
+    file = tmp_path.joinpath("memory.yaml")
+    file.write_text(content)
+    return file
+
+
+def test_miss_then_hit(tmp_path: Path) -> None:
+    cache = DocumentCache(tmp_path.joinpath("cache"), "salt", 1024 * 1024)
+    file = yaml_file(tmp_path)
+    assert cache.get(file) is None
+    cache.put(file, [{"name": "loadu"}])
+    assert cache.get(file) == [{"name": "loadu"}]
+
+
+def test_changed_content_or_salt_invalidates_the_entry(tmp_path: Path) -> None:
+    cache = DocumentCache(tmp_path.joinpath("cache"), "salt", 1024 * 1024)
+    file = yaml_file(tmp_path)
+    cache.put(file, [{"name": "loadu"}])
+    assert DocumentCache(tmp_path.joinpath("cache"), "other schema", 1024 * 1024).get(file) is None
+    yaml_file(tmp_path, "name: storeu\n")
+    assert cache.get(file) is None
+
+
+def test_precomputed_digest_is_used_as_key(tmp_path: Path) -> None:
+    cache = DocumentCache(tmp_path.joinpath("cache"), "salt", 1024 * 1024)
+    file = yaml_file(tmp_path)
+    assert cache.key(file) == cache.key(file, hashlib.sha256(file.read_bytes()).hexdigest())
+    cache.put(file, [{"name": "loadu"}], "digest")
+    assert cache.get(file, "digest") == [{"name": "loadu"}]
+    assert cache.get(file) is None
+
+
+def test_corrupted_entries_are_removed(tmp_path: Path) -> None:
+    cache = DocumentCache(tmp_path.joinpath("cache"), "salt", 1024 * 1024)
+    file = yaml_file(tmp_path)
+    cache.put(file, [{"name": "loadu"}])
+    entry = next(tmp_path.joinpath("cache").rglob("*.pickle"))
+    entry.write_bytes(entry.read_bytes()[:-1])
+    assert cache.get(file) is None
+    assert not entry.exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = DocumentCache(tmp_path.joinpath("cache"), "salt", 1024 * 1024)
+    for age, digest in enumerate(["a", "b", "c"]):
+        cache.put(Path("unused.yaml"), [os.urandom(1024)], digest)
+        os.utime(next(tmp_path.joinpath("cache").rglob(f"{cache.key(Path('unused.yaml'), digest)}.pickle")),
+                 (age, age))
+    entry_size = next(tmp_path.joinpath("cache").rglob("*.pickle")).stat().st_size
+    DocumentCache(tmp_path.joinpath("cache"), "salt", 2 * entry_size).evict()
+    assert cache.get(Path("unused.yaml"), "a") is None
+    assert cache.get(Path("unused.yaml"), "b") is not None and cache.get(Path("unused.yaml"), "c") is not None
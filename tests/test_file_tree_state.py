@@ -0,0 +1,77 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from generator.utils.file_utils import StaticFileTree
+
+
+@pytest.fixture
+def tree_path(tmp_path: Path) -> Path:
+    tmp_path.joinpath("nested").mkdir()
+    tmp_path.joinpath("a.yaml").write_text("a")
+    tmp_path.joinpath("nested", "b.yaml").write_text("b")
+    tmp_path.joinpath("ignored.txt").write_text("c")
+    return tmp_path
+
+
+def persisted_tree(tree_path: Path) -> StaticFileTree:
+    """
+    Builds and commits a tree, and restores its state within a new tree, like a subsequent process invocation does.
+    """
+    tree = StaticFileTree(tree_path, "*.yaml").build()
+    tree.commit()
+    state = json.loads(json.dumps(tree.state()))
+    restored = StaticFileTree(tree_path, "*.yaml")
+    restored.restore_state(state)
+    return restored
+
+
+def test_unchanged_files_are_not_reported_after_restore(tree_path: Path) -> None:
+    tree = persisted_tree(tree_path).build()
+    assert tree.changed_since_commit() == ([], [])
+
+
+def test_changes_since_the_last_invocation_are_reported(tree_path: Path) -> None:
+    tree = persisted_tree(tree_path)
+    tree_path.joinpath("a.yaml").write_text("modified")
+    tree_path.joinpath("nested", "b.yaml").unlink()
+    tree_path.joinpath("c.yaml").write_text("c")
+    tree.build()
+    modified, removed = tree.changed_since_commit()
+    assert sorted(modified) == [tree_path.joinpath("a.yaml"), tree_path.joinpath("c.yaml")]
+    assert removed == [tree_path.joinpath("nested", "b.yaml")]
+
+
+def test_touched_files_with_identical_content_are_not_reported(tree_path: Path) -> None:
+    tree = persisted_tree(tree_path)
+    os.utime(tree_path.joinpath("a.yaml"), (1, 1))
+    tree.build()
+    assert tree.changed_since_commit() == ([], [])
+
+
+def test_invalid_state_entries_are_ignored(tree_path: Path) -> None:
+    tree = StaticFileTree(tree_path, "*.yaml")
+    tree.restore_state({f"{tree_path.joinpath('a.yaml')}": ["not a number", 0, ""], "other": [1]})
+    tree.build()
+    assert sorted(tree.changed_since_commit()[0]) == [tree_path.joinpath("a.yaml"),
+                                                      tree_path.joinpath("nested", "b.yaml")]
+
+
+def test_candidates_restrict_the_scan(tree_path: Path) -> None:
+    tree = StaticFileTree(tree_path, "*.yaml").build()
+    assert list(tree.get_recently_updated_files()) == []
+    tree_path.joinpath("a.yaml").write_text("modified")
+    tree_path.joinpath("nested", "b.yaml").write_text("modified")
+    candidates = [tree_path.joinpath("a.yaml"), tree_path.joinpath("ignored.txt"), Path("/elsewhere/x.yaml")]
+    assert list(tree.get_recently_updated_files(candidates)) == [tree_path.joinpath("a.yaml")]
+    assert list(tree.get_recently_updated_files()) == [tree_path.joinpath("nested", "b.yaml")]
+
+
+def test_generation_persists_the_file_state(tmp_path: Path, run_generator) -> None:
+    out_path = tmp_path.joinpath("tsl")
+    run_generator(["-o", str(out_path), "--no-testing", "--primitives", "loadu"])
+    states = json.loads(out_path.joinpath(".tsl_file_state.json").read_text())
+    assert states.keys() == {"extensions", "primitives"}
+    assert any(file.endswith("memory.yaml") for file in states["primitives"])
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from generator.utils.file_watcher import FileWatcher, InotifyFileWatcher, PollingFileWatcher, create_file_watcher
+
+
+def wait_for(condition: Callable[[], bool], timeout_s: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def collect_changes(watcher: FileWatcher, expected: set) -> set:
+    collected = set()
+
+    def all_collected() -> bool:
+        collected.update(watcher.take_changes()[0])
+        return expected <= collected
+
+    wait_for(all_collected)
+    return collected
+
+
+def test_file_watcher_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        FileWatcher([])
+
+
+@pytest.fixture(params=["poll", "inotify"])
+def watched_tree(request, tmp_path: Path):
+    if request.param == "inotify" and not InotifyFileWatcher.available():
+        pytest.skip("inotify is not available")
+    tmp_path.joinpath("nested").mkdir()
+    tmp_path.joinpath("nested", "modified.yaml").write_text("a")
+    tmp_path.joinpath("removed.yaml").write_text("a")
+    watcher = create_file_watcher([tmp_path], request.param, 0.05)
+    yield tmp_path, watcher
+    watcher.stop()
+
+
+def test_first_consumer_has_to_rescan(watched_tree) -> None:
+    _, watcher = watched_tree
+    assert watcher.take_changes() == (set(), True)
+    assert watcher.take_changes() == (set(), False)
+
+
+def test_changes_are_collected(watched_tree) -> None:
+    root_path, watcher = watched_tree
+    watcher.take_changes()
+    # the polling watcher detects changes by size or modification time
+    root_path.joinpath("nested", "modified.yaml").write_text("ab")
+    root_path.joinpath("removed.yaml").unlink()
+    root_path.joinpath("created.yaml").write_text("a")
+    expected = {root_path.joinpath("nested", "modified.yaml"), root_path.joinpath("removed.yaml"),
+                root_path.joinpath("created.yaml")}
+    assert collect_changes(watcher, expected) >= expected
+
+
+def test_files_of_new_directories_are_collected(watched_tree) -> None:
+    root_path, watcher = watched_tree
+    watcher.take_changes()
+    root_path.joinpath("new").mkdir()
+    time.sleep(0.2)
+    root_path.joinpath("new", "file.yaml").write_text("a")
+    expected = {root_path.joinpath("new", "file.yaml")}
+    assert collect_changes(watcher, expected) >= expected
+
+
+def test_polling_watcher_can_be_requested(tmp_path: Path) -> None:
+    watcher = create_file_watcher([tmp_path], "poll", 0.05)
+    try:
+        assert isinstance(watcher, PollingFileWatcher)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_watcher_lock_is_not_inherited_while_held(watched_tree) -> None:
+    root_path, watcher = watched_tree
+    watcher.take_changes()
+    locked = threading.Event()
+
+    def hold_lock() -> None:
+        # stands in for the watcher thread, which is marking a change while the loaders are forked
+        with watcher._lock:
+            locked.set()
+            time.sleep(0.3)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if watcher._lock.acquire(timeout=5) else 1)
+    holder.join()
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    # the watcher of the parent keeps collecting changes
+    root_path.joinpath("created.yaml").write_text("a")
+    expected = {root_path.joinpath("created.yaml")}
+    assert collect_changes(watcher, expected) >= expected
@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+from generator.utils.generation_cache import GenerationCache
+
+RELOCATIONS_A = [(b"\0OUT\0/", b"/build/a/")]
+RELOCATIONS_B = [(b"\0OUT\0/", b"/build/b/")]
+KEY = "ab" + "0" * 62
+
+
+def test_miss_then_hit(tmp_path: Path) -> None:
+    cache = GenerationCache(tmp_path, 1024 * 1024)
+    assert cache.get(KEY, RELOCATIONS_A) is None
+    recorded = {Path("include/a.hpp"): b"a", Path("CMakeLists.txt"): b"b"}
+    assert cache.put(KEY, recorded, RELOCATIONS_A)
+    assert cache.get(KEY, RELOCATIONS_A) == recorded
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.statistics()[:3] == (1, 1, 1)
+
+
+def test_entries_are_relocated_into_another_output_directory(tmp_path: Path) -> None:
+    cache = GenerationCache(tmp_path, 1024 * 1024)
+    cache.put(KEY, {Path("a.hpp"): b"\\file /build/a/include/a.hpp"}, RELOCATIONS_A)
+    assert cache.get(KEY, RELOCATIONS_B) == {Path("a.hpp"): b"\\file /build/b/include/a.hpp"}
+
+
+def test_trees_outside_of_the_output_directory_are_not_stored(tmp_path: Path) -> None:
+    cache = GenerationCache(tmp_path, 1024 * 1024)
+    assert not cache.put(KEY, {Path("/elsewhere/a.hpp"): b"a"}, RELOCATIONS_A)
+    assert cache.get(KEY, RELOCATIONS_A) is None
+
+
+def test_corrupted_entries_are_removed(tmp_path: Path) -> None:
+    cache = GenerationCache(tmp_path, 1024 * 1024)
+    cache.put(KEY, {Path("a.hpp"): b"a"}, RELOCATIONS_A)
+    entry = next(tmp_path.glob("*/*.entry"))
+    entry.write_bytes(entry.read_bytes()[:-1] + b"x")
+    assert cache.get(KEY, RELOCATIONS_A) is None
+    assert not entry.exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = GenerationCache(tmp_path, 1024 * 1024)
+    keys = [f"{i:02x}" + "0" * 62 for i in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, {Path("a.hpp"): os.urandom(1024)}, RELOCATIONS_A)
+        entry = next(tmp_path.glob(f"*/{key}.entry"))
+        os.utime(entry, (age, age))
+    entry_size = next(tmp_path.glob("*/*.entry")).stat().st_size
+    GenerationCache(tmp_path, 2 * entry_size).evict()
+    assert sorted(entry.stem for entry in tmp_path.glob("*/*.entry")) == keys[1:]
+
+
+def test_explicit_opt_out_wins_over_the_environment(tsl_config, monkeypatch) -> None:
+    monkeypatch.delenv("TSL_GENERATOR_CACHE_DIR", raising=False)
+    assert not tsl_config.generation_cache_enabled
+    monkeypatch.setenv("TSL_GENERATOR_CACHE_DIR", "/tmp/tsl_generator")
+    assert tsl_config.generation_cache_enabled
+    with tsl_config.overlay({"configuration": {"generation_cache": {"enabled": False}}}):
+        assert not tsl_config.generation_cache_enabled
+    with tsl_config.overlay({"configuration": {"generation_cache": {"enabled": True}}}):
+        monkeypatch.delenv("TSL_GENERATOR_CACHE_DIR")
+        assert tsl_config.generation_cache_enabled
@@ -0,0 +1,60 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from generator.utils.git_utils import GitUtils
+
+
+def git(repository: Path, *args: str) -> str:
+    return subprocess.check_output(["git", "-C", str(repository), *args], text=True).strip()
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> Path:
+    repository = tmp_path.joinpath("repository")
+    repository.mkdir()
+    git(repository, "init", "-q", "-b", "main")
+    git(repository, "config", "user.email", "tsl@example.com")
+    git(repository, "config", "user.name", "tsl")
+    git(repository, "remote", "add", "origin", "https://example.com/tsl.git")
+    repository.joinpath("file.txt").write_text("content")
+    git(repository, "add", "file.txt")
+    git(repository, "commit", "-q", "-m", "initial")
+    # an annotated tag changes the output of 'git describe', but must not change the abbreviated hash
+    git(repository, "tag", "-a", "v1.0", "-m", "release")
+    return repository
+
+
+def assert_same_data(repository: Path, monkeypatch) -> GitUtils:
+    read = GitUtils.read_git_data(repository)
+    monkeypatch.chdir(repository)
+    queried = GitUtils.query_git_data()
+    assert (read.remote_url, read.branch, read.abbrev_hash, read.hash) == \
+           (queried.remote_url, queried.branch, queried.abbrev_hash, queried.hash)
+    assert read.hash == git(repository, "rev-parse", "HEAD")
+    return read
+
+
+def test_branch(repository: Path, monkeypatch) -> None:
+    data = assert_same_data(repository, monkeypatch)
+    assert data.branch == "main"
+    assert data.abbrev_hash == data.hash[:7]
+    assert str(data) == f"https://example.com/tsl.git:/main@{data.hash[:7]}"
+
+
+def test_packed_refs(repository: Path, monkeypatch) -> None:
+    git(repository, "pack-refs", "--all")
+    assert not repository.joinpath(".git", "refs", "heads", "main").exists()
+    assert_same_data(repository, monkeypatch)
+
+
+def test_detached_head(repository: Path, monkeypatch) -> None:
+    git(repository, "checkout", "-q", "--detach")
+    assert assert_same_data(repository, monkeypatch).branch == "HEAD"
+
+
+def test_missing_remote(repository: Path) -> None:
+    git(repository, "remote", "remove", "origin")
+    with pytest.raises(LookupError):
+        GitUtils.read_git_data(repository)
@@ -0,0 +1,130 @@
+import logging
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from generator.utils.log_utils import LogInit, enable_fast_logging, fast_logging_enabled, log, log_threshold, \
+    reset_log_thresholds
+from tests.conftest import REPO_ROOT
+
+
+class ReprCounter:
+    reprs = 0
+
+    def __repr__(self) -> str:
+        ReprCounter.reprs += 1
+        return "ReprCounter"
+
+
+class LoggedModel:
+    @LogInit()
+    def __init__(self, value) -> None:
+        self.value = value
+
+    @log
+    def twice(self, value):
+        self.log(logging.INFO, "doubling")
+        return value
+
+    def warn(self) -> None:
+        self.log(logging.WARNING, "careful")
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, level: int) -> None:
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def isolate(handler: RecordingHandler) -> None:
+    # pytest attaches its capture handlers (which emit every message) when the test is called
+    logging.getLogger(LoggedModel.__name__).handlers = [handler]
+    reset_log_thresholds()
+
+
+@pytest.fixture
+def handler():
+    logger = logging.getLogger(LoggedModel.__name__)
+    handler = RecordingHandler(logging.INFO)
+    handlers, level, propagate, fast = logger.handlers, logger.level, logger.propagate, fast_logging_enabled()
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    ReprCounter.reprs = 0
+    yield handler
+    logger.handlers = handlers
+    logger.setLevel(level)
+    logger.propagate = propagate
+    enable_fast_logging(fast)
+
+
+def test_threshold_is_the_lowest_emitted_level(handler: RecordingHandler) -> None:
+    isolate(handler)
+    logger = logging.getLogger(LoggedModel.__name__)
+    assert log_threshold(logger) == logging.INFO
+    handler.setLevel(logging.DEBUG)
+    # thresholds are cached until they are reset
+    assert log_threshold(logger) == logging.INFO
+    reset_log_thresholds()
+    assert log_threshold(logger) == logging.DEBUG
+    logger.setLevel(logging.ERROR)
+    reset_log_thresholds()
+    assert log_threshold(logger) == logging.ERROR
+
+
+def test_arguments_are_only_formatted_if_debug_messages_are_emitted(handler: RecordingHandler) -> None:
+    isolate(handler)
+    model = LoggedModel(ReprCounter())
+    model.twice(ReprCounter())
+    assert ReprCounter.reprs == 0
+    assert [record.getMessage() for record in handler.records] == [f"doubling ({__file__}::twice)"]
+
+    handler.setLevel(logging.DEBUG)
+    reset_log_thresholds()
+    model = LoggedModel(ReprCounter())
+    model.twice(ReprCounter())
+    assert ReprCounter.reprs > 0
+    assert any("Created instance of LoggedModel" in record.getMessage() for record in handler.records)
+    assert any("Called twice" in record.getMessage() for record in handler.records)
+
+
+def test_fast_logging_only_emits_warnings_and_errors(handler: RecordingHandler) -> None:
+    isolate(handler)
+    handler.setLevel(logging.DEBUG)
+    enable_fast_logging()
+    model = LoggedModel(ReprCounter())
+    model.twice(ReprCounter())
+    model.warn()
+    assert ReprCounter.reprs == 0
+    assert [record.levelno for record in handler.records] == [logging.WARNING]
+    enable_fast_logging(False)
+    model.twice(ReprCounter())
+    assert ReprCounter.reprs > 0
+
+
+def test_logged_instances_are_picklable(handler: RecordingHandler) -> None:
+    isolate(handler)
+    model = pickle.loads(pickle.dumps(LoggedModel(1)))
+    assert model.value == 1
+    model.warn()
+    assert handler.records[-1].getMessage().startswith("careful")
+
+
+def test_decorators_are_removed_if_logging_is_compiled_out(tmp_path) -> None:
+    script = tmp_path.joinpath("compiled_out.py")
+    script.write_text("\n".join([
+        "import logging",
+        "from generator.utils.log_utils import LogInit, log",
+        "def f(): pass",
+        "assert log(f) is f",
+        "class C:",
+        "    @LogInit()",
+        "    def __init__(self): pass",
+        "C().log(logging.WARNING, 'still available')",
+    ]))
+    subprocess.run([sys.executable, str(script)], check=True,
+                   env={"TSL_GENERATOR_FAST": "1", "PYTHONPATH": str(REPO_ROOT)})
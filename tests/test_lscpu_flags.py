@@ -0,0 +1,79 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from generator.core.ctrl.tsl_slicer import TSLSlicer
+from generator.core.model.tsl_lscpu_flags import TSLLscpuFlagRequirement, TSLLscpuFlags, lscpu_flags
+from generator.core.tsl_batch import load_flavors
+from tests.conftest import REPO_ROOT
+
+
+def test_flags_are_interned_into_distinct_bits() -> None:
+    flags = TSLLscpuFlags()
+    assert flags.bit("sse") == 1 and flags.bit("avx") == 2 and flags.bit("sse") == 1
+    assert flags.mask(["avx", "sse", "avx2"]) == 0b111
+    assert len(flags) == 3
+    assert TSLLscpuFlags.popcount(0b1011) == 3
+
+
+def test_conjunction() -> None:
+    requirement = TSLLscpuFlagRequirement(["avx512f", "avx512bw"])
+    assert not requirement.is_disjunction
+    assert requirement.is_satisfied_by(lscpu_flags.mask(["avx512f", "avx512bw", "sse"]))
+    assert not requirement.is_satisfied_by(lscpu_flags.mask(["avx512f", "sse"]))
+    assert requirement.intersects(lscpu_flags.mask(["avx512f"]))
+    assert not requirement.intersects(lscpu_flags.mask(["sse"]))
+
+
+def test_empty_requirement_is_satisfied_by_any_flags() -> None:
+    requirement = TSLLscpuFlagRequirement([])
+    assert requirement.flags_mask == 0
+    assert requirement.is_satisfied_by(0) and requirement.intersects(0)
+    assert requirement.satisfied_term(0) == 0
+
+
+def test_disjunction_of_groups() -> None:
+    requirement = TSLLscpuFlagRequirement(["['avx512f', 'avx512bw']", "['avx512f']"])
+    assert requirement.is_disjunction
+    assert requirement.group(0) == ["avx512f", "avx512bw"] and requirement.group(1) == ["avx512f"]
+    assert requirement.satisfied_term(lscpu_flags.mask(["avx512f", "avx512bw"])) == 0
+    assert requirement.satisfied_term(lscpu_flags.mask(["avx512f"])) == 1
+    assert requirement.satisfied_term(lscpu_flags.mask(["avx2"])) == -1
+    assert not requirement.is_satisfied_by(lscpu_flags.mask(["avx2"]))
+
+
+@pytest.mark.parametrize("flags, disjunction", [
+    (["['avx512f', 'avx512bw']", "['avx512f']"], True),
+    (["['avx512f']"], False),
+    (["['avx512f']", "['avx512f']"], False),
+    (["sse", "sse2"], False),
+])
+def test_is_disjunction_of(flags: List[str], disjunction: bool) -> None:
+    assert TSLLscpuFlagRequirement.is_disjunction_of(flags) == disjunction
+
+
+def string_set_extension_relevance(flags: List[str], data: dict) -> bool:
+    return len(data["lscpu_flags"]) == 0 or len(set(data["lscpu_flags"]) & set(flags)) > 0
+
+
+def string_set_primitive_relevance(flags: List[str], data: dict) -> bool:
+    if len(data["lscpu_flags"]) == 0:
+        return True
+    if TSLLscpuFlagRequirement.is_disjunction_of(data["lscpu_flags"]):
+        return any(set(TSLLscpuFlagRequirement.parse_group(group)).issubset(set(flags))
+                   for group in data["lscpu_flags"])
+    return set(data["lscpu_flags"]).issubset(set(flags))
+
+
+def test_relevance_matches_string_sets_for_all_target_platforms(tsl_generator) -> None:
+    definitions = [definition for primitive_class in tsl_generator.primitive_class_set
+                   for primitive in primitive_class for definition in primitive.definitions]
+    for flavor in load_flavors(REPO_ROOT.joinpath("target_specs.json")):
+        slicer = TSLSlicer(flavor.flags)
+        for extension in tsl_generator.extension_set:
+            assert slicer.is_extension_relevant(extension) == \
+                string_set_extension_relevance(flavor.flags, extension.data), (flavor.name, extension.name)
+        for definition in definitions:
+            assert slicer.is_primitive_relevant(definition) == \
+                string_set_primitive_relevance(flavor.flags, definition.data), (flavor.name, f"{definition}")
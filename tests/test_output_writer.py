@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+from generator.utils.output_writer import OutputWriter
+
+
+def test_unchanged_file_is_not_rewritten(tmp_path: Path) -> None:
+    writer = OutputWriter()
+    file = tmp_path.joinpath("a", "b.hpp")
+    writer.write_text(file, "content")
+    writer.flush()
+    os.utime(file, (1, 1))
+    writer.reset()
+    writer.write_text(file, "content")
+    writer.flush()
+    assert (writer.written, writer.unchanged) == (0, 1)
+    assert file.stat().st_mtime == 1
+
+
+def test_changed_file_is_replaced_atomically(tmp_path: Path) -> None:
+    writer = OutputWriter()
+    file = tmp_path.joinpath("b.hpp")
+    file.write_text("old")
+    inode = file.stat().st_ino
+    writer.write_text(file, "new")
+    writer.flush()
+    assert file.read_text() == "new"
+    assert writer.written == 1
+    # the content is written into a temporary file, which replaces the target
+    assert file.stat().st_ino != inode
+    assert [f.name for f in tmp_path.iterdir()] == ["b.hpp"]
+
+
+def test_prune_removes_stale_files_and_empty_directories(tmp_path: Path) -> None:
+    writer = OutputWriter()
+    tmp_path.joinpath("stale", "nested").mkdir(parents=True)
+    tmp_path.joinpath("stale", "nested", "old.hpp").write_text("old")
+    tmp_path.joinpath("stale.hpp").write_text("old")
+    tmp_path.joinpath("kept.txt").write_text("kept")
+    writer.write_text(tmp_path.joinpath("fresh", "new.hpp"), "new")
+    writer.keep(tmp_path.joinpath("kept.txt"))
+    assert writer.prune(tmp_path) == 2
+    assert sorted(str(f.relative_to(tmp_path)) for f in tmp_path.rglob("*")) == \
+        ["fresh", "fresh/new.hpp", "kept.txt"]
+    assert writer.removed == 2
+
+
+def test_identical_runs_write_no_files(tmp_path: Path, run_generator) -> None:
+    out_path = tmp_path.joinpath("tsl")
+    run_generator(["-o", str(out_path), "--no-stamp"], hash_seed=1)
+    mtimes = {file: file.stat().st_mtime_ns for file in out_path.rglob("*") if file.is_file()}
+    result = run_generator(["-o", str(out_path), "--no-stamp"], hash_seed=2)
+    assert f"Output files: 0 written, {len(mtimes)} unchanged, 0 removed." in result.stdout
+    assert {file: file.stat().st_mtime_ns for file in out_path.rglob("*") if file.is_file()} == mtimes
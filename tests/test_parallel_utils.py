@@ -0,0 +1,78 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from generator.utils.output_writer import output_writer
+from generator.utils.parallel_utils import available_cores, fork_available, parallel_map
+
+# state of the calling process, which forked workers inherit
+_inherited_context = None
+
+
+def _square(value: int) -> int:
+    return value * value
+
+
+def _worker_pid(_) -> int:
+    return os.getpid()
+
+
+def _read_context(_) -> str:
+    return _inherited_context
+
+
+def _write_in_worker(file: Path) -> str:
+    # the writer of the worker starts without the I/O threads of the calling process
+    written = file.read_text()
+    output_writer.write_text(file.with_suffix(".worker"), written)
+    output_writer.flush()
+    return written
+
+
+def _fail(value: int) -> int:
+    raise ValueError(f"failed for {value}")
+
+
+def test_results_keep_the_order_of_items() -> None:
+    items = list(range(50))
+    assert parallel_map(_square, items, 4) == [item * item for item in items]
+    assert parallel_map(_square, items, 1) == [item * item for item in items]
+    assert parallel_map(_square, [], 4) == []
+
+
+def test_single_job_runs_in_the_calling_process() -> None:
+    assert set(parallel_map(_worker_pid, [1, 2, 3], 1)) == {os.getpid()}
+
+
+@pytest.mark.skipif(not fork_available(), reason="fork is not available")
+def test_workers_are_forked_from_the_calling_process() -> None:
+    global _inherited_context
+    _inherited_context = "warm"
+    try:
+        assert os.getpid() not in parallel_map(_worker_pid, list(range(8)), 2)
+        assert parallel_map(_read_context, list(range(8)), 2) == ["warm"] * 8
+    finally:
+        _inherited_context = None
+
+
+@pytest.mark.skipif(not fork_available(), reason="fork is not available")
+def test_pending_writes_are_flushed_before_forking(tmp_path: Path) -> None:
+    output_writer.reset()
+    files = [tmp_path.joinpath(f"{index}.hpp") for index in range(16)]
+    for file in files:
+        output_writer.write_text(file, file.name)
+    assert parallel_map(_write_in_worker, files, 4) == [file.name for file in files]
+    assert not any(thread.name.startswith("tsl_output_writer") for thread in threading.enumerate())
+    assert all(file.with_suffix(".worker").read_text() == file.name for file in files)
+    output_writer.reset()
+
+
+def test_errors_are_raised_in_the_calling_process() -> None:
+    with pytest.raises(ValueError, match="failed for"):
+        parallel_map(_fail, [1, 2], 2)
+
+
+def test_available_cores() -> None:
+    assert available_cores() >= 1
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+
+def printed_outputs(stdout: str) -> list:
+    return next(line for line in stdout.split("\n") if ";" in line).split(";")
+
+
+def test_printed_outputs_match_the_generated_headers(tmp_path: Path, run_generator) -> None:
+    out_path = tmp_path.joinpath("tsl")
+    printed = printed_outputs(run_generator(["-o", str(out_path), "--archid", "avx2", "--print-outputs-only"]).stdout)
+    # nothing is rendered or written
+    assert not out_path.exists()
+    assert len(printed) == len(set(printed))
+
+    run_generator(["-o", str(out_path), "--archid", "avx2"])
+    generated = {f"{file}" for file in out_path.joinpath("include").rglob("*.hpp")}
+    assert set(printed) == generated
@@ -0,0 +1,67 @@
+import inspect
+import subprocess
+import sys
+
+import pytest
+
+from generator.utils.requirement import enable_requirement_checks, requirement, requirement_checks_enabled
+from tests.conftest import REPO_ROOT
+
+
+@requirement(name="NonEmptyString", count="int;> 0", data="NotNone")
+def describe(name: str, count: int = 1, data: dict = None) -> str:
+    return f"{name}x{count}"
+
+
+@pytest.fixture
+def checks_enabled():
+    enabled = requirement_checks_enabled()
+    enable_requirement_checks()
+    yield
+    enable_requirement_checks(enabled)
+
+
+def test_fulfilled_requirements(checks_enabled) -> None:
+    assert describe("loadu", 2, {}) == "loadux2"
+    assert describe(name="loadu", count=3, data={}) == "loadux3"
+
+
+@pytest.mark.parametrize("args, kwargs, argument", [
+    (("", 1, {}), {}, "name"),
+    (("loadu", "1", {}), {}, "count"),
+    (("loadu", 0, {}), {}, "count"),
+    (("loadu", 1, None), {}, "data"),
+    (("loadu",), {"count": 0}, "count"),
+    ((), {"name": None}, "name"),
+])
+def test_violated_requirements_name_the_argument(checks_enabled, args, kwargs, argument: str) -> None:
+    with pytest.raises(ValueError, match=f"Argument {argument} does not fulfills"):
+        describe(*args, **kwargs)
+
+
+def test_omitted_arguments_with_defaults_are_not_checked(checks_enabled) -> None:
+    assert describe("loadu") == "loadux1"
+
+
+def test_checks_can_be_disabled_at_runtime(checks_enabled) -> None:
+    enable_requirement_checks(False)
+    assert describe("", 0) == "x0"
+    enable_requirement_checks()
+    with pytest.raises(ValueError):
+        describe("", 0)
+
+
+def test_decorated_function_keeps_its_signature() -> None:
+    assert describe.__name__ == "describe"
+    assert list(inspect.signature(describe).parameters) == ["name", "count", "data"]
+
+
+def test_decorator_is_removed_if_checks_are_compiled_out(tmp_path) -> None:
+    script = tmp_path.joinpath("compiled_out.py")
+    script.write_text("\n".join([
+        "from generator.utils.requirement import requirement",
+        "def f(arg): return arg",
+        "assert requirement(arg='NotNone')(f) is f",
+    ]))
+    subprocess.run([sys.executable, str(script)], check=True,
+                   env={"TSL_GENERATOR_FAST": "1", "PYTHONPATH": str(REPO_ROOT)})
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+import generator.core.tsl_config as tsl_config_module
+from generator.core.tsl_config import TSLGeneratorConfig
+from generator.utils.lru_cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_size_bound() -> None:
+    cache = LRUCache(8, 10, len)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.put("c", b"1")
+    assert "a" not in cache and cache.total_size == 6
+    # values exceeding the bound on their own are not cached
+    cache.put("d", b"12345678901")
+    assert "d" not in cache
+
+
+def test_get_or_create_creates_once() -> None:
+    cache = LRUCache(2)
+    created = []
+    assert cache.get_or_create("a", lambda key: created.append(key) or key.upper()) == "A"
+    assert cache.get_or_create("a", lambda key: created.append(key) or key.upper()) == "A"
+    assert created == ["a"]
+
+
+@pytest.fixture
+def watched_config(tsl_config, monkeypatch):
+    """
+    Configuration of a daemon with file watcher, which counts the scans of the support file trees.
+    """
+    scans = []
+
+    def counting_tree_state_digest(root_paths):
+        scans.append(root_paths)
+        return f"digest{len(scans)}"
+
+    monkeypatch.setattr(TSLGeneratorConfig, "file_watching_enabled", property(lambda self: True))
+    monkeypatch.setattr(tsl_config_module, "tree_state_digest", counting_tree_state_digest)
+    tsl_config.support_files_changed()
+    yield tsl_config, scans
+    tsl_config.support_files_changed()
+
+
+def test_support_files_digest_is_scanned_once_while_watching(watched_config) -> None:
+    config, scans = watched_config
+    assert config.support_files_digest == config.support_files_digest == "digest1"
+    assert len(scans) == 1
+
+
+def test_support_files_digest_is_invalidated_by_changes_within_the_support_trees(watched_config) -> None:
+    config, scans = watched_config
+    digest = config.support_files_digest
+    config.support_files_changed([Path("primitive_data/primitives/memory.yaml")])
+    assert config.support_files_digest == digest
+    config.support_files_changed([config.static_files_root_path.joinpath("new.yaml")])
+    assert config.support_files_digest != digest
+    config.support_files_changed([config.jinja_template_root_path.joinpath("core", "removed.template")])
+    config.support_files_digest
+    assert len(scans) == 3
+
+
+def test_support_files_digest_is_scanned_without_watcher(tsl_config, monkeypatch) -> None:
+    scans = []
+    monkeypatch.setattr(tsl_config_module, "tree_state_digest", lambda root_paths: scans.append(root_paths) or "")
+    tsl_config.support_files_digest
+    tsl_config.support_files_digest
+    assert len(scans) == 2
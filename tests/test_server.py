@@ -0,0 +1,143 @@
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from tests.conftest import REPO_ROOT, generator_environment, removing_generator_artifacts
+
+
+class Client:
+    def __init__(self, socket_path: Path) -> None:
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.settimeout(120)
+        self.__socket.connect(f"{socket_path}")
+        self.__reader = self.__socket.makefile("rb")
+        self.__next_id = 0
+
+    def send_line(self, line: bytes) -> None:
+        self.__socket.sendall(line + b"\n")
+
+    def receive(self) -> dict:
+        return json.loads(self.__reader.readline())
+
+    def call(self, method: str, **params) -> Tuple[dict, List[dict]]:
+        """
+        :return: Response and all notifications received before it.
+        """
+        self.__next_id += 1
+        self.send_line(json.dumps({"jsonrpc": "2.0", "id": self.__next_id, "method": method, "params": params})
+                       .encode("utf-8"))
+        notifications = []
+        while True:
+            message = self.receive()
+            if message.get("id") == self.__next_id:
+                return message, notifications
+            notifications.append(message)
+
+    def close(self) -> None:
+        self.__reader.close()
+        self.__socket.close()
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[Tuple[Path, Path]]:
+    with tempfile.TemporaryDirectory(prefix="tsl") as directory, removing_generator_artifacts():
+        socket_path = Path(directory).joinpath("server.sock")
+        out_path = Path(directory).joinpath("out")
+        process = subprocess.Popen([sys.executable, str(REPO_ROOT.joinpath("main.py")), "--socket", str(socket_path),
+                                    "--server-workers", "2", "-o", str(out_path), "--no-testing"],
+                                   env=generator_environment(), stdout=subprocess.PIPE, text=True)
+        try:
+            for line in process.stdout:
+                if line.startswith("Listening on"):
+                    break
+            else:
+                pytest.fail("Server did not start")
+            yield socket_path, out_path
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            process.stdout.close()
+
+
+@pytest.fixture
+def client(server) -> Iterator[Client]:
+    client = Client(server[0])
+    yield client
+    client.close()
+
+
+def test_health(client: Client) -> None:
+    response, _ = client.call("health")
+    assert response["result"]["status"] == "ok"
+    assert response["result"]["workers"] == 2
+
+
+def test_protocol_errors(client: Client) -> None:
+    client.send_line(b"{not json")
+    assert client.receive()["error"]["code"] == -32700
+    client.send_line(b'{"jsonrpc": "1.0", "id": 1, "method": "health"}')
+    assert client.receive()["error"]["code"] == -32600
+    assert client.call("unknown")[0]["error"]["code"] == -32601
+    assert client.call("status", request_id="unknown")[0]["error"]["code"] == -32602
+    assert client.call("generate", primitives="loadu")[0]["error"]["code"] == -32602
+    assert client.call("generate", config={"configuration": {"relevant_types": ["float"]}, "primitive_data": {}}
+                       )[0]["error"]["code"] == -32602
+
+
+def test_generate_reports_progress_and_is_cached(client: Client, server) -> None:
+    response, notifications = client.call("generate", request_id="memory", primitives=["loadu"])
+    result = response["result"]
+    assert result["output_path"] == f"{server[1].joinpath('memory')}"
+    assert not result["cached"] and result["written"] > 0
+    assert Path(result["output_path"]).joinpath("tsl.hpp").is_file()
+    assert [notification["params"]["state"] for notification in notifications][-1] == "done"
+    assert client.call("status", request_id="memory")[0]["result"]["state"] == "done"
+    response, _ = client.call("generate", request_id="memory", primitives=["loadu", "loadu"])
+    assert response["result"]["cached"]
+    assert client.call("health")[0]["result"]["served_from_cache"] == 1
+
+
+@pytest.mark.parametrize("request_id", ["../victim", "../../victim", "sub/victim", "/tmp/victim", "..", "."])
+def test_request_ids_must_not_leave_the_output_root(client: Client, server, request_id: str) -> None:
+    response, _ = client.call("generate", request_id=request_id, primitives=["loadu"])
+    assert response["error"]["code"] == -32602
+    assert not server[1].parent.joinpath("victim").exists()
+
+
+def test_foreign_output_directories_are_rejected(client: Client, tmp_path: Path) -> None:
+    victim = tmp_path.joinpath("victim")
+    victim.joinpath("sub").mkdir(parents=True)
+    victim.joinpath("keep.txt").write_text("keep")
+    victim.joinpath("sub", "notes.md").write_text("notes")
+    response, _ = client.call("generate", output_path=str(victim), primitives=["loadu"], clean=True)
+    assert response["error"]["code"] == -32602
+    response, _ = client.call("generate", config={"configuration": {"root_path": str(victim)}}, primitives=["loadu"])
+    assert response["error"]["code"] == -32602
+    assert client.call("generate", request_id="memory", primitives=["loadu"], clean="yes")[0]["error"]["code"] == \
+        -32602
+    assert sorted(file.relative_to(victim).as_posix() for file in victim.rglob("*")) == \
+        ["keep.txt", "sub", "sub/notes.md"]
+
+
+def test_empty_output_directories_are_accepted(client: Client, tmp_path: Path) -> None:
+    response, _ = client.call("generate", output_path=str(tmp_path), primitives=["loadu"])
+    assert Path(response["result"]["output_path"]).joinpath("tsl.hpp").is_file()
+    # generated directories can be used again
+    response, _ = client.call("generate", output_path=str(tmp_path), primitives=["storeu"])
+    assert response["result"]["output_path"] == f"{tmp_path}"
+
+
+def test_stale_files_are_only_removed_on_request(client: Client, server) -> None:
+    stale_file = server[1].joinpath("stale", "keep.txt")
+    stale_file.parent.mkdir(parents=True)
+    stale_file.write_text("keep")
+    response, _ = client.call("generate", request_id="stale", primitives=["loadu"])
+    assert response["result"]["removed"] == 0 and stale_file.is_file()
+    response, _ = client.call("generate", request_id="stale", primitives=["storeu"], clean=True)
+    assert response["result"]["removed"] > 0 and not stale_file.exists()
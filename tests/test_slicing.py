@@ -0,0 +1,101 @@
+import copy
+from typing import List
+
+import pytest
+
+from generator.core.ctrl.tsl_slicer import TSLSlicer
+from generator.core.model.tsl_lscpu_flags import lscpu_flags
+from generator.core.model.tsl_primitive import TSLPrimitive
+from generator.core.tsl_batch import load_flavors
+from tests.conftest import REPO_ROOT
+
+
+def model_definitions(primitive_class_set) -> list:
+    return [definition for primitive_class in primitive_class_set
+            for primitive in primitive_class for definition in primitive.definitions]
+
+
+def model_data(tsl_generator) -> list:
+    return [extension.data for extension in tsl_generator.extension_set] + \
+        [definition.data for definition in model_definitions(tsl_generator.primitive_class_set)]
+
+
+@pytest.fixture(scope="module")
+def flavors() -> list:
+    return load_flavors(REPO_ROOT.joinpath("target_specs.json"), ["scalar", "sse", "avx2", "skylake", "neon"])
+
+
+def test_slicing_without_flags_shares_the_model(tsl_generator, tsl_config) -> None:
+    slicer = TSLSlicer(None, tsl_config.relevant_types)
+    extensions = slicer.slice_extensions(tsl_generator.extension_set)
+    primitive_classes = slicer.slice_primitives(tsl_generator.primitive_class_set)
+    assert extensions is not tsl_generator.extension_set
+    assert primitive_classes is not tsl_generator.primitive_class_set
+    assert all(a is b for a, b in zip(extensions, tsl_generator.extension_set))
+    assert all(a is b for a, b in zip(primitive_classes, tsl_generator.primitive_class_set))
+
+
+def test_slicing_does_not_modify_the_model(tsl_generator, tsl_config, flavors) -> None:
+    before = copy.deepcopy(model_data(tsl_generator))
+    for flavor in flavors:
+        for relevant_types in (tsl_config.relevant_types, ["float", "double"]):
+            slicer = TSLSlicer(flavor.flags, relevant_types)
+            slicer.slice_extensions(tsl_generator.extension_set)
+            slicer.slice_primitives(tsl_generator.primitive_class_set)
+    assert model_data(tsl_generator) == before
+
+
+@pytest.mark.parametrize("relevant_types", [None, ["float", "double"]])
+def test_sliced_definitions_are_relevant_views(tsl_generator, tsl_config, flavors,
+                                               relevant_types: List[str]) -> None:
+    relevant_types = list(tsl_config.relevant_types) if relevant_types is None else relevant_types
+    model = {id(definition) for definition in model_definitions(tsl_generator.primitive_class_set)}
+    for flavor in flavors:
+        slicer = TSLSlicer(flavor.flags, relevant_types)
+        extension_names = {extension.name for extension in slicer.slice_extensions(tsl_generator.extension_set)}
+        assert all(extension.name in extension_names
+                   for extension in tsl_generator.extension_set if slicer.is_extension_relevant(extension))
+        definitions = model_definitions(slicer.slice_primitives(tsl_generator.primitive_class_set))
+        assert len(definitions) > 0
+        shared = 0
+        for definition in definitions:
+            assert slicer.is_primitive_relevant(definition)
+            # a disjunction of flag groups is reduced to the group supported by the target
+            assert not definition.lscpu_flag_requirement.is_disjunction
+            assert set(definition.ctypes) <= set(relevant_types)
+            shared += id(definition) in model
+        # definitions which are used unchanged are not copied
+        assert shared > 0, flavor.name
+
+
+def test_definition_overlays(tsl_generator) -> None:
+    definition = next(definition for definition in model_definitions(tsl_generator.primitive_class_set)
+                      if not isinstance(definition.ctype, str) and len(definition.ctypes) > 1 and
+                      len(definition.additional_simd_template_base_types) == 0 and
+                      len(definition.additional_simd_template_base_type_mapping_dict) == 0)
+    data = copy.deepcopy(definition.data)
+    assert definition.with_types(definition.ctypes) is definition
+    assert definition.without_ctypes([]) is definition
+    reduced = definition.without_ctypes(definition.ctypes[:1])
+    assert reduced.ctypes == definition.ctypes[1:]
+    restricted = definition.with_types(definition.ctypes[1:])
+    assert restricted.ctypes == definition.ctypes[1:]
+    assert definition.data == data
+
+
+def test_flag_group_overlay(tsl_generator) -> None:
+    # the primitive data does not contain disjunctions of flag groups yet, thus one is derived from an existing definition
+    template = model_definitions(tsl_generator.primitive_class_set)[0]
+    definition = TSLPrimitive.Definition({**copy.deepcopy(template.data),
+                                          "lscpu_flags": ["['avx512f', 'avx512bw']", "['avx2']"]})
+    data = copy.deepcopy(definition.data)
+    assert definition.lscpu_flag_requirement.is_disjunction
+    slicer = TSLSlicer(["sse", "avx", "avx2"], [])
+    assert slicer.is_primitive_relevant(definition)
+    term = definition.lscpu_flag_requirement.satisfied_term(lscpu_flags.mask(["sse", "avx", "avx2"]))
+    assert term == 1
+    grouped = definition.with_lscpu_flag_group(term)
+    assert set(grouped.data["lscpu_flags"]) == {"avx2"}
+    assert not grouped.lscpu_flag_requirement.is_disjunction
+    assert grouped.ctype is definition.ctype
+    assert definition.data == data and definition.lscpu_flag_requirement.is_disjunction
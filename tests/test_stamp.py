@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from tests.conftest import REPO_ROOT
+
+ARGUMENTS = ["--no-testing", "--primitives", "loadu"]
+
+
+def depfile_dependencies(depfile: Path) -> list:
+    target, dependencies = depfile.read_text().split(": \\\n", 1)
+    return [Path(line.strip().rstrip("\\").strip()) for line in dependencies.splitlines()]
+
+
+def test_unchanged_run_is_skipped(tmp_path: Path, run_generator) -> None:
+    out_path = tmp_path.joinpath("tsl")
+    run_generator(["-o", str(out_path), "--stamp", *ARGUMENTS])
+    stamp = out_path.joinpath(".tsl_stamp.json")
+    assert stamp.exists()
+    assert "Output is up to date" in run_generator(["-o", str(out_path), "--stamp", *ARGUMENTS]).stdout
+    # changed arguments or modified outputs invalidate the stamp
+    assert "Output is up to date" not in run_generator(["-o", str(out_path), "--stamp", "--no-testing",
+                                                        "--primitives", "storeu"]).stdout
+    out_path.joinpath("tsl.hpp").write_text("modified")
+    assert "Output is up to date" not in run_generator(["-o", str(out_path), "--stamp", "--no-testing",
+                                                        "--primitives", "storeu"]).stdout
+    assert out_path.joinpath("tsl.hpp").read_text() != "modified"
+
+
+def test_depfile_lists_input_files_and_directories(tmp_path: Path, run_generator) -> None:
+    out_path = tmp_path.joinpath("tsl")
+    depfile = tmp_path.joinpath("tsl.d")
+    output_list = tmp_path.joinpath("tsl.outputs")
+    run_generator(["-o", str(out_path), "--depfile", str(depfile), "--output-list", str(output_list), *ARGUMENTS])
+    assert depfile.read_text().startswith(f"{out_path.joinpath('.tsl_stamp.json')}: \\\n")
+    dependencies = depfile_dependencies(depfile)
+    assert REPO_ROOT.joinpath("main.py") in dependencies
+    assert REPO_ROOT.joinpath("primitive_data", "primitives", "memory.yaml") in dependencies
+    # added primitive data or templates only change the modification time of their directory
+    assert REPO_ROOT.joinpath("primitive_data", "primitives") in dependencies
+    assert REPO_ROOT.joinpath("generator", "config", "generator", "tsl_templates") in dependencies
+    outputs = [Path(line) for line in output_list.read_text().splitlines()]
+    assert out_path.joinpath("tsl.hpp") in outputs
+    assert all(output.is_file() for output in outputs)
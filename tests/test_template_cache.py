@@ -0,0 +1,16 @@
+def test_identical_sources_are_compiled_once(tsl_config) -> None:
+    cache = tsl_config.compiled_templates_cache
+    source = "return _mm_loadu_{{ intrin_tp_full[ctype][1] }}(memory); // test_template_cache"
+    misses, hits = cache.misses, cache.hits
+    template = tsl_config.create_template(source)
+    assert tsl_config.create_template(source) is template
+    assert (cache.misses, cache.hits) == (misses + 1, hits + 1)
+    assert template.render(intrin_tp_full={"float": ["ps", "ps"]}, ctype="float") == \
+        "return _mm_loadu_ps(memory); // test_template_cache"
+    assert template.render(intrin_tp_full={"double": ["pd", "pd"]}, ctype="double") == \
+        "return _mm_loadu_pd(memory); // test_template_cache"
+
+
+def test_cache_is_bounded_by_the_configuration(tsl_config) -> None:
+    assert tsl_config.compiled_templates_cache.max_entries == \
+        int(tsl_config.get_config_entry("template_cache")["max_compiled_templates"])
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+from jinja2 import FileSystemBytecodeCache
+
+from generator.core.tsl_config import TSLGeneratorConfig
+
+
+def test_templates_are_found_by_name_suffix(tsl_config) -> None:
+    template = tsl_config.get_template("license")
+    assert template is tsl_config.get_template("core::license")
+    assert template.filename == str(tsl_config.jinja_template_root_path.joinpath("core", "license.template"))
+
+
+def test_unknown_templates_raise(tsl_config) -> None:
+    with pytest.raises(ValueError):
+        tsl_config.get_template("no_such_template")
+    with pytest.raises(ValueError):
+        tsl_config.get_template("ore::license")
+
+
+def test_templates_are_compiled_on_first_use(tmp_path: Path) -> None:
+    tmp_path.joinpath("templates").mkdir()
+    tmp_path.joinpath("templates", "used.template").write_text("{{ name }}\n")
+    tmp_path.joinpath("templates", "unused.template").write_text("{% broken\n")
+    tmp_path.joinpath("cache").mkdir()
+    jinja_config = TSLGeneratorConfig.JinjaConfig(tmp_path.joinpath("templates"),
+                                                  FileSystemBytecodeCache(str(tmp_path.joinpath("cache"))))
+    assert jinja_config.env.get_template("used.template").render(name="loadu") == "loadu"
+    assert len(list(tmp_path.joinpath("cache").iterdir())) == 1
+
+    # a new process compiles the template from the persisted bytecode
+    warm_config = TSLGeneratorConfig.JinjaConfig(tmp_path.joinpath("templates"),
+                                                 FileSystemBytecodeCache(str(tmp_path.joinpath("cache"))))
+    assert warm_config.env.get_template("used.template").render(name="storeu") == "storeu"
+    # changed sources invalidate the bytecode
+    tmp_path.joinpath("templates", "used.template").write_text("{{ name }}!\n")
+    changed_config = TSLGeneratorConfig.JinjaConfig(tmp_path.joinpath("templates"),
+                                                    FileSystemBytecodeCache(str(tmp_path.joinpath("cache"))))
+    assert changed_config.env.get_template("used.template").render(name="storeu") == "storeu!"
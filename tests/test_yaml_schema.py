@@ -0,0 +1,85 @@
+import copy
+
+import pytest
+
+from generator.utils.yaml_schema import Schema
+from generator.utils.yaml_utils import yaml_load, yaml_load_all
+
+SCHEMA = {
+    "required": {
+        "name": {"type": "str", "brief": "Name."},
+        "count": {"type": "int", "brief": "Count."},
+    },
+    "optional": {
+        "flags": {"type": "list", "brief": "Flags.", "entry_type": {"type": "str", "brief": "Flag."}, "default": []},
+        "options": {"type": "dict", "brief": "Options.", "entry_type": {
+            "optional": {"inline": {"type": "bool", "brief": "Inline.", "default": False}}}},
+        "native": {"type": "bool", "brief": "Native.", "default": True},
+    }
+}
+
+
+def validate_both(schema: Schema, document: dict):
+    results = []
+    for validate in (schema.root.validate, schema.validate):
+        try:
+            results.append(validate(copy.deepcopy(document)))
+        except Exception as e:
+            results.append(type(e))
+    return results
+
+
+@pytest.fixture
+def schema(tsl_config) -> Schema:
+    return Schema(SCHEMA)
+
+
+@pytest.mark.parametrize("document", [
+    {"name": "loadu", "count": 1},
+    {"name": "loadu", "count": "2", "flags": "sse", "native": False},
+    {"name": 3, "count": 1, "flags": ["sse", 4], "options": {}},
+    {"name": "loadu", "count": 1, "options": {"inline": True}},
+    {"name": "loadu", "count": "many"},
+    {"name": "loadu"},
+    {"name": "loadu", "count": 1, "options": "inline"},
+])
+def test_compiled_validator_behaves_like_the_interpretive_one(schema: Schema, document: dict) -> None:
+    interpretive, compiled = validate_both(schema, document)
+    if interpretive is UnboundLocalError:
+        # the interpretive validator fails for dict-typed fields holding other values
+        assert compiled is Schema.TypeCastError
+    else:
+        assert interpretive == compiled
+
+
+def test_casts_and_defaults(schema: Schema) -> None:
+    assert schema.validate({"name": 3, "count": "2", "flags": "sse", "options": {}}) == \
+        {"name": "3", "count": 2, "flags": ["sse"], "options": {"inline": False}, "native": True}
+
+
+def test_mutable_defaults_are_not_shared(schema: Schema) -> None:
+    first = schema.validate({"name": "loadu", "count": 1})
+    first["flags"].append("sse")
+    assert schema.validate({"name": "storeu", "count": 1})["flags"] == []
+
+
+def test_errors(schema: Schema) -> None:
+    with pytest.raises(Schema.RequiredFieldError) as error:
+        schema.validate({"name": "loadu"})
+    assert error.value.error["fieldname"] == "count"
+    with pytest.raises(Schema.TypeCastError):
+        schema.validate({"name": "loadu", "count": "many"})
+    with pytest.raises(Schema.TypeCastError):
+        schema.validate({"name": "loadu", "count": 1, "options": ["inline"]})
+
+
+def test_primitive_data_is_validated_identically(tsl_config) -> None:
+    documents = [("extension", yaml_load(file, **tsl_config.yaml_loader_params()))
+                 for file in tsl_config.extension_files()]
+    for file in tsl_config.primitive_files():
+        documents.extend(("primitive_class" if index == 0 else "primitive", document)
+                         for index, document in enumerate(yaml_load_all(file, **tsl_config.yaml_loader_params())))
+    assert len(documents) > 100
+    for schema_name, document in documents:
+        interpretive, compiled = validate_both(tsl_config.get_schema(schema_name), document)
+        assert interpretive == compiled
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from generator.core.ctrl import tsl_loader
+from generator.core.tsl_config import TSLGeneratorConfig
+from generator.utils.yaml_schema import Schema
+from generator.utils.yaml_utils import FastSafeLineLoader, FastSafeLoader, SafeLineLoader, yaml_load, yaml_load_all, \
+    yaml_load_document_with_origin
+
+PRIMITIVES = """\
+---
+name: "memory"
+description: "Memory related primitives."
+...
+---
+primitive_name: "allocate"
+brief_description: "Allocates contiguous memory."
+parameters:
+  - ctype: "std::size_t"
+    name: "count_bytes"
+    description: "Number of bytes which should be allocated."
+returns:
+  ctype: "typename Vec::base_type*"
+  description: "Pointer to allocated memory."
+definitions:
+  - target_extension: "sse"
+    ctype: ["float", "double"]
+    lscpu_flags: ["sse"]
+    implementation: "return reinterpret_cast<typename Vec::base_type*>(_mm_malloc(count_bytes, 1));"
+  - target_extension: "scalar"
+    ctype: ["float"]
+    lscpu_flags: []
+    implementation: "return reinterpret_cast<typename Vec::base_type*>(malloc(count_bytes));"
+...
+"""
+
+ALIASES = """\
+shared: &shared {flags: ["sse"]}
+first: *shared
+second: *shared
+"""
+
+
+@pytest.fixture
+def primitive_file(tmp_path: Path) -> Path:
+    file = tmp_path.joinpath("memory.yaml")
+    file.write_text(PRIMITIVES)
+    return file
+
+
+def test_fast_loader_annotates_documents_and_top_level_entries(primitive_file: Path) -> None:
+    fast = list(yaml_load_all(primitive_file, Loader=FastSafeLineLoader))
+    full = list(yaml_load_all(primitive_file, Loader=SafeLineLoader))
+    assert [document["yaml_origin_line"] for document in fast] == [document["yaml_origin_line"] for document in full]
+    assert [definition["yaml_origin_line"] for definition in fast[1]["definitions"]] == \
+        [definition["yaml_origin_line"] for definition in full[1]["definitions"]] == [16, 20]
+    # nested mappings are only annotated by the full line loader
+    assert "yaml_origin_line" not in fast[1]["returns"]
+    assert full[1]["returns"]["yaml_origin_line"] == 13
+
+
+def test_fast_loader_yields_the_same_data_as_the_pure_python_loader(primitive_file: Path) -> None:
+    assert list(yaml_load_all(primitive_file, Loader=FastSafeLoader)) == list(yaml.safe_load_all(PRIMITIVES))
+
+
+@pytest.mark.parametrize("content, has_aliases", [(ALIASES, True), (PRIMITIVES, False)])
+def test_aliases_are_tracked(content: str, has_aliases: bool) -> None:
+    for loader_class in (FastSafeLoader, FastSafeLineLoader, SafeLineLoader):
+        loader = loader_class(content)
+        try:
+            while loader.check_data():
+                loader.get_data()
+                assert loader.yaml_has_aliases == has_aliases
+        finally:
+            loader.dispose()
+
+
+def test_documents_with_aliases_are_copied(tmp_path: Path) -> None:
+    file = tmp_path.joinpath("aliases.yaml")
+    file.write_text(ALIASES)
+    for loader in (FastSafeLoader, FastSafeLineLoader, SafeLineLoader):
+        document = yaml_load(file, Loader=loader)
+        assert document["first"] == document["second"] == document["shared"]
+        document["first"]["flags"].append("avx")
+        assert yaml_load(file, Loader=loader)["second"] == {"flags": ["sse"]} | \
+            ({"yaml_origin_line": 1} if loader is SafeLineLoader else {})
+
+
+def test_filename_is_saved_on_request(primitive_file: Path) -> None:
+    assert all(document["yaml_origin_file"] == f"{primitive_file}"
+               for document in yaml_load_all(primitive_file, save_filename=True, Loader=FastSafeLoader))
+    assert all("yaml_origin_file" not in document for document in yaml_load_all(primitive_file, Loader=FastSafeLoader))
+
+
+def test_single_document_is_recovered_with_all_origin_lines(primitive_file: Path) -> None:
+    document = yaml_load_document_with_origin(primitive_file, 1)
+    assert document == list(yaml_load_all(primitive_file, save_filename=True, Loader=SafeLineLoader))[1]
+    assert document["returns"]["yaml_origin_line"] == 13
+    assert yaml_load_document_with_origin(primitive_file, 2) is None
+
+
+def test_validation_errors_point_to_the_origin(tsl_config, primitive_file: Path, monkeypatch) -> None:
+    monkeypatch.setattr(TSLGeneratorConfig, "yaml_lazy_origin_lines", property(lambda self: True))
+    schema = tsl_config.get_schema("primitive")
+    document = list(yaml_load_all(primitive_file, Loader=FastSafeLineLoader))[1]
+    del document["definitions"][1]["implementation"]
+    with pytest.raises(Exception) as error:
+        schema.validate(document)
+    assert isinstance(error.value, Schema.RequiredFieldError)
+    # the file on disk is valid, thus the error of the lazily annotated document is kept
+    recovered, recovered_document = tsl_loader._recover_origin(primitive_file, 1, schema, error.value, document)
+    assert recovered is error.value and recovered_document is document
+
+    primitive_file.write_text(PRIMITIVES.replace('    implementation: "return reinterpret_cast<typename Vec::base_type*>(malloc(count_bytes));"\n', ""))
+    document = list(yaml_load_all(primitive_file, save_filename=True, Loader=FastSafeLineLoader))[1]
+    with pytest.raises(Exception) as error:
+        schema.validate(document)
+    recovered, recovered_document = tsl_loader._recover_origin(primitive_file, 1, schema, error.value, document)
+    assert recovered is not error.value
+    assert "yaml_origin_line" in recovered_document["returns"]
+    assert recovered.error["data"]["yaml_origin_line"] == 20
@@ -4,6 +4,10 @@ set(Python_FIND_VIRTUALENV FIRST)
 find_package(Python3 REQUIRED)
 
 message(STATUS "Found python at ${Python3_EXECUTABLE}")
+# Ninja resolves the absolute paths within the depfile of the generator (see create_tsl).
+if(POLICY CMP0116)
+  cmake_policy(SET CMP0116 NEW)
+endif()
 function(create_tsl)
   set(options WORKAROUND_WARNINGS USE_CONCEPTS CREATE_TESTS DRAW_TEST_DEPENDENCIES)
   set(oneValueArgs TSLGENERATOR_DIRECTORY DESTINATION TARGET_ARCHID)
@@ -86,17 +90,25 @@ function(create_tsl)
     set(TSL_GENERATOR_DESTINATION ${CREATE_TSL_ARGS_DESTINATION})
   endif()
 
-  file(GLOB_RECURSE TSL_GENERATOR_SOURCES CONFIGURE_DEPENDS
-    "${TSLGENERATOR_DIRECTORY}/generator/config/*.template"
-    "${TSLGENERATOR_DIRECTORY}/generator/config/*.yaml"
-    "${TSLGENERATOR_DIRECTORY}/generator/static_files/*.yaml"
-    "${TSLGENERATOR_DIRECTORY}/generator/core/*.py"
-    "${TSLGENERATOR_DIRECTORY}/generator/expansions/*.py"
-    "${TSLGENERATOR_DIRECTORY}/generator/utils/*.py"
-    "${TSLGENERATOR_DIRECTORY}/primitive_data/extensions/*.yaml"
-    "${TSLGENERATOR_DIRECTORY}/primitive_data/primitives/*.yaml"
-  )
-  set_property(DIRECTORY APPEND PROPERTY CMAKE_CONFIGURE_DEPENDS ${TSL_GENERATOR_SOURCES})
+  if(CMAKE_VERSION VERSION_GREATER_EQUAL 3.20 AND CMAKE_GENERATOR MATCHES "Ninja|Makefiles")
+    # The generator is rerun at build time if one of its inputs (listed by its depfile) changed. Thus, changes to the
+    # generator or the primitive data do not force a reconfiguration. The depfile lists the directories of the inputs
+    # as well, thus added primitive data or templates are picked up, too.
+    set(TSL_BUILD_TIME_GENERATION ON)
+  else()
+    set(TSL_BUILD_TIME_GENERATION OFF)
+    file(GLOB_RECURSE TSL_GENERATOR_SOURCES CONFIGURE_DEPENDS
+      "${TSLGENERATOR_DIRECTORY}/generator/config/*.template"
+      "${TSLGENERATOR_DIRECTORY}/generator/config/*.yaml"
+      "${TSLGENERATOR_DIRECTORY}/generator/static_files/*.yaml"
+      "${TSLGENERATOR_DIRECTORY}/generator/core/*.py"
+      "${TSLGENERATOR_DIRECTORY}/generator/expansions/*.py"
+      "${TSLGENERATOR_DIRECTORY}/generator/utils/*.py"
+      "${TSLGENERATOR_DIRECTORY}/primitive_data/extensions/*.yaml"
+      "${TSLGENERATOR_DIRECTORY}/primitive_data/primitives/*.yaml"
+    )
+    set_property(DIRECTORY APPEND PROPERTY CMAKE_CONFIGURE_DEPENDS ${TSL_GENERATOR_SOURCES})
+  endif()
 
   if(NOT DEFINED CREATE_TSL_ARGS_GENERATOR_OPTIONS)
     set(CURRENT_GENERATOR_OPTIONS "")
@@ -178,14 +190,35 @@ function(create_tsl)
   message(STATUS "Target Options   : ${TSL_LINK_OPTIONS}")
   message(STATUS "===============================")
   message(STATUS "Running TSL Generator...")
-  message(STATUS "Executing command: ${Python3_EXECUTABLE} ${TSLGENERATOR_DIRECTORY}/main.py ${TSL_GENERATOR_OPTIONS} -o ${TSL_GENERATOR_DESTINATION} ${TSL_TARGETS_SWITCH} ${ARCH_ID_SWITCH} ${TSL_PRIMITIVE_SWITCH} ${TSL_TYPES_SWITCH}")
-  execute_process(
-      COMMAND "${Python3_EXECUTABLE}" "${TSLGENERATOR_DIRECTORY}/main.py" 
+  # The generator skips the generation if the stamp shows that neither the inputs nor the arguments changed since the
+  # last run into the destination.
+  set(TSL_GENERATOR_STAMP "${TSL_GENERATOR_DESTINATION}/.tsl_stamp.json")
+  set(TSL_GENERATOR_DEPFILE "${TSL_GENERATOR_DESTINATION}/.tsl_stamp.d")
+  set(TSL_GENERATOR_OUTPUT_LIST "${TSL_GENERATOR_DESTINATION}/.tsl_outputs")
+  set(TSL_GENERATOR_COMMAND "${Python3_EXECUTABLE}" "${TSLGENERATOR_DIRECTORY}/main.py"
       ${TSL_GENERATOR_OPTIONS} -o "${TSL_GENERATOR_DESTINATION}"
       ${TSL_TARGETS_SWITCH} ${ARCH_ID_SWITCH} ${TSL_PRIMITIVE_SWITCH} ${TSL_TYPES_SWITCH}
-  )
+      --depfile "${TSL_GENERATOR_DEPFILE}" --output-list "${TSL_GENERATOR_OUTPUT_LIST}")
+  message(STATUS "Executing command: ${TSL_GENERATOR_COMMAND}")
+  execute_process(COMMAND ${TSL_GENERATOR_COMMAND})
   set(TSL_INCLUDE_DIRECTORY "${TSL_GENERATOR_DESTINATION}/include" CACHE STRING "include path of TSL")
   set(TSL_INCLUDE_DIRECTORY_ROOT "${TSL_GENERATOR_DESTINATION}/" CACHE STRING "root path of TSL")
   add_subdirectory("${TSL_GENERATOR_DESTINATION}" "${TSL_GENERATOR_DESTINATION}/build")
 
+  if(TSL_BUILD_TIME_GENERATION)
+    file(STRINGS "${TSL_GENERATOR_OUTPUT_LIST}" TSL_GENERATED_FILES)
+    # changes to the generated CMake files trigger a reconfiguration, they must not be removed by a clean
+    list(FILTER TSL_GENERATED_FILES EXCLUDE REGEX "CMakeLists\\.txt$")
+    add_custom_command(
+      OUTPUT "${TSL_GENERATOR_STAMP}"
+      BYPRODUCTS ${TSL_GENERATED_FILES}
+      COMMAND ${TSL_GENERATOR_COMMAND}
+      DEPFILE "${TSL_GENERATOR_DEPFILE}"
+      COMMENT "Regenerating TSL (inputs changed)"
+      VERBATIM
+    )
+    add_custom_target(tsl_generate DEPENDS "${TSL_GENERATOR_STAMP}")
+    add_dependencies(tsl tsl_generate)
+  endif()
+
 endfunction()